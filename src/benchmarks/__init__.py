@@ -0,0 +1,7 @@
+"""
+Performance harness for shtest_compiler.
+
+``benchmarks.corpus`` generates synthetic ``.shtest`` corpora,
+``benchmarks.run`` measures each compilation stage and the runtime of the
+generated scripts, and ``benchmarks.compare`` compares two result files.
+"""
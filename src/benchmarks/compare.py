@@ -0,0 +1,84 @@
+"""
+Compare two benchmark result files written by ``benchmarks.run``::
+
+    python -m benchmarks.compare base.json head.json [--threshold 10]
+
+Prints the best time of each stage in both files and the relative change.
+Exit status: 0, or 1 if a stage got slower by more than ``--threshold``
+percent (stages faster than ``--min-ms`` in both files are ignored as noise).
+"""
+
+import argparse
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_THRESHOLD = 10.0
+DEFAULT_MIN_MS = 1.0
+
+
+def compare_results(
+    base: Dict,
+    head: Dict,
+    threshold: float = DEFAULT_THRESHOLD,
+    min_ms: float = DEFAULT_MIN_MS,
+) -> List[Tuple[str, float, float, Optional[float], bool]]:
+    """Rows of (stage, base ms, head ms, change in percent, regression)."""
+    rows = []
+    for stage, base_seconds in base["best"].items():
+        if stage not in head["best"]:
+            continue
+        base_ms, head_ms = base_seconds * 1000, head["best"][stage] * 1000
+        change = (head_ms - base_ms) / base_ms * 100 if base_ms else None
+        regression = (
+            change is not None
+            and change > threshold
+            and max(base_ms, head_ms) >= min_ms
+        )
+        rows.append((stage, base_ms, head_ms, change, regression))
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.compare",
+        description="Comparer deux fichiers de résultats de benchmarks.run",
+    )
+    parser.add_argument("base", help="Résultats de référence (JSON)")
+    parser.add_argument("head", help="Résultats à comparer (JSON)")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Ralentissement toléré, en pourcentage",
+    )
+    parser.add_argument(
+        "--min-ms",
+        type=float,
+        default=DEFAULT_MIN_MS,
+        help="Durée en dessous de laquelle un écart est ignoré",
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+
+    print(f"{'étape':>10} {'base (ms)':>12} {'head (ms)':>12} {'écart':>9}")
+    regressions = []
+    for stage, base_ms, head_ms, change, regression in compare_results(
+        base, head, args.threshold, args.min_ms
+    ):
+        delta = f"{change:+.1f}%" if change is not None else "-"
+        marker = "  REGRESSION" if regression else ""
+        print(f"{stage:>10} {base_ms:12.1f} {head_ms:12.1f} {delta:>9}{marker}")
+        if regression:
+            regressions.append(stage)
+    if regressions:
+        print(f"Étapes ralenties de plus de {args.threshold:g}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
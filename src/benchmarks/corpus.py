@@ -0,0 +1,170 @@
+"""
+Synthetic ``.shtest`` corpus generator.
+
+Writes ``files`` test files of ``steps`` steps each, mixing canonical
+phrases, aliases (``créer un dossier`` is also a pattern of the example
+plugin), compound ``et``/``ou`` validations, content, line-count, comparison
+and checksum validations. The fixtures the tests read are written next to
+them, and every step works in its own directory under ``work/``, so the
+generated scripts run without any external setup::
+
+    python -m benchmarks.corpus /tmp/corpus --files 50 --steps 20
+
+The same seed always produces the same corpus.
+"""
+
+import argparse
+import hashlib
+import os
+import random
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+DEFAULT_FILES = 10
+DEFAULT_STEPS = 10
+DEFAULT_ACTIONS = 4
+
+ROWS = ["id;libelle;quantite"] + [f"{i};article {i};{i * 7 % 50}" for i in range(1, 41)]
+
+JOB_SCRIPT = '#!/bin/sh\necho "JOB OK $*"\n'
+
+
+def _prepare(step: str, data: str) -> List[str]:
+    return [
+        f"Action: Créer le dossier {step} ; Résultat: le dossier {step} existe",
+        f"Action: Copier le fichier {data}/rows.csv vers {step}/rows.csv ; "
+        f"Résultat: les fichiers {data}/rows.csv et {step}/rows.csv "
+        "contiennent les mêmes lignes",
+    ]
+
+
+def _alias(step: str, data: str, tag: str, rng: random.Random) -> str:
+    return f"Action: créer un dossier {step}/sous_dossier ; Résultat: retour 0"
+
+
+def _empty_file(step: str, data: str, tag: str, rng: random.Random) -> str:
+    path = f"{step}/vide.txt"
+    return (
+        f"Action: Créer le fichier {path} ; "
+        f"Résultat: le fichier {path} existe et le fichier {path} est vide"
+    )
+
+
+def _display(step: str, data: str, tag: str, rng: random.Random) -> str:
+    row = rng.choice(ROWS[1:]).split(";")[1]
+    return (
+        f"Action: Afficher le contenu du fichier {step}/rows.csv ; "
+        f"Résultat: retour 0 et (la sortie standard contient {row} "
+        "ou la sortie standard contient libelle)"
+    )
+
+
+def _script(step: str, data: str, tag: str, rng: random.Random) -> str:
+    row = rng.choice(ROWS[1:])
+    return (
+        f"Action: Exécuter le script {data}/job.sh ; "
+        f"Résultat: le fichier {step}/rows.csv contient {len(ROWS)} lignes "
+        f"et le fichier {step}/rows.csv contient {row}"
+    )
+
+
+def _command(step: str, data: str, tag: str, rng: random.Random) -> str:
+    return f"Action: Exécuter {data}/job.sh lot={tag} ; Résultat: aucun message d'erreur"
+
+
+def _variable(step: str, data: str, tag: str, rng: random.Random) -> str:
+    return f"Action: Définir la variable compteur_{tag} = {rng.randrange(1000)} ; Résultat: retour 0"
+
+
+def _checksum(step: str, data: str, tag: str, rng: random.Random) -> str:
+    digest = hashlib.sha256(("\n".join(ROWS) + "\n").encode("utf-8")).hexdigest()
+    return (
+        f"Action: Copier le fichier {data}/rows.csv vers {step}/copie.csv ; "
+        f"Résultat: le fichier {step}/copie.csv a pour somme de contrôle sha256 {digest}"
+    )
+
+
+# Templates of the actions of a step, after its preparation; each one is used
+# at most once per step, since the compiler turns repeated identical actions
+# into shared helpers, which is not what the corpus is meant to measure.
+ACTIONS: Sequence[Callable[[str, str, str, random.Random], str]] = (
+    _alias,
+    _empty_file,
+    _display,
+    _script,
+    _command,
+    _variable,
+    _checksum,
+)
+
+
+def render_file(
+    index: int, root: str, steps: int, actions: int, rng: random.Random
+) -> str:
+    """Text of the ``index``-th test file of a corpus rooted at *root*."""
+    data = f"{root}/data"
+    lines = []
+    for step_index in range(1, steps + 1):
+        tag = f"t{index}s{step_index}"
+        step = f"{root}/work/{tag}"
+        lines.append(f"Étape: Étape {step_index} du test {index}")
+        lines.append("")
+        lines.extend(_prepare(step, data))
+        for template in rng.sample(ACTIONS, actions):
+            lines.append(template(step, data, tag, rng))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def generate_corpus(
+    directory: str,
+    files: int = DEFAULT_FILES,
+    steps: int = DEFAULT_STEPS,
+    actions: int = DEFAULT_ACTIONS,
+    seed: int = 0,
+) -> List[Path]:
+    """Write a corpus and its fixtures into *directory*; return the test files.
+
+    Each step creates its directory and copies the reference CSV, then runs
+    *actions* distinct actions drawn from ``ACTIONS`` (at most ``len(ACTIONS)``).
+    """
+    root = Path(directory).resolve()
+    (root / "data").mkdir(parents=True, exist_ok=True)
+    (root / "data" / "rows.csv").write_text("\n".join(ROWS) + "\n", encoding="utf-8")
+    job = root / "data" / "job.sh"
+    job.write_text(JOB_SCRIPT, encoding="utf-8")
+    job.chmod(0o755)
+
+    rng = random.Random(seed)
+    paths = []
+    for index in range(1, files + 1):
+        path = root / f"test_{index:04d}.shtest"
+        path.write_text(
+            render_file(index, root.as_posix(), steps, actions, rng), encoding="utf-8"
+        )
+        paths.append(path)
+    return paths
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.corpus",
+        description="Générer un corpus de fichiers .shtest synthétiques",
+    )
+    parser.add_argument("directory", help="Dossier de sortie")
+    parser.add_argument("--files", type=int, default=DEFAULT_FILES, help="Nombre de fichiers")
+    parser.add_argument("--steps", type=int, default=DEFAULT_STEPS, help="Étapes par fichier")
+    parser.add_argument(
+        "--actions", type=int, default=DEFAULT_ACTIONS, help="Actions par étape, en plus de la préparation"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Graine du générateur")
+    args = parser.parse_args(argv)
+    if not 0 <= args.actions <= len(ACTIONS):
+        parser.error(f"--actions doit être compris entre 0 et {len(ACTIONS)}")
+    paths = generate_corpus(args.directory, args.files, args.steps, args.actions, args.seed)
+    print(f"{len(paths)} fichiers générés dans {os.path.abspath(args.directory)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
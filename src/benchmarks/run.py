@@ -0,0 +1,183 @@
+"""
+Compilation and runtime benchmark.
+
+Compiles every ``.shtest`` file of a corpus under a ``CompileProfile``,
+runs the generated scripts, and writes the timings as JSON::
+
+    python -m benchmarks.run --files 20 --steps 10 --repeat 3 --output bench.json
+    python -m benchmarks.run --corpus tests/ --no-runtime
+
+Stages, in pipeline order:
+
+- ``lex``, ``grammar``, ``ast``: the parser's lexer, grammar and AST builder;
+- ``framework``, ``lift``, ``bind``, ``script``, ``join``: the five stages of
+  ``ShellGenerator.visit``;
+- ``emit``: writing the script to disk;
+- ``runtime``: running the script with ``bash``.
+
+Each repetition compiles the whole corpus again; the JSON keeps every
+repetition, and ``benchmarks.compare`` compares the best one of two files.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from shtest_compiler.compiler.compiler import ModularCompiler
+from shtest_compiler.compiler.profiling import STAGES as COMPILE_STAGES, CompileProfile, profiling
+
+from .corpus import DEFAULT_ACTIONS, DEFAULT_FILES, DEFAULT_STEPS, generate_corpus
+
+STAGES = COMPILE_STAGES + ("runtime",)
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+
+def compile_stages(compiler: ModularCompiler, source: Path, output: Path) -> Dict[str, float]:
+    """Compile *source* into *output*; return the time of each stage (in seconds)."""
+    profile = CompileProfile()
+    with profiling(profile):
+        compiler.compile_file(str(source), str(output), debug_output_path=os.devnull)
+    return {name: measure.seconds for name, measure in profile.stages.items()}
+
+
+def run_script(script: Path, workdir: Path) -> Tuple[float, int]:
+    """Run a generated script; return its wall time and exit status."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    start = time.perf_counter()
+    result = subprocess.run(
+        ["bash", str(script)],
+        cwd=workdir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start, result.returncode
+
+
+def run_once(sources: List[Path], output_dir: Path, runtime: bool) -> Dict:
+    """One pass over the corpus: stage totals and per-file timings."""
+    compiler = ModularCompiler()
+    totals = dict.fromkeys(STAGES, 0.0)
+    files = []
+    failures = []
+    for source in sources:
+        output = output_dir / (source.stem + ".sh")
+        timings = compile_stages(compiler, source, output)
+        if runtime:
+            timings["runtime"], status = run_script(output, output_dir)
+            if status != 0:
+                failures.append(source.name)
+        for stage, seconds in timings.items():
+            totals[stage] += seconds
+        files.append({"file": source.name, "timings": timings})
+    compile_total = sum(totals[stage] for stage in STAGES if stage != "runtime")
+    return {
+        "stages": totals,
+        "compile_total": compile_total,
+        "runtime_failures": failures,
+        "files": files,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=SRC_DIR,
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def run_benchmark(
+    sources: List[Path],
+    repeat: int = 1,
+    runtime: bool = True,
+    corpus: Optional[Dict] = None,
+) -> Dict:
+    """Benchmark *sources* *repeat* times; return the JSON-ready results."""
+    runs = []
+    with tempfile.TemporaryDirectory(prefix="shtest_bench_") as output_dir:
+        for _ in range(repeat):
+            runs.append(run_once(sources, Path(output_dir), runtime))
+    best = {
+        stage: min(run["stages"][stage] for run in runs) for stage in STAGES
+    }
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "corpus": corpus or {"files": len(sources)},
+        "repeat": repeat,
+        "best": best,
+        "runs": runs,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Mesurer chaque étape de compilation et l'exécution des scripts générés",
+    )
+    parser.add_argument(
+        "--corpus",
+        help="Dossier de fichiers .shtest existants (par défaut, un corpus synthétique est généré)",
+    )
+    parser.add_argument("--files", type=int, default=DEFAULT_FILES, help="Fichiers du corpus généré")
+    parser.add_argument("--steps", type=int, default=DEFAULT_STEPS, help="Étapes par fichier généré")
+    parser.add_argument("--actions", type=int, default=DEFAULT_ACTIONS, help="Actions par étape générée")
+    parser.add_argument("--seed", type=int, default=0, help="Graine du générateur")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre de passes sur le corpus")
+    parser.add_argument(
+        "--no-runtime", action="store_true", help="Ne pas exécuter les scripts générés"
+    )
+    parser.add_argument("--output", help="Fichier JSON de résultats (sortie standard par défaut)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="shtest_corpus_") as corpus_dir:
+        if args.corpus:
+            sources = sorted(Path(args.corpus).rglob("*.shtest"))
+            corpus = {"directory": os.path.abspath(args.corpus), "files": len(sources)}
+        else:
+            sources = generate_corpus(
+                corpus_dir, args.files, args.steps, args.actions, args.seed
+            )
+            corpus = {
+                "files": args.files,
+                "steps": args.steps,
+                "actions": args.actions,
+                "seed": args.seed,
+            }
+        results = run_benchmark(sources, args.repeat, not args.no_runtime, corpus)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    for stage in STAGES:
+        print(f"{stage:>10}: {results['best'][stage] * 1000:10.1f} ms", file=sys.stderr)
+    failures = results["runs"][-1]["runtime_failures"]
+    if failures:
+        print(f"Scripts en échec: {', '.join(failures)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
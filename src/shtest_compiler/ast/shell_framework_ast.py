@@ -3,6 +3,10 @@ from typing import List, Optional
 
 
 class ActionNode:
+    # Actions are assumed to possibly modify the database; read-only SQL
+    # actions override this so their results can stay in the SQL cache.
+    invalidates_sql_cache = True
+
     def to_shell(self) -> str:
         raise NotImplementedError("ActionNode subclasses must implement to_shell()")
 
@@ -34,11 +38,22 @@ class ValidationCheck:
     params: dict = field(default_factory=dict)
 
 
+@dataclass
+class ShellFixture:
+    key: str  # hash of the resolved action sequence
+    targets: List[str]  # paths produced by the step
+    sources: List[str] = field(default_factory=list)  # inputs copied by the step
+    # Targets archived with their content (copied trees); the others are
+    # archived alone, so a directory does not drag in what it already held
+    trees: List[str] = field(default_factory=list)
+
+
 @dataclass
 class ShellTestStep:
     name: str
     actions: List[object]
     validations: List[object]
+    fixture: Optional[ShellFixture] = None
 
 
 @dataclass
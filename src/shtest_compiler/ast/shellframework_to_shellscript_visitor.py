@@ -11,13 +11,48 @@ from shtest_compiler.ast.shell_framework_ast import (
 )
 from shtest_compiler.ast.shell_script_ast import ShellScript
 from shtest_compiler.ast.visitor import ASTVisitor
+from shtest_compiler.compiler.checkpoints import (
+    checkpoint_prologue,
+    step_checkpoint,
+    step_guard_close,
+    step_guard_open,
+)
+from shtest_compiler.compiler.failure_policy import (
+    FAIL_FAST,
+    check_failure_policy,
+    failure_lines,
+    failure_prologue,
+    script_epilogue,
+    step_epilogue,
+    step_prologue,
+)
+from shtest_compiler.compiler.fixture_cache import fixture_block, fixture_prologue
 from shtest_compiler.parser.shunting_yard import Atomic, BinaryOp
-from shtest_compiler.utils.logger import debug_log, is_debug_enabled
+from shtest_compiler.utils.logger import trace, tracing
+
+
+def shell_escape_echo(text):
+    """Escape text for use in single-quoted echo statements"""
+    if text is None:
+        return ""
+    # Replace single quotes with the proper shell escaping sequence
+    return str(text).replace("'", "'\\''")
 
 
 class ShellFrameworkToShellScriptVisitor(ASTVisitor[ShellScript]):
-    def __init__(self):
+    def __init__(self, failure_policy: str = FAIL_FAST, checkpoints: bool = False):
         self.condition_counter = 0
+        self.failure_policy = check_failure_policy(failure_policy)
+        self.checkpoints = checkpoints
+        self.step_counter = 0
+        # Operands of a compound validation only report their status; the
+        # compound node decides whether the whole expression failed.
+        self.compound_depth = 0
+
+    def _failure_lines(self, escaped_message: str) -> List[str]:
+        if self.compound_depth and self.failure_policy != FAIL_FAST:
+            return ["    false"]
+        return failure_lines(escaped_message, self.failure_policy)
 
     def get_condition_var(self):
         """Generate unique condition variable names"""
@@ -28,6 +63,11 @@ class ShellFrameworkToShellScriptVisitor(ASTVisitor[ShellScript]):
         lines: List[str] = []
         # Emit global code (e.g., prologue)
         lines.extend(node.global_code)
+        lines.extend(failure_prologue(self.failure_policy))
+        if self.checkpoints:
+            lines.extend(checkpoint_prologue())
+        if any(step.fixture for step in node.steps):
+            lines.extend(fixture_prologue())
         lines.append("")
         # Emit helper functions
         for helper in node.helpers:
@@ -37,6 +77,7 @@ class ShellFrameworkToShellScriptVisitor(ASTVisitor[ShellScript]):
         for step in node.steps:
             lines.extend(self.visit(step))
             lines.append("")
+        lines.extend(script_epilogue(self.failure_policy))
         lines.append("echo 'All steps and validations passed.'")
         lines.append("exit 0")
         return ShellScript(lines=lines)
@@ -49,14 +90,31 @@ class ShellFrameworkToShellScriptVisitor(ASTVisitor[ShellScript]):
         return lines
 
     def visit_shellteststep(self, node: ShellTestStep) -> List[str]:
-        lines = [f"# Test step: {node.name}"]
+        escaped_name = shell_escape_echo(node.name)
+        body = []
         for action in node.actions:
             if isinstance(action, ActionNode):
-                lines.append(action.to_shell())
+                body.append(action.to_shell())
             else:
-                lines.extend(self.visit(action))
+                body.extend(self.visit(action))
         for validation in node.validations:
-            lines.extend(self.visit(validation))
+            body.extend(self.visit(validation))
+        if node.fixture:
+            body = fixture_block(node.fixture, escaped_name, body)
+        body = step_prologue(escaped_name, self.failure_policy) + body
+        epilogue = step_epilogue(self.failure_policy)
+
+        lines = [f"# Test step: {node.name}"]
+        if not self.checkpoints:
+            return lines + body + epilogue
+        # Only the first physical line of each element is indented so that
+        # heredocs embedded in an action keep their terminator in column 0.
+        self.step_counter += 1
+        lines.extend(step_guard_open(self.step_counter))
+        body.extend(step_checkpoint(self.step_counter, escaped_name))
+        body.extend(epilogue)
+        lines.extend(f"    {line}" if line else line for line in body)
+        lines.extend(step_guard_close())
         return lines
 
     def visit_shellfunctioncall(self, node: ShellFunctionCall) -> List[str]:
@@ -86,14 +144,6 @@ class ShellFrameworkToShellScriptVisitor(ASTVisitor[ShellScript]):
         # Get opposite message for failure case
         opposite = params.get("opposite", f"NOT({node.expected})")
 
-        # Escape apostrophes and quotes for shell echo statements
-        def shell_escape_echo(text):
-            """Escape text for use in single-quoted echo statements"""
-            if text is None:
-                return ""
-            # Replace single quotes with the proper shell escaping sequence
-            return str(text).replace("'", "'\\''")
-
         escaped_expected = shell_escape_echo(node.expected)
         escaped_opposite = shell_escape_echo(opposite)
 
@@ -104,7 +154,7 @@ class ShellFrameworkToShellScriptVisitor(ASTVisitor[ShellScript]):
             f"    echo 'OK: {escaped_expected}'",
             f"else",
             f"    echo 'FAIL: {escaped_opposite}'",
-            f"    exit 1",
+            *self._failure_lines(escaped_opposite),
             f"fi",
         ]
         return lines
@@ -114,15 +164,23 @@ class ShellFrameworkToShellScriptVisitor(ASTVisitor[ShellScript]):
         return self.visit_binary_op(node)
 
     def visit_binary_op(self, node: BinaryOp) -> List[str]:
-        debug_enabled = is_debug_enabled()
-        if debug_enabled:
-            debug_log(
-                f"visit_binary_op: op={node.op}, left={getattr(node.left, 'value', node.left)}, right={getattr(node.right, 'value', node.right)}"
+        if tracing.emitter:
+            trace(
+                "emitter",
+                "visit_binary_op",
+                "op=%s, left=%s, right=%s",
+                node.op,
+                getattr(node.left, 'value', node.left),
+                getattr(node.right, 'value', node.right),
             )
         """Handle compound validations (AND/OR) with proper linearization"""
         # Visit left and right operands
-        left_lines = self.visit(node.left)
-        right_lines = self.visit(node.right)
+        self.compound_depth += 1
+        try:
+            left_lines = self.visit(node.left)
+            right_lines = self.visit(node.right)
+        finally:
+            self.compound_depth -= 1
 
         # Generate condition variables
         left_var = self.get_condition_var()
@@ -148,7 +206,7 @@ class ShellFrameworkToShellScriptVisitor(ASTVisitor[ShellScript]):
                 f"    echo 'OK: Compound validation ({node.op})'",
                 f"else",
                 f"    echo 'FAIL: Compound validation ({node.op})'",
-                f"    exit 1",
+                *self._failure_lines(f"Compound validation ({node.op})"),
                 f"fi",
             ]
         )
@@ -156,9 +214,8 @@ class ShellFrameworkToShellScriptVisitor(ASTVisitor[ShellScript]):
         return compound_lines
 
     def visit_atomic(self, node: Atomic) -> List[str]:
-        debug_enabled = is_debug_enabled()
-        if debug_enabled:
-            debug_log(f"visit_atomic: value={node.value}")
+        if tracing.emitter:
+            trace("emitter", "visit_atomic", "value=%s", node.value)
         from shtest_compiler.compiler.atomic_compiler import compile_atomic
 
         # Use compile_atomic to generate ValidationCheck
@@ -20,16 +20,52 @@ from shtest_compiler.compiler.action_utils import (
     validate_action_context,
 )
 from shtest_compiler.compiler.atomic_compiler import compile_atomic
-from shtest_compiler.utils.logger import debug_log, is_debug_enabled
+from shtest_compiler.compiler.compressed_files import reader_prologue
+from shtest_compiler.compiler.failure_policy import FAIL_FAST
+from shtest_compiler.compiler.fixture_cache import detect_fixture, fixture_skip
+from shtest_compiler.compiler.profiling import call_handler
+from shtest_compiler.compiler.sql_cache import cache_prologue
+from shtest_compiler.compiler.sql_jobs import (
+    connection_variable,
+    is_concurrent,
+    job_collect,
+    job_start,
+    jobs_prologue,
+    jobs_trap,
+)
+from shtest_compiler.compiler.sql_session import session_prologue, session_trap
+from shtest_compiler.utils.logger import trace, tracing
 from shtest_compiler.parser.shtest_ast import Action, ShtestFile, TestStep
-from shtest_compiler.parser.shunting_yard import parse_validation_expression
+from shtest_compiler.parser.shunting_yard import (
+    is_compound_expression,
+    parse_validation_expression,
+)
 from shtest_compiler.command_loader import build_registry
 
 
 class ShtestToShellFrameworkVisitor(ASTVisitor[ShellFrameworkAST]):
-    def __init__(self):
-        self.occurrence_counter: Dict[Tuple[str, str], int] = defaultdict(int)
-        self.helper_names: Dict[Tuple[str, str], str] = {}
+    def __init__(
+        self,
+        failure_policy: str = FAIL_FAST,
+        fixture_cache: bool = False,
+        sql_session: bool = False,
+        sql_cache: bool = False,
+        sql_jobs: int = 1,
+    ):
+        self.failure_policy = failure_policy
+        self.fixture_cache = fixture_cache
+        self.sql_session = sql_session
+        self.sql_cache = sql_cache
+        # A persistent session is a single client: its requests cannot overlap
+        self.sql_jobs = 1 if sql_session else max(int(sql_jobs or 1), 1)
+        self.sql_job_counter = 0
+        # SQL_CONN/SQL_DRIVER in force for the action being compiled, and for
+        # each action of the file (by id), as defined by the actions before it
+        self.sql_variables: Dict[str, str] = {}
+        self.action_sql_variables: Dict[int, Dict[str, str]] = {}
+        self._resolved_action = None
+        self.occurrence_counter: Dict[Tuple, int] = defaultdict(int)
+        self.helper_names: Dict[Tuple, str] = {}
         self.helper_counter = 0
         self.helpers: List[ShellFunctionDef] = []
         self.steps: List[ShellTestStep] = []
@@ -57,103 +93,164 @@ class ShtestToShellFrameworkVisitor(ASTVisitor[ShellFrameworkAST]):
         return context.get("handler")
 
     def get_action_shell_command(self, action_command):
-        debug_enabled = is_debug_enabled()
-        if debug_enabled:
-            debug_log(
-                f"get_action_shell_command called with: '{action_command}'"
+        self._resolved_action = None
+        shell_cmd = self._resolve_action_shell_command(action_command)
+        if (
+            self.sql_cache
+            and shell_cmd
+            and getattr(self._resolved_action, "invalidates_sql_cache", True)
+        ):
+            # Anything but a read-only query may modify the database
+            return f"sql_cache_clear\n{shell_cmd}"
+        return shell_cmd
+
+    def _resolve_action_shell_command(self, action_command):
+        if tracing.handler:
+            trace(
+                "handler",
+                "_resolve_action_shell_command",
+                "called with: '%s'",
+                action_command,
             )
 
         # Use canonize_action to get the handler
         canon = canonize_action(action_command)
         if canon is None:
-            if debug_enabled:
-                debug_log(
-                    f"get_action_shell_command: canonize_action returned None for '{action_command}'"
+            if tracing.handler:
+                trace(
+                    "handler",
+                    "_resolve_action_shell_command",
+                    "canonize_action returned None for '%s'",
+                    action_command,
                 )
             return action_command  # fallback: raw command
         phrase, handler, pattern_entry = canon
-        if debug_enabled:
-            debug_log(
-                f"get_action_shell_command: canonize_action matched handler '{handler}' for phrase '{phrase}'"
+        if tracing.handler:
+            trace(
+                "handler",
+                "_resolve_action_shell_command",
+                "canonize_action matched handler '%s' for phrase '%s'",
+                handler,
+                phrase,
             )
 
         context = extract_context_from_action(action_command, handler)
-        if debug_enabled:
-            debug_log(f"get_action_shell_command: context={context}")
+        if tracing.handler:
+            trace("handler", "_resolve_action_shell_command", "context=%s", context)
 
         is_valid, errors = validate_action_context(context)
         if not is_valid:
-            if debug_enabled:
-                debug_log(
-                    f"get_action_shell_command: context validation failed: {errors}"
+            if tracing.handler:
+                trace(
+                    "handler",
+                    "_resolve_action_shell_command",
+                    "context validation failed: %s",
+                    errors,
                 )
             return action_command  # fallback: raw command
 
         variables = context.get("variables", {})
-        if debug_enabled:
-            debug_log(
-                f"get_action_shell_command: handler={handler}, variables={variables}"
+        if tracing.handler:
+            trace(
+                "handler",
+                "_resolve_action_shell_command",
+                "handler=%s, variables=%s",
+                handler,
+                variables,
             )
 
         try:
             # Try action handlers first (for actions)
             try:
-                if debug_enabled:
-                    debug_log(
-                        f"get_action_shell_command: Trying action handler: shtest_compiler.core.action_handlers.{handler}"
+                if tracing.handler:
+                    trace(
+                        "handler",
+                        "_resolve_action_shell_command",
+                        "Trying action handler: shtest_compiler.core.action_handlers.%s",
+                        handler,
                     )
                 core_module = importlib.import_module(
                     f"shtest_compiler.core.action_handlers.{handler}"
                 )
                 if hasattr(core_module, "handle"):
-                    params = {"context": context, **variables}
-                    if debug_enabled:
-                        debug_log(
-                            f"get_action_shell_command: Calling action handler with params={params}"
+                    params = {
+                        "context": context,
+                        "sql_session": self.sql_session,
+                        "sql_cache": self.sql_cache,
+                        **self.sql_variables,
+                        **variables,
+                    }
+                    if tracing.handler:
+                        trace(
+                            "handler",
+                            "_resolve_action_shell_command",
+                            "Calling action handler with params=%s",
+                            params,
                         )
-                    result = core_module.handle(params)
-                    if debug_enabled:
-                        debug_log(
-                            f"get_action_shell_command: Action handler returned={result}"
+                    result = call_handler(handler, core_module.handle, params)
+                    if tracing.handler:
+                        trace(
+                            "handler",
+                            "_resolve_action_shell_command",
+                            "Action handler returned=%s",
+                            result,
                         )
                     if hasattr(result, "to_shell"):
+                        self._resolved_action = result
                         shell_cmd = result.to_shell()
-                        if debug_enabled:
-                            debug_log(
-                                f"get_action_shell_command: Generated shell command: {shell_cmd}"
+                        if tracing.handler:
+                            trace(
+                                "handler",
+                                "_resolve_action_shell_command",
+                                "Generated shell command: %s",
+                                shell_cmd,
                             )
                         return shell_cmd
                     elif isinstance(result, str):
-                        if debug_enabled:
-                            debug_log(
-                                f"get_action_shell_command: Handler returned string: {result}"
+                        if tracing.handler:
+                            trace(
+                                "handler",
+                                "_resolve_action_shell_command",
+                                "Handler returned string: %s",
+                                result,
                             )
                         return result
                     else:
-                        if debug_enabled:
-                            debug_log(
-                                f"get_action_shell_command: Invalid return type from action handler"
+                        if tracing.handler:
+                            trace(
+                                "handler",
+                                "_resolve_action_shell_command",
+                                "Invalid return type from action handler",
                             )
                         return action_command
             except ImportError as e:
-                if debug_enabled:
-                    debug_log(
-                        f"get_action_shell_command: Action handler ImportError: {e}"
+                if tracing.handler:
+                    trace(
+                        "handler",
+                        "_resolve_action_shell_command",
+                        "Action handler ImportError: %s",
+                        e,
                     )
                 # Fallback to validation handlers (for validations)
                 try:
-                    if debug_enabled:
-                        debug_log(
-                            f"get_action_shell_command: Trying validation handler: shtest_compiler.core.handlers.{handler}"
+                    if tracing.handler:
+                        trace(
+                            "handler",
+                            "_resolve_action_shell_command",
+                            "Trying validation handler: shtest_compiler.core.handlers.%s",
+                            handler,
                         )
                     handler_registry, _, _ = build_registry()
                     handler_func = handler_registry.get(handler)
                     params = {"context": context, **variables}
                     if handler_func:
-                        result = handler_func(params)
-                        if debug_enabled:
-                            debug_log(
-                                f"get_action_shell_command: Validation handler returned={result}"
+                        result = call_handler(handler, handler_func, params)
+                        if tracing.handler:
+                            trace(
+                                "handler",
+                                "_resolve_action_shell_command",
+                                "Validation handler returned=%s",
+                                result,
                             )
                         if hasattr(result, "actual_cmd"):
                             return result.actual_cmd
@@ -164,20 +261,112 @@ class ShtestToShellFrameworkVisitor(ASTVisitor[ShellFrameworkAST]):
                     else:
                         return f"echo 'ERROR: Handler {handler} not found in registry'"
                 except ImportError as e:
-                    if debug_enabled:
-                        debug_log(
-                            f"get_action_shell_command: Validation handler ImportError: {e}"
+                    if tracing.handler:
+                        trace(
+                            "handler",
+                            "_resolve_action_shell_command",
+                            "Validation handler ImportError: %s",
+                            e,
                         )
                     return action_command
         except Exception as e:
             from shtest_compiler.utils.logger import log_pipeline_error
             import traceback
             log_pipeline_error(f"[ERROR] {type(e).__name__}: {e}\n{traceback.format_exc()}")
-            if debug_enabled:
-                debug_log(f"get_action_shell_command: Exception: {e}")
+            if tracing.handler:
+                trace("handler", "_resolve_action_shell_command", "Exception: %s", e)
             return action_command
 
+    def collect_sql_variables(self, node: ShtestFile) -> Dict[int, Dict[str, str]]:
+        """SQL_CONN/SQL_DRIVER values in force at each action, passed to SQL handlers.
+
+        A definition applies to the actions that follow it, until the next
+        one: a file may query several databases in turn.
+        """
+        sql_variables = dict(
+            (name, value)
+            for name, value in node.variables.items()
+            if name in ("SQL_CONN", "SQL_DRIVER")
+        )
+        in_force = {}
+        for step in node.steps:
+            for action in step.actions:
+                canon = canonize_action(action.command) if action.command else None
+                variable = (
+                    connection_variable(action.command)
+                    if canon and canon[1] == "export_var"
+                    else None
+                )
+                if variable:
+                    sql_variables = {**sql_variables, variable[0]: variable[1]}
+                in_force[id(action)] = sql_variables
+        return in_force
+
+    def definition_lines(self) -> List[str]:
+        """Define the variable of the action just resolved in the script itself.
+
+        ``run_action`` evaluates commands in a subshell, where a definition
+        would be lost for the following actions and the step checkpoints.
+        """
+        if getattr(self._resolved_action, "defines_variable", False):
+            return [self._resolved_action.to_shell()]
+        return []
+
+    def build_action(self, action: Action, shell_cmd=None):
+        """Build the call or inline code running *action* and its validations."""
+        key = self.canonical_action_key(action)
+        if key in self.helper_names:
+            context = extract_context_from_action(
+                action.command, self.get_handler_name(action.command)
+            )
+            variables = context.get("variables", {})
+            args = [variables.get(param, "") for param in self.extract_params(action)]
+            return ShellFunctionCall(name=self.helper_names[key], args=args)
+        if shell_cmd is None:
+            shell_cmd = (
+                self.get_action_shell_command(action.command)
+                if action.command
+                else action.command
+            )
+        lines = [
+            f"echo 'Action: {action.command}'",
+            f'run_action "{self.shell_escape_command(shell_cmd)}"',
+        ] + self.definition_lines()
+        if action.result_expr:
+            # Use parse_validation_expression for compound validations
+            lines += self.compile_validation_expression(
+                action.result_expr,
+                action_context={"command": action.command},
+            )
+        return InlineShellCode(code_lines=lines)
+
+    def build_sql_jobs(self, sql_jobs) -> list:
+        """Run a group of read-only SQL actions as concurrent background jobs.
+
+        All jobs are started first; each action then collects its own job, in
+        the original order, before its validations run.
+        """
+        if len(sql_jobs) < 2:
+            return [self.build_action(action, cmd) for action, cmd in sql_jobs]
+        job_ids = []
+        start_lines = []
+        for _, shell_cmd in sql_jobs:
+            self.sql_job_counter += 1
+            job_ids.append(self.sql_job_counter)
+            start_lines.append(job_start(self.sql_job_counter, shell_cmd))
+        nodes = [InlineShellCode(code_lines=start_lines)]
+        for job_id, (action, _) in zip(job_ids, sql_jobs):
+            lines = [f"echo 'Action: {action.command}'", job_collect(job_id)]
+            if action.result_expr:
+                lines += self.compile_validation_expression(
+                    action.result_expr,
+                    action_context={"command": action.command},
+                )
+            nodes.append(InlineShellCode(code_lines=lines))
+        return nodes
+
     def visit_shtestfile(self, node: ShtestFile) -> ShellFrameworkAST:
+        self.action_sql_variables = self.collect_sql_variables(node)
         # First pass: count occurrences
         for step in node.steps:
             for action in step.actions:
@@ -190,7 +379,8 @@ class ShtestToShellFrameworkVisitor(ASTVisitor[ShellFrameworkAST]):
                 self.helper_names[key] = f"helper_{self.helper_counter}"
         # Build helpers
         for key, name in self.helper_names.items():
-            cmd, res = key
+            cmd, res, sql_variables = key
+            self.sql_variables = dict(sql_variables)
             params = self.extract_params(
                 Action(command=cmd, result_expr=res, result_ast=None, lineno=0)
             )
@@ -199,7 +389,7 @@ class ShtestToShellFrameworkVisitor(ASTVisitor[ShellFrameworkAST]):
                 action_lines = [
                     f"echo 'Action: {cmd}'",
                     f'run_action "{self.shell_escape_command(shell_cmd)}"',
-                ]
+                ] + self.definition_lines()
                 # Use parse_validation_expression for compound validations
                 validation_lines = self.compile_validation_expression(
                     res, action_context={"command": cmd}
@@ -213,7 +403,7 @@ class ShtestToShellFrameworkVisitor(ASTVisitor[ShellFrameworkAST]):
                 lines = [
                     f"echo 'Action: {cmd}'",
                     f'run_action "{self.shell_escape_command(shell_cmd)}"',
-                ]
+                ] + self.definition_lines()
                 self.helpers.append(
                     ShellFunctionDef(name=name, params=params, body_lines=lines)
                 )
@@ -221,51 +411,31 @@ class ShtestToShellFrameworkVisitor(ASTVisitor[ShellFrameworkAST]):
         for step in node.steps:
             actions = []
             validations = []
+            sql_jobs = []
             for action in step.actions:
-                key = self.canonical_action_key(action)
-                if key in self.helper_names:
-                    context = extract_context_from_action(
-                        action.command, self.get_handler_name(action.command)
-                    )
-                    variables = context.get("variables", {})
-                    args = [
-                        variables.get(param, "")
-                        for param in self.extract_params(action)
-                    ]
-                    actions.append(
-                        ShellFunctionCall(name=self.helper_names[key], args=args)
-                    )
-                else:
-                    if action.result_expr:
-                        shell_cmd = (
-                            self.get_action_shell_command(action.command)
-                            if action.command
-                            else action.command
-                        )
-                        action_lines = [
-                            f"echo 'Action: {action.command}'",
-                            f'run_action "{self.shell_escape_command(shell_cmd)}"',
-                        ]
-                        # Use parse_validation_expression for compound validations
-                        validation_lines = self.compile_validation_expression(
-                            action.result_expr,
-                            action_context={"command": action.command},
-                        )
-                        all_lines = action_lines + validation_lines
-                        actions.append(InlineShellCode(code_lines=all_lines))
-                    else:
-                        shell_cmd = (
-                            self.get_action_shell_command(action.command)
-                            if action.command
-                            else action.command
-                        )
-                        lines = [
-                            f"echo 'Action: {action.command}'",
-                            f'run_action "{self.shell_escape_command(shell_cmd)}"',
-                        ]
-                        actions.append(InlineShellCode(code_lines=lines))
+                self.sql_variables = self.action_sql_variables.get(id(action), {})
+                shell_cmd = None
+                if self.sql_jobs > 1 and action.command:
+                    shell_cmd = self.get_action_shell_command(action.command)
+                    if is_concurrent(self._resolved_action):
+                        sql_jobs.append((action, shell_cmd))
+                        continue
+                actions.extend(self.build_sql_jobs(sql_jobs))
+                sql_jobs = []
+                actions.append(self.build_action(action, shell_cmd))
+            actions.extend(self.build_sql_jobs(sql_jobs))
+            fixture = (
+                detect_fixture([action.command for action in step.actions])
+                if self.fixture_cache
+                else None
+            )
             self.steps.append(
-                ShellTestStep(name=step.name, actions=actions, validations=validations)
+                ShellTestStep(
+                    name=step.name,
+                    actions=actions,
+                    validations=validations,
+                    fixture=fixture,
+                )
             )
         # Add prologue
         self.global_code = [
@@ -273,7 +443,20 @@ class ShtestToShellFrameworkVisitor(ASTVisitor[ShellFrameworkAST]):
             "",
             "# Generated shell script from .shtest file",
             "",
+            "# Per-run scratch area for temporary files (SQL exports, comparisons...)",
+            'SHTEST_TMPDIR=$(mktemp -d "${TMPDIR:-/tmp}/shtest.XXXXXX") || exit 1',
+            "# Digests computed during the run (checksum and file comparisons)",
+            'export SHTEST_HASH_CACHE="$SHTEST_TMPDIR/hashes"',
+            (
+                session_trap()
+                if self.sql_session
+                else jobs_trap()
+                if self.sql_jobs > 1
+                else "trap 'rm -rf \"$SHTEST_TMPDIR\"' EXIT"
+            ),
+            "",
             "run_action() {",
+            *(fixture_skip() if self.fixture_cache else []),
             '    local cmd="$1"',
             '    stdout=""',
             '    stderr=""',
@@ -299,7 +482,15 @@ class ShtestToShellFrameworkVisitor(ASTVisitor[ShellFrameworkAST]):
             "    return 0",
             "}",
             "",
+            "# Print a file, decompressing gzip/zstd/bzip2/xz content on the fly",
+            *reader_prologue(),
         ]
+        if self.sql_session:
+            self.global_code.extend(session_prologue())
+        if self.sql_cache:
+            self.global_code.extend(cache_prologue())
+        if self.sql_jobs > 1:
+            self.global_code.extend(jobs_prologue(self.sql_jobs))
         return ShellFrameworkAST(
             helpers=self.helpers, steps=self.steps, global_code=self.global_code
         )
@@ -308,38 +499,45 @@ class ShtestToShellFrameworkVisitor(ASTVisitor[ShellFrameworkAST]):
         self, expression: str, action_context: dict = None
     ) -> List[str]:
         """Compile a validation expression, handling both atomic and compound expressions."""
-        debug_enabled = is_debug_enabled()
-        if debug_enabled:
-            debug_log(
-                f"compile_validation_expression called with: '{expression}'"
+        if tracing.emitter:
+            trace(
+                "emitter",
+                "compile_validation_expression",
+                "compile_validation_expression called with: '%s'",
+                expression,
             )
         # Check if the expression contains logical operators
-        if (
-            " et " in expression
-            or " ou " in expression
-            or "(" in expression
-            or ")" in expression
-        ):
+        if is_compound_expression(expression):
             # This is a compound expression, use the shunting yard parser
-            if debug_enabled:
-                debug_log(
-                    f"compile_validation_expression: Detected compound expression, using parse_validation_expression"
+            if tracing.emitter:
+                trace(
+                    "emitter",
+                    "compile_validation_expression",
+                    "Detected compound expression, using parse_validation_expression",
                 )
             try:
                 ast = parse_validation_expression(expression)
-                if debug_enabled:
-                    debug_log(f"compile_validation_expression: AST={ast}")
-                visitor = ShellFrameworkToShellScriptVisitor()
+                if tracing.emitter:
+                    trace("emitter", "compile_validation_expression", "AST=%s", ast)
+                visitor = ShellFrameworkToShellScriptVisitor(
+                    failure_policy=self.failure_policy
+                )
                 shell_lines = visitor.visit(ast)
-                if debug_enabled:
-                    debug_log(
-                        f"compile_validation_expression: Generated {len(shell_lines)} shell lines for compound expression"
+                if tracing.emitter:
+                    trace(
+                        "emitter",
+                        "compile_validation_expression",
+                        "Generated %s shell lines for compound expression",
+                        len(shell_lines),
                     )
                 return shell_lines
             except Exception as e:
-                if debug_enabled:
-                    debug_log(
-                        f"compile_validation_expression: Error parsing compound expression: {e}"
+                if tracing.emitter:
+                    trace(
+                        "emitter",
+                        "compile_validation_expression",
+                        "Error parsing compound expression: %s",
+                        e,
                     )
                 # Fallback to atomic compilation
                 return compile_atomic(
@@ -350,9 +548,11 @@ class ShtestToShellFrameworkVisitor(ASTVisitor[ShellFrameworkAST]):
                 )
         else:
             # This is an atomic expression, use compile_atomic
-            if debug_enabled:
-                debug_log(
-                    f"compile_validation_expression: Detected atomic expression, using compile_atomic"
+            if tracing.emitter:
+                trace(
+                    "emitter",
+                    "compile_validation_expression",
+                    "Detected atomic expression, using compile_atomic",
                 )
             return compile_atomic(
                 expression,
@@ -366,5 +566,11 @@ class ShtestToShellFrameworkVisitor(ASTVisitor[ShellFrameworkAST]):
             f"No visit_{type(node).__name__} method implemented in ShtestToShellFrameworkVisitor"
         )
 
-    def canonical_action_key(self, action: Action) -> Tuple[str, str]:
-        return (action.command or "", action.result_expr or "")
+    def canonical_action_key(self, action: Action) -> Tuple:
+        # An action repeated under another connection compiles differently
+        sql_variables = self.action_sql_variables.get(id(action), {})
+        return (
+            action.command or "",
+            action.result_expr or "",
+            tuple(sorted(sql_variables.items())),
+        )
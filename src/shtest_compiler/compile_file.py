@@ -12,6 +12,7 @@ from typing import Optional
 
 from .command_loader import build_registry
 from .compiler.compiler import ModularCompiler
+from .compiler.failure_policy import FAIL_FAST
 from .utils.logger import debug_log, is_debug_enabled
 
 
@@ -23,6 +24,12 @@ def compile_file(
     debug: bool = False,
     plugin_dir: Optional[str] = None,
     debug_output_path: Optional[str] = None,
+    failure_policy: str = FAIL_FAST,
+    checkpoints: bool = False,
+    fixture_cache: bool = False,
+    sql_session: bool = False,
+    sql_cache: bool = False,
+    sql_jobs: int = 1,
 ) -> str:
     """
     Compile a .shtest file to a shell script using the modular compiler.
@@ -35,6 +42,12 @@ def compile_file(
         debug: Enable debug mode (deprecated, use global debug config)
         plugin_dir: Optional directory to load plugins from
         debug_output_path: Path to debug output file (optional)
+        failure_policy: Behaviour of the generated script on a failing validation
+        checkpoints: Let the generated script resume with --from-step/--only-step
+        fixture_cache: Restore file-only setup steps from cached snapshots
+        sql_session: Run SQL actions through one persistent session per connection
+        sql_cache: Reuse read-only query results until an action may write
+        sql_jobs: Run up to this many consecutive read-only SQL actions at once
 
     Returns:
         Path to the generated shell script
@@ -48,6 +61,12 @@ def compile_file(
         ast_builder_name=ast_builder,
         debug=debug_enabled,
         debug_output_path=debug_output_path,
+        failure_policy=failure_policy,
+        checkpoints=checkpoints,
+        fixture_cache=fixture_cache,
+        sql_session=sql_session,
+        sql_cache=sql_cache,
+        sql_jobs=sql_jobs,
     )
 
     # Compile the file
@@ -63,6 +82,12 @@ def compile_text(
     ast_builder: str = "default",
     debug: bool = False,
     debug_output_path: Optional[str] = None,
+    failure_policy: str = FAIL_FAST,
+    checkpoints: bool = False,
+    fixture_cache: bool = False,
+    sql_session: bool = False,
+    sql_cache: bool = False,
+    sql_jobs: int = 1,
 ) -> str:
     """
     Compile .shtest text to a shell script using the modular compiler.
@@ -74,6 +99,12 @@ def compile_text(
         ast_builder: Name of the AST builder to use
         debug: Enable debug mode (deprecated, use global debug config)
         debug_output_path: Path to debug output file (optional)
+        failure_policy: Behaviour of the generated script on a failing validation
+        checkpoints: Let the generated script resume with --from-step/--only-step
+        fixture_cache: Restore file-only setup steps from cached snapshots
+        sql_session: Run SQL actions through one persistent session per connection
+        sql_cache: Reuse read-only query results until an action may write
+        sql_jobs: Run up to this many consecutive read-only SQL actions at once
 
     Returns:
         Path to the generated shell script
@@ -87,6 +118,12 @@ def compile_text(
         ast_builder_name=ast_builder,
         debug=debug_enabled,
         debug_output_path=debug_output_path,
+        failure_policy=failure_policy,
+        checkpoints=checkpoints,
+        fixture_cache=fixture_cache,
+        sql_session=sql_session,
+        sql_cache=sql_cache,
+        sql_jobs=sql_jobs,
     )
 
     # Compile the text
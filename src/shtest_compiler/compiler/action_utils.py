@@ -1,3 +1,4 @@
+import functools
 import os
 import re
 from pathlib import Path
@@ -5,7 +6,8 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
 
-from shtest_compiler.utils.logger import debug_log, is_debug_enabled
+from shtest_compiler.utils.logger import trace, tracing
+from shtest_compiler.compiler.profiling import measured
 from shtest_compiler.utils.shell_utils import resource_path
 
 # ============================================================================
@@ -17,12 +19,27 @@ def get_config_path(config_file: str) -> str:
     return resource_path(f"config/{config_file}")
 
 
+# Parsed configuration files by path, with the (mtime, size) they were read
+# at: a file is parsed again only once it changes on disk.
+_config_cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+
+
+@measured("load_yaml_config")
 def load_yaml_config(config_file: str) -> Dict[str, Any]:
+    """Parsed content of a config file; shared between callers, do not modify."""
     config_path = get_config_path(config_file)
-    if not os.path.exists(config_path):
+    try:
+        stat = os.stat(config_path)
+    except OSError:
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _config_cache.get(config_path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
     with open(config_path, encoding="utf-8") as f:
-        return yaml.safe_load(f)
+        data = yaml.safe_load(f)
+    _config_cache[config_path] = (version, data)
+    return data
 
 
 def validate_handler_name(handler_name: str) -> bool:
@@ -89,10 +106,12 @@ def extract_variables_from_pattern(pattern: str) -> List[str]:
     return variables
 
 
+@functools.lru_cache(maxsize=None)
 def build_regex_from_pattern(pattern: str, case_sensitive: bool = False) -> str:
     """
     Convert a pattern with placeholders to a regex pattern.
     Uses variable placeholders from patterns_actions.yml and patterns_validations.yml.
+    The result only depends on the arguments, so each pattern is converted once.
     """
     import re
 
@@ -144,52 +163,68 @@ def match_pattern_with_variables(
 # ============================================================================
 
 
+@measured("canonize_action")
 def canonize_action(action: str) -> Optional[tuple]:
     """
     Canonicalize an action command to find the appropriate handler.
     Returns (canonical_phrase, handler_name, pattern_entry) or None if not found
     """
-    debug_enabled = is_debug_enabled()
-
     try:
         data = load_yaml_config("patterns_actions.yml")
         action_patterns = data.get("actions", [])
-        if debug_enabled:
-            debug_log(
-                f"canonize_action: Loaded {len(action_patterns)} action patterns"
+        if tracing.registry:
+            trace(
+                "registry",
+                "canonize_action",
+                "Loaded %s action patterns",
+                len(action_patterns),
             )
     except (FileNotFoundError, yaml.YAMLError) as e:
-        if debug_enabled:
-            debug_log(f"canonize_action: Failed to load patterns: {e}")
+        if tracing.registry:
+            trace("registry", "canonize_action", "Failed to load patterns: %s", e)
         return None
 
     action_lower = action.lower().strip()
-    if debug_enabled:
-        debug_log(
-            f"canonize_action: Processing action '{action}' (normalized: '{action_lower}')"
+    if tracing.registry:
+        trace(
+            "registry",
+            "canonize_action",
+            "Processing action '%s' (normalized: '%s')",
+            action,
+            action_lower,
         )
 
     for pattern_entry in action_patterns:
         phrase = pattern_entry["phrase"]
         handler = pattern_entry["handler"]
-        if debug_enabled:
-            debug_log(
-                f"canonize_action: Checking pattern '{phrase}' with handler '{handler}'"
+        if tracing.registry:
+            trace(
+                "registry",
+                "canonize_action",
+                "Checking pattern '%s' with handler '%s'",
+                phrase,
+                handler,
             )
 
         # If the phrase contains {var}, treat as pattern
         if "{" in phrase and "}" in phrase:
             # Convert to regex
             regex_pattern = build_regex_from_pattern(phrase)
-            if debug_enabled:
-                debug_log(
-                    f"canonize_action: Testing regex pattern '{regex_pattern}'"
+            if tracing.registry:
+                trace(
+                    "registry",
+                    "canonize_action",
+                    "Testing regex pattern '%s'",
+                    regex_pattern,
                 )
             match = re.match(regex_pattern, action, re.IGNORECASE)
             if match:
-                if debug_enabled:
-                    debug_log(
-                        f"canonize_action: Found match with pattern '{phrase}'"
+                if tracing.registry:
+                    trace(
+                        "registry",
+                        "canonize_action",
+                        "Found match with pattern '%s'",
+                        phrase,
                     )
                 return (
                     pattern_entry["phrase"],
@@ -198,29 +233,38 @@ def canonize_action(action: str) -> Optional[tuple]:
                 )
         # Check exact phrase match
         if phrase.lower() == action_lower:
-            if debug_enabled:
-                debug_log(
-                    f"canonize_action: Found exact match with pattern '{phrase}'"
+            if tracing.registry:
+                trace(
+                    "registry",
+                    "canonize_action",
+                    "Found exact match with pattern '%s'",
+                    phrase,
                 )
             return (pattern_entry["phrase"], pattern_entry["handler"], pattern_entry)
         # Check aliases
         for alias in pattern_entry.get("aliases", []):
             if not isinstance(alias, str):
                 continue
-            if debug_enabled:
-                debug_log(f"canonize_action: Checking alias '{alias}'")
+            if tracing.registry:
+                trace("registry", "canonize_action", "Checking alias '%s'", alias)
             # If alias contains {var}, treat as pattern
             if "{" in alias and "}" in alias:
                 regex_pattern = build_regex_from_pattern(alias)
-                if debug_enabled:
-                    debug_log(
-                        f"canonize_action: Testing alias regex '{regex_pattern}'"
+                if tracing.registry:
+                    trace(
+                        "registry",
+                        "canonize_action",
+                        "Testing alias regex '%s'",
+                        regex_pattern,
                     )
                 match = re.match(regex_pattern, action, re.IGNORECASE)
                 if match:
-                    if debug_enabled:
-                        debug_log(
-                            f"canonize_action: Found match with alias '{alias}'"
+                    if tracing.registry:
+                        trace(
+                            "registry",
+                            "canonize_action",
+                            "Found match with alias '%s'",
+                            alias,
                         )
                     return (
                         pattern_entry["phrase"],
@@ -229,9 +273,12 @@ def canonize_action(action: str) -> Optional[tuple]:
                     )
             # Exact match
             if alias.lower() == action_lower:
-                if debug_enabled:
-                    debug_log(
-                        f"canonize_action: Found exact match with alias '{alias}'"
+                if tracing.registry:
+                    trace(
+                        "registry",
+                        "canonize_action",
+                        "Found exact match with alias '%s'",
+                        alias,
                     )
                 return (
                     pattern_entry["phrase"],
@@ -241,14 +288,20 @@ def canonize_action(action: str) -> Optional[tuple]:
             # Regex alias
             if alias.startswith("^") and alias.endswith("$"):
                 try:
-                    if debug_enabled:
-                        debug_log(
-                            f"canonize_action: Testing regex alias '{alias}'"
+                    if tracing.registry:
+                        trace(
+                            "registry",
+                            "canonize_action",
+                            "Testing regex alias '%s'",
+                            alias,
                         )
                     if re.match(alias, action_lower, re.IGNORECASE):
-                        if debug_enabled:
-                            debug_log(
-                                f"canonize_action: Found match with regex alias '{alias}'"
+                        if tracing.registry:
+                            trace(
+                                "registry",
+                                "canonize_action",
+                                "Found match with regex alias '%s'",
+                                alias,
                             )
                         return (
                             pattern_entry["phrase"],
@@ -258,8 +311,8 @@ def canonize_action(action: str) -> Optional[tuple]:
                 except re.error:
                     continue
 
-    if debug_enabled:
-        debug_log(f"canonize_action: No match found for action '{action}'")
+    if tracing.registry:
+        trace("registry", "canonize_action", "No match found for action '%s'", action)
     return None
 
 
@@ -282,6 +335,7 @@ def extract_action_groups(action: str, pattern: str) -> List[str]:
     return []
 
 
+@measured("canonize_validation")
 def canonize_validation(validation: str) -> Optional[tuple]:
     """
     Canonicalize a validation command to find the appropriate handler.
@@ -478,6 +532,7 @@ def get_handler_requirements(handler_name: str) -> Dict[str, Any]:
     }
 
 
+@measured("extract_context_from_action")
 def extract_context_from_action(action: str, handler_name: str) -> Dict[str, Any]:
     """
     Extract context information from an action command using modular pattern matching.
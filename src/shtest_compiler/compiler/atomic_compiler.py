@@ -5,49 +5,47 @@ This module provides the core compilation logic for converting validation
 expressions into shell code.
 """
 
-import os
 import re
 from typing import Any, List, Optional, Tuple, Union
 
-import yaml
-
 from shtest_compiler.compiler.action_utils import (
     canonize_validation,
     extract_context_from_action,
+    load_yaml_config,
     validate_action_context,
 )
+from shtest_compiler.compiler.profiling import call_handler, measured
 from shtest_compiler.core.errors import ValidationParseError
 from shtest_compiler.utils.shell_utils import shell_escape
 from shtest_compiler.command_loader import build_registry
 
-from ..utils.logger import debug_log, is_debug_enabled
+from ..utils.logger import debug_log, trace, tracing
 
 
-def compile_atomic(
-    expected: str,
-    varname: str = "result",
-    last_file_var: Optional[str] = None,
-    extracted_args: Optional[dict] = None,
-    action_context: Optional[dict] = None,
-) -> List[str]:
-    debug_enabled = is_debug_enabled()
-    if debug_enabled:
-        debug_log(
-            f"compile_atomic called with: expected='{expected}', varname='{varname}', last_file_var={last_file_var}, extracted_args={extracted_args}, action_context={action_context}"
-        )
-    # Add debug output for alias matching
-    if debug_enabled:
-        debug_log(
-            f"compile_atomic: Trying to canonize validation: '{expected}'"
+def resolve_validation(expected: str) -> Tuple[Optional[dict], Optional[dict], Optional[str]]:
+    """Match *expected* to its validation handler and extract its variables.
+
+    Returns ``(canon, context, error)``: *canon* is None when no validation
+    pattern matches, and *error* says why the phrase cannot be compiled.
+    """
+    if tracing.handler:
+        trace(
+            "handler",
+            "resolve_validation",
+            "Trying to canonize validation: '%s'",
+            expected,
         )
-    # Use modular context extraction instead of manual canonization and argument extraction
     canon = canonize_validation(expected)
-    if debug_enabled:
-        debug_log(
-            f"compile_atomic: canonize_validation('{expected}') result: {canon}"
+    if tracing.handler:
+        trace(
+            "handler",
+            "resolve_validation",
+            "canonize_validation('%s') result: %s",
+            expected,
+            canon,
         )
     if not canon:
-        raise ValidationParseError(f"No matcher found for validation: '{expected}'")
+        return None, None, f"No matcher found for validation: '{expected}'"
 
     handler = canon["handler"]
     phrase = canon["phrase"]
@@ -67,38 +65,61 @@ def compile_atomic(
 
     # Extract context using the modular system
     context = extract_context_from_action(expected, handler)
-    if debug_enabled:
-        debug_log(f"extract_context_from_action result: {context}")
+    if tracing.handler:
+        trace("handler", "resolve_validation", "extract_context_from_action result: %s", context)
 
     # Merge injected params into context variables
     context_vars = context.get("variables", {}).copy()
     context_vars.update(params)
     context["variables"] = context_vars
-    # Validate the context
-    is_valid, errors = validate_action_context(context)
-    if not is_valid:
-        error_msg = f"Validation context errors for '{expected}': {', '.join(errors)}"
-        if debug_enabled:
-            debug_log(f"{error_msg}")
-        raise ValidationParseError(error_msg)
+    _, errors = validate_action_context(context)
+    if errors:
+        return canon, context, f"Validation context errors for '{expected}': {', '.join(errors)}"
+    return canon, context, None
+
+
+def compile_atomic(
+    expected: str,
+    varname: str = "result",
+    last_file_var: Optional[str] = None,
+    extracted_args: Optional[dict] = None,
+    action_context: Optional[dict] = None,
+) -> List[str]:
+    if tracing.handler:
+        trace(
+            "handler",
+            "compile_atomic",
+            "compile_atomic called with: expected='%s', varname='%s', last_file_var=%s, extracted_args=%s, action_context=%s",
+            expected,
+            varname,
+            last_file_var,
+            extracted_args,
+            action_context,
+        )
+    canon, context, error = resolve_validation(expected)
+    if error:
+        if tracing.handler:
+            trace("handler", "compile_atomic", "%s", error)
+        raise ValidationParseError(error)
 
-    # Add extra context for backward compatibility
-    params.update(context.get("variables", {}))
+    handler = canon["handler"]
+    # The context variables include the params injected for the phrase
+    params = dict(context.get("variables", {}))
 
     # Add any additional extracted args
     if extracted_args:
         params.update(extracted_args)
 
-    if debug_enabled:
-        debug_log(f"Final params for handler: {params}")
+    if tracing.handler:
+        trace("handler", "compile_atomic", "Final params for handler: %s", params)
 
     handler_registry, _, _ = build_registry()
     handler_func = handler_registry.get(handler)
     if handler_func:
         try:
-            result = handler_func(params)
-            if debug_enabled:
-                debug_log(f"Handler registry returned: {result}")
+            result = call_handler(handler, handler_func, params)
+            if tracing.handler:
+                trace("handler", "compile_atomic", "Handler registry returned: %s", result)
             if hasattr(result, "expected") and hasattr(result, "actual_cmd"):
                 return [result]
             elif isinstance(result, list):
@@ -112,31 +133,58 @@ def compile_atomic(
             from shtest_compiler.utils.logger import log_pipeline_error
             stack = traceback.format_exc()
             log_pipeline_error(f"Exception in handler {handler}: {e}\n{stack}")
-            if debug_enabled:
-                debug_log(f"Exception in handler {handler}: {e}")
+            if tracing.handler:
+                trace("handler", "compile_atomic", "Exception in handler %s: %s", handler, e)
             return [f"echo 'ERROR: Exception in handler {handler}: {e}'"]
     else:
         return [f"echo 'ERROR: Handler {handler} not found in registry'"]
 
 
+# Validation patterns prepared for matching, with the configuration they
+# were prepared from
+_validation_table: Optional[Tuple[Any, List[tuple]]] = None
+
+
+def _validation_patterns(data) -> List[tuple]:
+    """``(entry, phrase_lower, param_names, phrase_regex, aliases)`` per pattern."""
+    global _validation_table
+    if _validation_table is None or _validation_table[0] is not data:
+        table = []
+        for pattern_entry in data.get("validations", []):
+            phrase = pattern_entry["phrase"]
+            # Extract parameter names from phrase
+            param_names = re.findall(r"\{([^}]+)\}", phrase)
+            # Placeholder regex for phrase
+            phrase_regex = (
+                re.compile("^" + re.sub(r"\{[^}]+\}", r"(.+)", phrase) + "$")
+                if param_names
+                else None
+            )
+            aliases = [
+                (
+                    alias,
+                    alias.lower(),
+                    # Regex alias
+                    re.compile(alias) if alias.startswith("^") and alias.endswith("$") else None,
+                )
+                for alias in pattern_entry.get("aliases", [])
+            ]
+            table.append((pattern_entry, phrase.lower(), param_names, phrase_regex, aliases))
+        _validation_table = (data, table)
+    return _validation_table[1]
+
+
+@measured("atomic_compiler.canonize_validation")
 def canonize_validation(validation: str):
-    patterns_path = os.path.join(
-        os.path.dirname(__file__), "../config/patterns_validations.yml"
-    )
-    if not os.path.exists(patterns_path):
+    try:
+        data = load_yaml_config("patterns_validations.yml")
+    except FileNotFoundError:
         return None
-    with open(patterns_path, encoding="utf-8") as f:
-        data = yaml.safe_load(f)
-        validation_patterns = data.get("validations", [])
     validation_lower = validation.lower().strip()
-    for pattern_entry in validation_patterns:
+    for pattern_entry, phrase_lower, param_names, phrase_regex, aliases in _validation_patterns(data):
         phrase = pattern_entry["phrase"]
-        # Extract parameter names from phrase
-        param_names = re.findall(r"\{([^}]+)\}", phrase)
-        # Placeholder regex for phrase
-        if param_names:
-            placeholder_regex = "^" + re.sub(r"\{[^}]+\}", r"(.+)", phrase) + "$"
-            match = re.match(placeholder_regex, validation_lower)
+        if phrase_regex is not None:
+            match = phrase_regex.match(validation_lower)
             if match:
                 groups = list(match.groups())
                 params = dict(zip(param_names, groups))
@@ -148,7 +196,7 @@ def canonize_validation(validation: str):
                     "params": params,
                 }
         # Exact match
-        if phrase.lower() == validation_lower:
+        if phrase_lower == validation_lower:
             return {
                 "phrase": phrase,
                 "handler": pattern_entry["handler"],
@@ -157,8 +205,8 @@ def canonize_validation(validation: str):
                 "params": {},
             }
         # Aliases
-        for alias in pattern_entry.get("aliases", []):
-            if alias.lower() == validation_lower:
+        for alias, alias_lower, alias_regex in aliases:
+            if alias_lower == validation_lower:
                 return {
                     "phrase": alias,
                     "handler": pattern_entry["handler"],
@@ -166,10 +214,8 @@ def canonize_validation(validation: str):
                     "pattern_entry": pattern_entry,
                     "params": {},
                 }
-            # Regex alias
-            if alias.startswith("^") and alias.endswith("$"):
-                regex = alias
-                match = re.match(regex, validation_lower)
+            if alias_regex is not None:
+                match = alias_regex.match(validation_lower)
                 if match:
                     groups = list(match.groups()) if match else []
                     # Try to extract param names from alias if possible
@@ -245,6 +291,6 @@ def compile_validation_with_debug(
         List of shell code lines
     """
     lines = compile_atomic(validation, varname, last_file_var)
-    if is_debug_enabled():
-        debug_log(f"compile_atomic returning lines: {lines}")
+    if tracing.handler:
+        trace("handler", "compile_validation_with_debug", "compile_atomic returning lines: %s", lines)
     return lines
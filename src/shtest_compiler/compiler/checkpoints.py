@@ -0,0 +1,98 @@
+"""
+Step checkpointing for generated shell scripts.
+
+When checkpoints are enabled, every step that passes writes a marker and a
+snapshot of the variables the test exported into ``$SHTEST_CHECKPOINT_DIR``
+(``.shtest_checkpoints/<script>`` by default). The generated script then
+accepts ``--from-step N`` to resume after the checkpoint of step ``N-1`` and
+``--only-step N`` to replay a single step. The workspace itself (files,
+database) is left as the previous run produced it.
+"""
+
+from typing import List
+
+# Variables managed by the shell itself, and those of the run (scratch area,
+# digest cache...), must not be restored from a checkpoint.
+_VOLATILE_VARIABLES = "OLDPWD|PWD|SHLVL|_|SHTEST_[A-Za-z0-9_]*"
+
+
+def checkpoint_prologue() -> List[str]:
+    """Argument parsing, checkpoint helpers and variable restoration."""
+    return [
+        "SHTEST_FROM_STEP=1",
+        'SHTEST_ONLY_STEP=""',
+        "while [ $# -gt 0 ]; do",
+        '    case "$1" in',
+        '        --from-step) SHTEST_FROM_STEP="$2"; shift 2 ;;',
+        '        --from-step=*) SHTEST_FROM_STEP="${1#*=}"; shift ;;',
+        '        --only-step) SHTEST_ONLY_STEP="$2"; shift 2 ;;',
+        '        --only-step=*) SHTEST_ONLY_STEP="${1#*=}"; shift ;;',
+        '        *) echo "Unknown option: $1" >&2; exit 2 ;;',
+        "    esac",
+        "done",
+        'SHTEST_START_STEP="${SHTEST_ONLY_STEP:-$SHTEST_FROM_STEP}"',
+        'SHTEST_CHECKPOINT_DIR="${SHTEST_CHECKPOINT_DIR:-.shtest_checkpoints/'
+        '$(basename "$0" .sh)}"',
+        'mkdir -p "$SHTEST_CHECKPOINT_DIR"',
+        "# Checkpoints only keep what the test exported or changed since here",
+        'SHTEST_INITIAL_ENV="$(export -p)"',
+        "",
+        "should_run_step() {",
+        '    if [ -n "$SHTEST_ONLY_STEP" ]; then',
+        '        [ "$1" -eq "$SHTEST_ONLY_STEP" ]',
+        "    else",
+        '        [ "$1" -ge "$SHTEST_FROM_STEP" ]',
+        "    fi",
+        "}",
+        "",
+        "checkpoint_step() {",
+        '    if [ "${SHTEST_STEP_FAILURES:-0}" -gt 0 ]; then',
+        "        return 0",
+        "    fi",
+        '    export -p | grep -v -x -F -e "$SHTEST_INITIAL_ENV" '
+        f"| grep -v -E '^declare -x ({_VOLATILE_VARIABLES})(=|$)' "
+        '> "$SHTEST_CHECKPOINT_DIR/step_$1.env"',
+        '    echo "$2" > "$SHTEST_CHECKPOINT_DIR/step_$1.done"',
+        "}",
+        "",
+        "# Forget checkpoints that the current run is about to replace",
+        'for marker in "$SHTEST_CHECKPOINT_DIR"/step_*.done; do',
+        '    [ -e "$marker" ] || continue',
+        '    marker_step="${marker##*/step_}"',
+        '    marker_step="${marker_step%.done}"',
+        '    if [ "$marker_step" -ge "$SHTEST_START_STEP" ]; then',
+        '        rm -f "$marker" "${marker%.done}.env"',
+        "    fi",
+        "done",
+        "",
+        "# Restore the variables exported by the steps that are skipped",
+        "SHTEST_RESUME_STEP=$((SHTEST_START_STEP - 1))",
+        'if [ "$SHTEST_RESUME_STEP" -ge 1 ]; then',
+        '    if [ ! -f "$SHTEST_CHECKPOINT_DIR/step_$SHTEST_RESUME_STEP.done" ]; then',
+        '        echo "No checkpoint for step $SHTEST_RESUME_STEP in '
+        '$SHTEST_CHECKPOINT_DIR" >&2',
+        "        exit 2",
+        "    fi",
+        '    . "$SHTEST_CHECKPOINT_DIR/step_$SHTEST_RESUME_STEP.env"',
+        '    echo "Resuming after step $SHTEST_RESUME_STEP"',
+        "fi",
+        "",
+    ]
+
+
+def step_guard_open(number: int) -> List[str]:
+    """Open the block that skips a step outside the requested range."""
+    return [f"if should_run_step {number}; then"]
+
+
+def step_checkpoint(number: int, escaped_name: str) -> List[str]:
+    """Record the checkpoint of a step if none of its validations failed.
+
+    *escaped_name* must already be escaped for a single-quoted shell string.
+    """
+    return [f"checkpoint_step {number} '{escaped_name}'"]
+
+
+def step_guard_close() -> List[str]:
+    """Close the block opened by :func:`step_guard_open`."""
+    return ["fi"]
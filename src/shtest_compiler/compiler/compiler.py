@@ -12,16 +12,25 @@ from typing import Any, Dict, Optional
 from shtest_compiler.ast.visitor import ASTVisitor
 
 from ..ast.shell_framework_ast import pretty_print_ast
-from ..utils.logger import debug_log, is_debug_enabled, export_log
+from ..utils.logger import debug_log, is_debug_enabled, export_log, log_warning, start_log_scope
 from ..core.context import CompileContext
 from ..parser import ConfigurableParser, ast_builder_registry, grammar_registry
+from ..parser.core import ParseError
 from ..parser.shtest_ast import ShtestFile
+from .failure_policy import FAIL_FAST, check_failure_policy
 from .matcher_registry import MatcherRegistry
+from .profiling import stage
 from .shell_generator import ShellGenerator
 
 
 class ModularCompiler:
-    """Enhanced compiler that uses the modular parser system."""
+    """Enhanced compiler that uses the modular parser system.
+
+    One instance may compile several files at once from a thread pool: each
+    compilation gets its own context and log scope, and the parser and the
+    pattern indexes are only read while compiling. Reconfigure the instance
+    (``set_grammar``, ``add_matcher``) only while it compiles nothing.
+    """
 
     def __init__(
         self,
@@ -29,6 +38,12 @@ class ModularCompiler:
         ast_builder_name: str = "default",
         debug: bool = False,
         debug_output_path: str = None,
+        failure_policy: str = FAIL_FAST,
+        checkpoints: bool = False,
+        fixture_cache: bool = False,
+        sql_session: bool = False,
+        sql_cache: bool = False,
+        sql_jobs: int = 1,
     ):
         """
         Initialize the modular compiler.
@@ -38,12 +53,30 @@ class ModularCompiler:
             ast_builder_name: Name of the AST builder to use (from ast_builder_registry)
             debug: Enable debug mode (deprecated, use global debug config)
             debug_output_path: Path to debug output file (optional)
+            failure_policy: What generated scripts do on a failing validation
+                (fail-fast, continue-step or continue-all)
+            checkpoints: Emit step checkpoints so generated scripts accept
+                --from-step/--only-step
+            fixture_cache: Let generated scripts restore file-only setup steps
+                from cached snapshots
+            sql_session: Run SQL actions through one persistent client per
+                connection instead of one client per action
+            sql_cache: Reuse read-only query results within a run until an
+                action that may write to the database
+            sql_jobs: Maximum number of consecutive read-only SQL actions of a
+                step run concurrently (1 runs them in sequence)
         """
         # Use global debug configuration
         self.debug = debug or is_debug_enabled()
         self.grammar_name = grammar_name
         self.ast_builder_name = ast_builder_name
         self.debug_output_path = debug_output_path
+        self.failure_policy = check_failure_policy(failure_policy)
+        self.checkpoints = checkpoints
+        self.fixture_cache = fixture_cache
+        self.sql_session = sql_session
+        self.sql_cache = sql_cache
+        self.sql_jobs = sql_jobs
 
         # Create parser with specified components
         self.parser = ConfigurableParser(
@@ -53,9 +86,16 @@ class ModularCompiler:
         )
 
         # Initialize other components
-        self.shell_generator = ShellGenerator(debug_output_path=debug_output_path)
+        self.shell_generator = ShellGenerator(
+            debug_output_path=debug_output_path,
+            failure_policy=self.failure_policy,
+            checkpoints=checkpoints,
+            fixture_cache=fixture_cache,
+            sql_session=sql_session,
+            sql_cache=sql_cache,
+            sql_jobs=sql_jobs,
+        )
         self.matcher_registry = MatcherRegistry()
-        self.context = CompileContext()
 
         # Add registries for plugin integration
         self.grammar_registry = grammar_registry
@@ -67,12 +107,29 @@ class ModularCompiler:
         output_path: Optional[str] = None,
         debug_output_path: str = None,
         debug_ast: bool = False,
+        ast: Optional[ShtestFile] = None,
     ) -> str:
+        """
+        Compile a .shtest file to a shell script.
+
+        Args:
+            file_path: Path to the .shtest file
+            output_path: Optional output path for the shell script
+            debug_output_path: Path to debug output file (optional)
+            debug_ast: Pretty-print the AST before generating the script
+            ast: Already parsed AST of file_path; the file is not read again
+
+        Returns:
+            Path to the generated shell script
+        """
+        # The exported log only holds this file's records, even when other
+        # threads compile meanwhile
+        start_log_scope()
         try:
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"File not found: {file_path}")
-            # Parse the file
-            ast = self.parser.parse_file(file_path)
+            if ast is None:
+                if not os.path.exists(file_path):
+                    raise FileNotFoundError(f"File not found: {file_path}")
+                ast = self.parser.parse_file(file_path)
             if debug_ast:
                 pretty_print_ast(ast)
             # Set debug_output_path to match test name if not provided
@@ -87,7 +144,7 @@ class ModularCompiler:
             # Write output
             if output_path is None:
                 output_path = self._get_default_output_path(file_path)
-            with open(output_path, "w", encoding="utf-8") as f:
+            with stage("emit"), open(output_path, "w", encoding="utf-8") as f:
                 f.write(shell_script)
             if self.debug:
                 debug_log(f"Compiled {file_path} -> {output_path}")
@@ -144,7 +201,7 @@ class ModularCompiler:
         if output_path is None:
             output_path = "output.sh"
 
-        with open(output_path, "w", encoding="utf-8") as f:
+        with stage("emit"), open(output_path, "w", encoding="utf-8") as f:
             f.write(shell_script)
 
         if self.debug:
@@ -155,14 +212,30 @@ class ModularCompiler:
     def _generate_shell_script(
         self, ast: ShtestFile, debug_output_path: str = None
     ) -> str:
-        """Generate shell script from AST."""
-        # Reset context for new compilation
-        self.context.reset()
+        """Generate shell script from AST.
+
+        Raises ``ParseError`` with every error the parser found in the test,
+        rather than generating a script that stops at the first of them.
+        """
+        errors = [diagnostic for diagnostic in ast.diagnostics if diagnostic.is_error]
+        if errors:
+            raise ParseError(
+                f"{len(errors)} error(s): {'; '.join(str(error) for error in errors)}",
+                diagnostics=errors,
+            )
+        for diagnostic in ast.diagnostics:
+            log_warning(str(diagnostic))
         # Visit the AST to generate shell code
         visitor = ShellGenerator(
-            debug_output_path=debug_output_path or self.debug_output_path
+            debug_output_path=debug_output_path or self.debug_output_path,
+            failure_policy=self.failure_policy,
+            checkpoints=self.checkpoints,
+            fixture_cache=self.fixture_cache,
+            sql_session=self.sql_session,
+            sql_cache=self.sql_cache,
+            sql_jobs=self.sql_jobs,
         )
-        visitor.context = self.context
+        visitor.context = CompileContext()
         visitor.matcher_registry = self.matcher_registry
         return visitor.visit(ast)
 
@@ -0,0 +1,46 @@
+"""
+Reading compressed files from generated shell scripts.
+
+Content validations (``le fichier ... contient ...``, ``... contient
+exactement ...``, ``... contient N lignes``) read their file through
+``shtest_read``, which streams gzip, zstd, bzip2 and xz content through the
+matching decompressor and plain files through ``cat``. Rotated logs can be
+checked in place, without decompressing them to disk first.
+
+The format is recognized from the first bytes of the file, not from its
+extension, so a ``.log`` that is really gzip is read correctly and a plain
+``.gz`` left by a failed rotation is read as text.
+"""
+
+from typing import List
+
+from shtest_compiler.utils.shell_utils import shell_escape
+
+# Magic numbers, as printed by ``od -An -tx1``, and their decompressors.
+DECOMPRESSORS = (
+    ("1f8b", "gzip -dc"),
+    ("28b52ffd", "zstd -dcq"),
+    ("425a68", "bzip2 -dc"),
+    ("fd377a585a00", "xz -dc"),
+)
+
+
+def read_command(path: str) -> str:
+    """Command printing the (decompressed) content of *path* on stdout."""
+    return f"shtest_read {shell_escape(path)}"
+
+
+def reader_prologue() -> List[str]:
+    """Shell function printing a file, decompressing it on the fly if needed."""
+    cases = [f'        {magic}*) {command} -- "$1" ;;' for magic, command in DECOMPRESSORS]
+    return [
+        "shtest_read() {",
+        "    local magic",
+        "    magic=$(od -An -tx1 -N6 -- \"$1\" 2>/dev/null | tr -d ' \\n')",
+        '    case "$magic" in',
+        *cases,
+        '        *) cat -- "$1" ;;',
+        "    esac",
+        "}",
+        "",
+    ]
@@ -0,0 +1,98 @@
+"""
+Failure policies for generated shell scripts.
+
+A failure policy decides what a generated script does when a validation fails:
+
+- ``fail-fast``: exit on the first failing validation (historic behaviour).
+- ``continue-step``: record the failure, finish the current step, then exit
+  with a summary of every failure recorded in that step.
+- ``continue-all``: record the failure and keep going until the end of the
+  script, then exit non-zero with a summary of all failures.
+"""
+
+from typing import List
+
+FAIL_FAST = "fail-fast"
+CONTINUE_STEP = "continue-step"
+CONTINUE_ALL = "continue-all"
+
+FAILURE_POLICIES = (FAIL_FAST, CONTINUE_STEP, CONTINUE_ALL)
+
+
+def check_failure_policy(policy: str) -> str:
+    """Normalize *policy* and raise ``ValueError`` if it is unknown."""
+    normalized = (policy or FAIL_FAST).strip().lower().replace("_", "-")
+    if normalized not in FAILURE_POLICIES:
+        raise ValueError(
+            f"Unknown failure policy '{policy}'. "
+            f"Expected one of: {', '.join(FAILURE_POLICIES)}"
+        )
+    return normalized
+
+
+def failure_prologue(policy: str) -> List[str]:
+    """Shell functions used to record failures when the policy is not fail-fast."""
+    if policy == FAIL_FAST:
+        return []
+    return [
+        "SHTEST_FAILURES=0",
+        "SHTEST_STEP_FAILURES=0",
+        'SHTEST_STEP=""',
+        "SHTEST_FAILED_VALIDATIONS=()",
+        "",
+        "record_failure() {",
+        "    SHTEST_FAILURES=$((SHTEST_FAILURES + 1))",
+        "    SHTEST_STEP_FAILURES=$((SHTEST_STEP_FAILURES + 1))",
+        '    SHTEST_FAILED_VALIDATIONS+=("[$SHTEST_STEP] $1")',
+        "    return 1",
+        "}",
+        "",
+        "report_failures() {",
+        '    if [ "$SHTEST_FAILURES" -gt 0 ]; then',
+        '        echo "FAILED: $SHTEST_FAILURES validation(s) failed"',
+        "        local failure",
+        '        for failure in "${SHTEST_FAILED_VALIDATIONS[@]}"; do',
+        '            echo "  - $failure"',
+        "        done",
+        "        exit 1",
+        "    fi",
+        "}",
+        "",
+        "end_step() {",
+        '    if [ "$SHTEST_STEP_FAILURES" -gt 0 ]; then',
+        "        report_failures",
+        "    fi",
+        "}",
+        "",
+    ]
+
+
+def failure_lines(escaped_message: str, policy: str) -> List[str]:
+    """Lines emitted in the ``else`` branch of a failing validation.
+
+    *escaped_message* must already be escaped for a single-quoted shell string.
+    """
+    if policy == FAIL_FAST:
+        return ["    exit 1"]
+    return [f"    record_failure '{escaped_message}'"]
+
+
+def step_prologue(escaped_name: str, policy: str) -> List[str]:
+    """Lines emitted at the start of each step."""
+    if policy == FAIL_FAST:
+        return []
+    return [f"SHTEST_STEP='{escaped_name}'", "SHTEST_STEP_FAILURES=0"]
+
+
+def step_epilogue(policy: str) -> List[str]:
+    """Lines emitted at the end of each step."""
+    if policy == CONTINUE_STEP:
+        return ["end_step"]
+    return []
+
+
+def script_epilogue(policy: str) -> List[str]:
+    """Lines emitted before the final success message."""
+    if policy == FAIL_FAST:
+        return []
+    return ["report_failures"]
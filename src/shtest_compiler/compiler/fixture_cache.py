@@ -0,0 +1,159 @@
+"""
+Fixture snapshot cache for generated shell scripts.
+
+A step whose actions only build files and directories (``Créer le dossier``,
+``Créer le fichier``, ``Copier le fichier``...) is a fixture. When the fixture
+cache is enabled, the generated script archives the paths produced by such a
+step into ``$SHTEST_FIXTURE_CACHE`` (``.shtest_fixtures`` by default) once the
+step has passed. Any later run of an identical step - in the same script or in
+another one - extracts the archive instead of executing the actions again; the
+step's validations still run against the restored paths.
+
+Only what the actions produced is archived: a created directory without the
+files it already held, a copied file, or a copied tree with its content.
+
+The cache key combines the resolved action sequence with the size and mtime of
+the copied sources, so editing an input file invalidates the snapshot.
+"""
+
+import hashlib
+import json
+from typing import List, Optional
+
+from shtest_compiler.ast.shell_framework_ast import ShellFixture
+from shtest_compiler.compiler.action_utils import (
+    canonize_action,
+    extract_context_from_action,
+)
+from shtest_compiler.utils.shell_utils import shell_escape
+
+# Handler -> (variables naming the produced paths, variables naming the
+# inputs, whether the produced path is a tree whose content the step wrote)
+FIXTURE_HANDLERS = {
+    "create_dir": (("path",), (), False),
+    "create_file": (("path",), (), False),
+    "copy_file": (("dest",), ("src",), False),
+    "copy_dir": (("dest",), ("src",), True),
+    "touch_ts": (("file", "path"), (), False),
+}
+
+# Bumped whenever the archive layout changes so old snapshots are ignored.
+_CACHE_VERSION = "2"
+
+
+def detect_fixture(commands: List[str]) -> Optional[ShellFixture]:
+    """Return the fixture built by *commands*, or ``None`` if it is not one."""
+    if not commands:
+        return None
+    resolved = []
+    targets: List[str] = []
+    sources: List[str] = []
+    trees: List[str] = []
+    for command in commands:
+        canon = canonize_action(command) if command else None
+        if canon is None or canon[1] not in FIXTURE_HANDLERS:
+            return None
+        handler = canon[1]
+        variables = extract_context_from_action(command, handler).get("variables", {})
+        target_names, source_names, tree = FIXTURE_HANDLERS[handler]
+        target = next((variables[n] for n in target_names if variables.get(n)), None)
+        if target is None:
+            return None
+        targets.append(target)
+        if tree:
+            trees.append(target)
+        sources.extend(variables[n] for n in source_names if variables.get(n))
+        resolved.append([handler, sorted(variables.items())])
+
+    digest = hashlib.sha256(
+        json.dumps([_CACHE_VERSION, resolved], ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+    return ShellFixture(
+        key=digest[:32],
+        targets=list(dict.fromkeys(targets)),
+        sources=list(dict.fromkeys(sources)),
+        trees=list(dict.fromkeys(trees)),
+    )
+
+
+def fixture_prologue() -> List[str]:
+    """Shell functions restoring and saving fixture snapshots."""
+    return [
+        'SHTEST_FIXTURE_CACHE="${SHTEST_FIXTURE_CACHE:-.shtest_fixtures}"',
+        'mkdir -p "$SHTEST_FIXTURE_CACHE"',
+        "",
+        "fixture_restore() {",
+        "    local static_key=\"$1\"",
+        "    shift",
+        "    SHTEST_FIXTURE_KEY=$({",
+        '        echo "$static_key"',
+        "        if [ $# -gt 0 ]; then",
+        "            find -L \"$@\" -printf '%p %s %T@\\n' 2>/dev/null | sort",
+        "        fi",
+        "    } | sha256sum | cut -c1-32)",
+        '    local archive="$SHTEST_FIXTURE_CACHE/$SHTEST_FIXTURE_KEY.tar"',
+        '    [ -f "$archive" ] && tar -xPpf "$archive"',
+        "}",
+        "",
+        "fixture_save() {",
+        '    if [ "${SHTEST_STEP_FAILURES:-0}" -gt 0 ]; then',
+        "        return 0",
+        "    fi",
+        '    local archive="$SHTEST_FIXTURE_CACHE/$SHTEST_FIXTURE_KEY.tar"',
+        "    # Arguments are paths, each group preceded by --recursion or --no-recursion",
+        '    if tar -cPpf "$archive.$$" "$@" 2>/dev/null; then',
+        '        mv -f "$archive.$$" "$archive"',
+        "    else",
+        '        rm -f "$archive.$$"',
+        "    fi",
+        "}",
+        "",
+    ]
+
+
+def fixture_skip() -> List[str]:
+    """First lines of ``run_action``: the actions of a restored fixture step
+    succeed without running, and its validations check the restored paths."""
+    return [
+        '    if [ "${SHTEST_FIXTURE_RESTORED:-0}" = 1 ]; then',
+        '        stdout=""',
+        '        stderr=""',
+        "        last_ret=0",
+        "        return 0",
+        "    fi",
+    ]
+
+
+def _path_argument(path: str) -> str:
+    # tar reads its options among the paths: keep a path from looking like one
+    return shell_escape(f"./{path}" if path.startswith("-") else path)
+
+
+def fixture_block(
+    fixture: ShellFixture, escaped_name: str, body: List[str]
+) -> List[str]:
+    """Wrap the *body* of a fixture step with snapshot restore/save.
+
+    The body always runs: after a restore, its actions are skipped by
+    ``run_action`` but its validations check the restored paths.
+    *escaped_name* must already be escaped for a single-quoted shell string.
+    """
+    restore_args = " ".join(
+        shell_escape(arg) for arg in [fixture.key, *fixture.sources]
+    )
+    shallow = [target for target in fixture.targets if target not in fixture.trees]
+    save_args = []
+    for option, paths in (("--no-recursion", shallow), ("--recursion", fixture.trees)):
+        if paths:
+            save_args += [option] + [_path_argument(path) for path in paths]
+    lines = [f"if fixture_restore {restore_args}; then"]
+    lines.append("    SHTEST_FIXTURE_RESTORED=1")
+    lines.append(f"    echo 'Fixture restored from cache: {escaped_name}'")
+    lines.append("fi")
+    lines.extend(body)
+    lines.append('if [ "${SHTEST_FIXTURE_RESTORED:-0}" = 1 ]; then')
+    lines.append("    SHTEST_FIXTURE_RESTORED=0")
+    lines.append("else")
+    lines.append(f"    fixture_save {' '.join(save_args)}")
+    lines.append("fi")
+    return lines
@@ -1,9 +1,17 @@
 # matcher_registry.py
+import inspect
+import threading
+
 from shtest_compiler.utils.logger import log_pipeline_error, log_action
 from shtest_compiler.utils.shell_utils import resource_path
 
 matcher_registry = {}
 
+# Registrations may happen while other threads compile: they are serialized,
+# and readers iterate over an immutable snapshot of (matcher, accepts scope).
+_registry_lock = threading.Lock()
+_matchers = ()
+
 
 def register_matcher(name):
     """
@@ -11,7 +19,13 @@ def register_matcher(name):
     """
 
     def decorator(fn):
-        matcher_registry[name] = fn
+        global _matchers
+        with _registry_lock:
+            matcher_registry[name] = fn
+            _matchers = tuple(
+                (matcher, "scope" in inspect.signature(matcher).parameters)
+                for matcher in matcher_registry.values()
+            )
         return fn
 
     return decorator
@@ -22,18 +36,10 @@ def run_matcher(expected, *args, scope="global"):
     Essaie chaque matcher enregistré jusqu'à ce qu'un résultat non None soit trouvé.
     Transmet le scope aux matchers qui l'acceptent.
     """
-    for name, matcher in matcher_registry.items():
-        # Vérifier si le matcher accepte le scope
-        import inspect
-
-        sig = inspect.signature(matcher)
-        if "scope" in sig.parameters:
-            # Créer un dictionnaire d'arguments avec le scope
-            kwargs = {"scope": scope}
-            # Passer les arguments positionnels et le scope comme argument nommé
-            result = matcher(expected, *args, **kwargs)
+    for matcher, accepts_scope in _matchers:
+        if accepts_scope:
+            result = matcher(expected, *args, scope=scope)
         else:
-            # Matcher qui n'accepte pas le scope
             result = matcher(expected, *args)
         if result is not None:
             return result
@@ -130,12 +136,15 @@ class MatcherRegistry:
         return None
 
     def register(self, matcher):
-        """Register a matcher."""
-        if hasattr(matcher, "name"):
-            self.matchers[matcher.name] = matcher
-        else:
-            # Use class name as fallback
-            self.matchers[matcher.__class__.__name__] = matcher
+        """Register a matcher.
+
+        The dict of matchers is replaced rather than modified, so compilations
+        running meanwhile keep iterating over the matchers they started with.
+        """
+        # Use class name as fallback
+        name = getattr(matcher, "name", matcher.__class__.__name__)
+        with _registry_lock:
+            self.matchers = {**self.matchers, name: matcher}
 
     def get(self, name):
         """Get a matcher by name."""
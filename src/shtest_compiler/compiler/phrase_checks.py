@@ -0,0 +1,95 @@
+"""
+Checks of the action and validation phrases of a test, run while parsing.
+
+The compiler resolves a phrase only when it generates the script, and stops
+at the first one it cannot compile. These checks resolve every phrase of a
+file up front, so that all its problems are reported in one pass:
+
+- a validation that matches no pattern, or lacks a variable its handler
+  needs, cannot be compiled: ``validation_problems`` reports it as an error;
+- an action that cannot be resolved still compiles, as a raw shell command,
+  so ``action_problems`` only flags actions that start like a known phrase
+  (``Créer ...``, ``Exécuter ...``) and will not run as one.
+"""
+
+import unicodedata
+from typing import Any, FrozenSet, List, Optional, Tuple
+
+from shtest_compiler.compiler.action_utils import (
+    canonize_action,
+    extract_context_from_action,
+    load_yaml_config,
+    validate_action_context,
+)
+from shtest_compiler.compiler.atomic_compiler import resolve_validation
+from shtest_compiler.parser.shunting_yard import is_compound_expression, validation_atoms
+
+# Leading words of the action phrases, with the patterns they were read from
+_verbs: Optional[Tuple[Any, FrozenSet[str]]] = None
+
+
+def _leading_word(text: str) -> str:
+    word = text.strip().split(" ", 1)[0].lower()
+    return "".join(
+        c for c in unicodedata.normalize("NFD", word) if unicodedata.category(c) != "Mn"
+    )
+
+
+def _action_verbs() -> FrozenSet[str]:
+    """Leading words of the action phrases and of their non-regex aliases."""
+    global _verbs
+    data = load_yaml_config("patterns_actions.yml")
+    if _verbs is None or _verbs[0] is not data:
+        words = set()
+        for entry in data.get("actions", []):
+            for phrase in [entry.get("phrase", "")] + entry.get("aliases", []):
+                if not isinstance(phrase, str):
+                    continue
+                word = _leading_word(phrase)
+                if word.isalpha():
+                    words.add(word)
+        _verbs = (data, frozenset(words))
+    return _verbs[1]
+
+
+def action_problems(command: str) -> List[str]:
+    """Why *command*, written as an action phrase, will run as a raw command."""
+    if _leading_word(command) not in _action_verbs():
+        # A shell command, meant to run as is
+        return []
+    canon = canonize_action(command)
+    if not canon:
+        return [f"Unknown action phrase: '{command}'"]
+    _, handler, _ = canon
+    _, errors = validate_action_context(extract_context_from_action(command, handler))
+    if errors:
+        return [f"Action context errors for '{command}': {', '.join(errors)}"]
+    return []
+
+
+def validation_problems(expression: str) -> List[Tuple[str, str]]:
+    """Why the validation *expression* cannot be compiled, empty when it can.
+
+    Returns ``(phrase, problem)`` pairs, *phrase* being the part of
+    *expression* at fault. A compound expression compiles when each of its
+    atoms does or, failing that, when the whole expression matches a phrase
+    (``les fichiers A et B ...``). Otherwise the failing atoms are reported,
+    unless the whole expression matched a phrase with invalid parameters.
+    """
+    if is_compound_expression(expression):
+        problems = []
+        for atom in validation_atoms(expression):
+            error = resolve_validation(atom)[2]
+            if error:
+                problems.append((atom, error))
+        if not problems:
+            return []
+        canon, _, error = resolve_validation(expression)
+        if not error:
+            return []
+        # The whole phrase matched: its own parameters are at fault
+        if canon:
+            return [(expression, error)]
+        return problems
+    error = resolve_validation(expression)[2]
+    return [(expression, error)] if error else []
@@ -0,0 +1,230 @@
+"""
+Per-stage and per-handler compile profiling.
+
+The compiler marks its stages (``lex``, ``grammar``, ``ast`` in the parser;
+``framework``, ``lift``, ``bind``, ``script``, ``join`` in
+``ShellGenerator.visit``; ``emit`` when the script is written) and every
+handler call, as well as the pattern and registry lookups that precede
+them. Nothing is recorded unless a ``CompileProfile`` is active::
+
+    with profiling(CompileProfile()) as profile:
+        compile_file("test.shtest")
+    print(profile.report())
+
+``shtest profile <file|dir>`` and ``shtest compile_file --timings`` are built
+on top of it. With ``allocations=True``, ``tracemalloc`` also records the
+memory allocated (and not freed) by each stage and handler.
+
+A profile is active in the thread that entered ``profiling``: compilations
+running meanwhile in other threads are not recorded into it.
+"""
+
+import cProfile
+import functools
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+STAGES = ("lex", "grammar", "ast", "framework", "lift", "bind", "script", "join", "emit")
+
+STAGE = "stage"
+HANDLER = "handler"
+LOOKUP = "lookup"
+
+_NO_MEASURE = nullcontext()
+
+
+class Measure:
+    """Cumulated wall time, call count and allocated bytes of one stage or handler."""
+
+    __slots__ = ("calls", "seconds", "allocated")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.allocated = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {"calls": self.calls, "seconds": self.seconds, "allocated": self.allocated}
+
+
+class CompileProfile:
+    """Measures of the stages and handlers run while the profile is active."""
+
+    def __init__(self, allocations: bool = False):
+        self.allocations = allocations
+        self.measures: Dict[str, Dict[str, Measure]] = {STAGE: {}, HANDLER: {}, LOOKUP: {}}
+        self.files = 0
+        self.errors: List[Tuple[str, str]] = []
+
+    @contextmanager
+    def measure(self, kind: str, name: str) -> Iterator[None]:
+        entry = self.measures[kind].get(name)
+        if entry is None:
+            entry = self.measures[kind][name] = Measure()
+        traced = self.allocations and tracemalloc.is_tracing()
+        before = tracemalloc.get_traced_memory()[0] if traced else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry.seconds += time.perf_counter() - start
+            entry.calls += 1
+            if traced:
+                entry.allocated += max(0, tracemalloc.get_traced_memory()[0] - before)
+
+    @property
+    def stages(self) -> Dict[str, Measure]:
+        return self.measures[STAGE]
+
+    @property
+    def handlers(self) -> Dict[str, Measure]:
+        return self.measures[HANDLER]
+
+    @property
+    def lookups(self) -> Dict[str, Measure]:
+        return self.measures[LOOKUP]
+
+    def as_dict(self) -> Dict:
+        return {
+            "files": self.files,
+            "errors": [list(error) for error in self.errors],
+            "stages": {name: m.as_dict() for name, m in self.stages.items()},
+            "handlers": {name: m.as_dict() for name, m in self.handlers.items()},
+            "lookups": {name: m.as_dict() for name, m in self.lookups.items()},
+        }
+
+    def report(self, top: int = 10) -> str:
+        """Stages in pipeline order, then the *top* slowest lookups and handlers."""
+        stages = sorted(
+            self.stages.items(),
+            key=lambda item: STAGES.index(item[0]) if item[0] in STAGES else len(STAGES),
+        )
+        lines = [f"{self.files} fichier(s) compilé(s)"]
+        lines += self._table("étape", stages)
+        for title, kind in (("recherche", LOOKUP), ("handler", HANDLER)):
+            rows = sorted(self.measures[kind].items(), key=lambda item: -item[1].seconds)
+            if rows:
+                lines += self._table(title, rows[:top])
+        return "\n".join(lines)
+
+    def _table(self, title: str, rows) -> List[str]:
+        header = f"{title:<36} {'appels':>8} {'temps (ms)':>12}"
+        if self.allocations:
+            header += f" {'alloc (Kio)':>12}"
+        lines = ["", header]
+        for name, m in rows:
+            line = f"{name:<36} {m.calls:>8} {m.seconds * 1000:>12.1f}"
+            if self.allocations:
+                line += f" {m.allocated / 1024:>12.1f}"
+            lines.append(line)
+        return lines
+
+
+# Profile active in each thread, in its ``profile`` attribute
+_active = threading.local()
+
+
+def active_profile() -> Optional[CompileProfile]:
+    return getattr(_active, "profile", None)
+
+
+@contextmanager
+def profiling(profile: CompileProfile) -> Iterator[CompileProfile]:
+    """Record into *profile* what the calling thread runs during the block."""
+    previous = active_profile()
+    _active.profile = profile
+    started = profile.allocations and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        yield profile
+    finally:
+        if started:
+            tracemalloc.stop()
+        _active.profile = previous
+
+
+def stage(name: str):
+    """Context manager measuring the stage *name*, a no-op when not profiling."""
+    profile = getattr(_active, "profile", None)
+    if profile is None:
+        return _NO_MEASURE
+    return profile.measure(STAGE, name)
+
+
+def call_handler(name: str, func: Callable, params):
+    """Call the handler *func*, measured under *name* when profiling."""
+    profile = getattr(_active, "profile", None)
+    if profile is None:
+        return func(params)
+    with profile.measure(HANDLER, name):
+        return func(params)
+
+
+def measured(name: str):
+    """Decorator measuring each call of a lookup function under *name*."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = getattr(_active, "profile", None)
+            if profile is None:
+                return func(*args, **kwargs)
+            with profile.measure(LOOKUP, name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def profile_files(
+    paths: Sequence[str],
+    output_dir: Optional[str] = None,
+    allocations: bool = False,
+    cprofile_path: Optional[str] = None,
+    tracemalloc_path: Optional[str] = None,
+    **options,
+) -> CompileProfile:
+    """Compile *paths* (files or directories) into a single profile.
+
+    Scripts are written to *output_dir*, or to a temporary directory that is
+    removed afterwards. ``cprofile_path`` receives a ``pstats`` dump of the
+    whole run, ``tracemalloc_path`` a ``tracemalloc`` snapshot taken at its
+    end (this implies *allocations*). Files that fail to compile are reported
+    as ``(path, error)`` in ``profile.errors``.
+    """
+    from ..pipeline import shtest_files
+    from .compiler import ModularCompiler
+
+    profile = CompileProfile(allocations=allocations or bool(tracemalloc_path))
+    compiler = ModularCompiler(**options)
+    profiler = cProfile.Profile() if cprofile_path else None
+    with tempfile.TemporaryDirectory(prefix="shtest_profile_") as scratch:
+        target = output_dir or scratch
+        with profiling(profile):
+            if profiler:
+                profiler.enable()
+            for path in shtest_files(paths):
+                output = os.path.join(
+                    target, os.path.splitext(os.path.basename(path))[0] + ".sh"
+                )
+                try:
+                    compiler.compile_file(
+                        path, output, debug_output_path=os.path.join(scratch, "debug.txt")
+                    )
+                    profile.files += 1
+                except Exception as e:
+                    profile.errors.append((path, f"{type(e).__name__}: {e}"))
+            if profiler:
+                profiler.disable()
+            if tracemalloc_path:
+                tracemalloc.take_snapshot().dump(tracemalloc_path)
+    if profiler:
+        profiler.dump_stats(cprofile_path)
+    return profile
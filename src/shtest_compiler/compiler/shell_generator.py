@@ -23,7 +23,7 @@ from shtest_compiler.ast.visitor import ASTVisitor
 from shtest_compiler.core.context import CompileContext
 from shtest_compiler.command_loader import build_registry
 
-from ..utils.logger import debug_log, is_debug_enabled
+from ..utils.logger import debug_log, trace, tracing
 from ..parser.shtest_ast import Action, ShtestFile, TestStep
 from ..parser.shunting_yard import Atomic, BinaryOp, parse_validation_expression
 from .action_utils import (
@@ -33,7 +33,9 @@ from .action_utils import (
 )
 from .argument_extractor import extract_action_args
 from .atomic_compiler import compile_atomic
+from .failure_policy import FAIL_FAST, check_failure_policy
 from .matcher_registry import MatcherRegistry
+from .profiling import call_handler, stage
 
 
 def compile_action(action: str, extracted_args: Optional[dict] = None) -> List[str]:
@@ -47,22 +49,28 @@ def compile_action(action: str, extracted_args: Optional[dict] = None) -> List[s
     Returns:
         List of shell code lines
     """
-    debug_enabled = is_debug_enabled()
-
-    if debug_enabled:
-        debug_log(
-            f"compile_action called with: action='{action}', extracted_args={extracted_args}"
+    if tracing.handler:
+        trace(
+            "handler",
+            "compile_action",
+            "compile_action called with: action='%s', extracted_args=%s",
+            action,
+            extracted_args,
         )
 
     # Use modular context extraction instead of manual canonization
     canon = canonize_action(action)
-    if debug_enabled:
-        debug_log(f"canonize_action result: {canon}")
+    if tracing.handler:
+        trace("handler", "compile_action", "canonize_action result: %s", canon)
 
     if not canon:
         # Fallback to raw command execution
-        if debug_enabled:
-            debug_log(f"No action handler found, using raw command execution")
+        if tracing.handler:
+            trace(
+                "handler",
+                "compile_action",
+                "No action handler found, using raw command execution",
+            )
         escaped_action = action.replace('"', '\\"')
         return [
             f"# Execute: {action}",
@@ -73,28 +81,33 @@ def compile_action(action: str, extracted_args: Optional[dict] = None) -> List[s
         ]
 
     phrase_canonique, handler, pattern_entry = canon
-    if debug_enabled:
-        debug_log(
-            f"Canonical action: '{phrase_canonique}' (handler: {handler}) for '{action}'"
+    if tracing.handler:
+        trace(
+            "handler",
+            "compile_action",
+            "Canonical action: '%s' (handler: %s) for '%s'",
+            phrase_canonique,
+            handler,
+            action,
         )
 
     # Extract context using the modular system
     context = extract_context_from_action(action, handler)
-    if debug_enabled:
-        debug_log(f"extract_context_from_action result: {context}")
+    if tracing.handler:
+        trace("handler", "compile_action", "extract_context_from_action result: %s", context)
 
     # Validate the context
     is_valid, errors = validate_action_context(context)
     if not is_valid:
         error_msg = f"Action context errors for '{action}': {', '.join(errors)}"
-        if debug_enabled:
-            debug_log(f"{error_msg}")
+        if tracing.handler:
+            trace("handler", "compile_action", "%s", error_msg)
         return [f"echo 'ERROR: {error_msg}'"]
 
     # Extract variables from context
     variables = context.get("variables", {})
-    if debug_enabled:
-        debug_log(f"Extracted variables: {variables}")
+    if tracing.handler:
+        trace("handler", "compile_action", "Extracted variables: %s", variables)
 
     handler_registry, _, _ = build_registry()
     handler_func = handler_registry.get(handler)
@@ -107,9 +120,9 @@ def compile_action(action: str, extracted_args: Optional[dict] = None) -> List[s
         params.update(extracted_args)
     if handler_func:
         try:
-            result = handler_func(params)
-            if debug_enabled:
-                debug_log(f"Handler registry returned: {result}")
+            result = call_handler(handler, handler_func, params)
+            if tracing.handler:
+                trace("handler", "compile_action", "Handler registry returned: %s", result)
             if isinstance(result, list):
                 return result
             elif isinstance(result, str):
@@ -117,8 +130,8 @@ def compile_action(action: str, extracted_args: Optional[dict] = None) -> List[s
             else:
                 return [f"echo 'ERROR: Invalid return type from handler {handler}'"]
         except Exception as e:
-            if debug_enabled:
-                debug_log(f"Exception in handler {handler}: {e}")
+            if tracing.handler:
+                trace("handler", "compile_action", "Exception in handler %s: %s", handler, e)
             return [f"echo 'ERROR: Exception in handler {handler}: {e}'"]
     else:
         return [f"echo 'ERROR: Handler {handler} not found in registry'"]
@@ -127,25 +140,51 @@ def compile_action(action: str, extracted_args: Optional[dict] = None) -> List[s
 class ShellGenerator(ASTVisitor):
     """Generates shell code from AST nodes using the new visitor-based pipeline."""
 
-    def __init__(self, debug_output_path: str = None):
+    def __init__(
+        self,
+        debug_output_path: str = None,
+        failure_policy: str = FAIL_FAST,
+        checkpoints: bool = False,
+        fixture_cache: bool = False,
+        sql_session: bool = False,
+        sql_cache: bool = False,
+        sql_jobs: int = 1,
+    ):
         self.debug_output_path = debug_output_path
+        self.failure_policy = check_failure_policy(failure_policy)
+        self.checkpoints = checkpoints
+        self.fixture_cache = fixture_cache
+        self.sql_session = sql_session
+        self.sql_cache = sql_cache
+        self.sql_jobs = sql_jobs
 
     def visit(self, node) -> str:
         try:
             # Step 1: Shtest AST -> ShellFrameworkAST
-            shellframework_ast = ShtestToShellFrameworkVisitor().visit(node)
+            with stage("framework"):
+                shellframework_ast = ShtestToShellFrameworkVisitor(
+                    failure_policy=self.failure_policy,
+                    fixture_cache=self.fixture_cache,
+                    sql_session=self.sql_session,
+                    sql_cache=self.sql_cache,
+                    sql_jobs=self.sql_jobs,
+                ).visit(node)
             # Step 2: Lift global validations from action results to standalone validations
             from shtest_compiler.ast.shell_framework_binder import ShellFrameworkLifter
 
-            shellframework_ast = ShellFrameworkLifter(shellframework_ast).lift()
+            with stage("lift"):
+                shellframework_ast = ShellFrameworkLifter(shellframework_ast).lift()
             # Step 3: Bind helpers and calls
-            shellframework_ast = ShellFrameworkBinder(shellframework_ast).bind()
+            with stage("bind"):
+                shellframework_ast = ShellFrameworkBinder(shellframework_ast).bind()
             # Step 4: ShellFrameworkAST -> ShellScript
-            shellscript_ast = ShellFrameworkToShellScriptVisitor().visit(
-                shellframework_ast
-            )
+            with stage("script"):
+                shellscript_ast = ShellFrameworkToShellScriptVisitor(
+                    failure_policy=self.failure_policy, checkpoints=self.checkpoints
+                ).visit(shellframework_ast)
             # Step 5: Emit shell script
-            return "\n".join(shellscript_ast.lines)
+            with stage("join"):
+                return "\n".join(shellscript_ast.lines)
         except Exception as e:
             error_msg = f"[ERROR] {type(e).__name__}: {e}"
             import traceback
@@ -0,0 +1,99 @@
+"""
+Per-run cache of SQL query results for generated shell scripts.
+
+With the SQL cache enabled, the output of a read-only query is stored in
+``$SHTEST_TMPDIR/sql_cache`` under a key built from the driver, the
+connection, the output mode and the normalized query text. Running the same
+query again - from another action or another step - reads the file instead of
+querying the database.
+
+Every other action (SQL scripts, DML, shell scripts, unrecognized commands)
+clears the cache before it runs, since it may modify the database. Queries
+calling volatile functions (``SYSDATE``, ``now()``, ``nextval``...) are never
+cached.
+"""
+
+import hashlib
+import re
+from typing import List
+
+from shtest_compiler.utils.shell_utils import shell_escape
+
+READ_ONLY_STATEMENTS = ("select", "with", "show", "describe", "desc", "explain", "values")
+
+# Words that make a statement write, lock or depend on the time of execution.
+_UNCACHEABLE = re.compile(
+    r"\b(insert|update|delete|merge|upsert|replace|create|drop|alter|truncate"
+    r"|grant|revoke|call|exec|execute|begin|commit|rollback|lock|into"
+    r"|nextval|setval|sysdate|systimestamp|now|current_date|current_time"
+    r"|current_timestamp|localtimestamp|clock_timestamp|random|rand|uuid"
+    r"|sys_guid|dbms_random)\b",
+    re.IGNORECASE,
+)
+
+_LITERAL = re.compile(r"('(?:[^']|'')*')")
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace outside string literals and drop the final ``;``."""
+    parts = _LITERAL.split(query)
+    for index in range(0, len(parts), 2):
+        parts[index] = re.sub(r"\s+", " ", _COMMENT.sub(" ", parts[index]))
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def is_cacheable(query: str) -> bool:
+    """Whether *query* is a single statement that only reads the database."""
+    code = _LITERAL.sub("''", normalize_query(query))
+    words = code.split(None, 1)
+    if not words or words[0].lower() not in READ_ONLY_STATEMENTS:
+        return False
+    return ";" not in code and not _UNCACHEABLE.search(code)
+
+
+def cache_key(driver: str, conn: str, query: str, mode: str) -> str:
+    text = "\0".join([(driver or "oracle").lower(), conn, mode, normalize_query(query)])
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def cached_command(key: str, command: str) -> str:
+    """Wrap *command* so its stdout is served from the cache entry *key*.
+
+    The command is passed single-quoted to ``sql_cache_run``: the wrapper is
+    a simple command that can be piped or redirected, and no ``$`` of the
+    wrapper is expanded early by ``run_action``'s double quotes.
+    """
+    return f"sql_cache_run {key} {shell_escape(command)}"
+
+
+def cache_prologue() -> List[str]:
+    """Shell functions reading, storing and clearing cached query results."""
+    return [
+        "# Per-run cache of read-only SQL query results",
+        'SHTEST_SQL_CACHE="$SHTEST_TMPDIR/sql_cache"',
+        'mkdir -p "$SHTEST_SQL_CACHE"',
+        "",
+        "sql_cache_run() {",
+        '    local key="$1" command="$2" pending status',
+        '    if [ -f "$SHTEST_SQL_CACHE/$key.out" ]; then',
+        '        cat "$SHTEST_SQL_CACHE/$key.out"',
+        "        return 0",
+        "    fi",
+        '    pending=$(mktemp "$SHTEST_SQL_CACHE/$key.XXXXXX") || return 1',
+        '    eval "$command" > "$pending"',
+        "    status=$?",
+        '    cat "$pending"',
+        '    if [ "$status" -eq 0 ]; then',
+        '        mv -f "$pending" "$SHTEST_SQL_CACHE/$key.out"',
+        "    else",
+        '        rm -f "$pending"',
+        "    fi",
+        '    return "$status"',
+        "}",
+        "",
+        "sql_cache_clear() {",
+        '    rm -f "$SHTEST_SQL_CACHE"/*.out',
+        "}",
+        "",
+    ]
@@ -0,0 +1,100 @@
+"""
+Concurrent execution of read-only SQL actions in generated shell scripts.
+
+With SQL jobs enabled, consecutive read-only SQL actions of a step (queries,
+exports and comparisons that leave the database untouched) are started
+together as background jobs, at most ``SHTEST_SQL_JOBS`` at a time. Their
+results are then collected one by one in the original order: each collected
+job sets ``stdout``, ``stderr`` and ``last_ret`` exactly like ``run_action``
+before the validations of its action run, so the report of the step does not
+change. Each job gets its own ``SHTEST_TMPDIR``, so jobs running the same
+query do not share scratch files.
+
+Any other action ends a group, so an action that may write to the database
+never runs concurrently with a query reading it.
+"""
+
+import re
+from typing import List
+
+from shtest_compiler.utils.shell_utils import shell_escape
+
+_CONNECTION_VARIABLE = re.compile(
+    r"\b(SQL_CONN|SQL_DRIVER)\s*=\s*['\"]?(.*?)['\"]?\s*$", re.IGNORECASE
+)
+
+
+def connection_variable(command: str):
+    """Return ``(name, value)`` if *command* defines ``SQL_CONN``/``SQL_DRIVER``."""
+    match = _CONNECTION_VARIABLE.search(command or "")
+    if not match or not match.group(2):
+        return None
+    return match.group(1).upper(), match.group(2)
+
+
+def is_concurrent(action) -> bool:
+    """Whether a resolved action node may run alongside other SQL reads."""
+    # Read-only SQL actions are exactly those that keep the query cache valid
+    return action is not None and not getattr(action, "invalidates_sql_cache", True)
+
+
+def job_start(job_id: int, command: str) -> str:
+    return f"sql_job_start {job_id} {shell_escape(command)}"
+
+
+def job_collect(job_id: int) -> str:
+    return f"sql_job_collect {job_id}"
+
+
+def jobs_trap() -> str:
+    """EXIT trap stopping jobs left running when the script exits early."""
+    return "trap 'sql_job_cancel_all; rm -rf \"$SHTEST_TMPDIR\"' EXIT"
+
+
+def jobs_prologue(limit: int) -> List[str]:
+    """Shell functions starting, collecting and cancelling SQL jobs."""
+    return [
+        "# Concurrent read-only SQL actions",
+        f'SHTEST_SQL_JOBS="${{SHTEST_SQL_JOBS:-{int(limit)}}}"',
+        'SHTEST_SQL_JOBDIR="$SHTEST_TMPDIR/sql_jobs"',
+        'mkdir -p "$SHTEST_SQL_JOBDIR"',
+        "",
+        "sql_job_start() {",
+        '    local id="$1" cmd="$2" dir="$SHTEST_SQL_JOBDIR"',
+        '    while [ "$(jobs -pr | wc -l)" -ge "$SHTEST_SQL_JOBS" ]; do',
+        "        # Jobs always exit 0: a failure means wait -n is unsupported",
+        "        wait -n 2>/dev/null || wait",
+        "    done",
+        "    (",
+        "        # Scratch files are named after the query: keep them per job",
+        '        SHTEST_TMPDIR="$dir/$id.tmp"',
+        '        mkdir -p "$SHTEST_TMPDIR"',
+        '        (eval "$cmd") > "$dir/$id.out" 2> "$dir/$id.err"',
+        '        echo $? > "$dir/$id.rc"',
+        "    ) &",
+        '    printf -v "sql_job_pid_$id" "%s" "$!"',
+        "}",
+        "",
+        "sql_job_collect() {",
+        '    local id="$1" dir="$SHTEST_SQL_JOBDIR" pid_var="sql_job_pid_$1"',
+        '    wait "${!pid_var}" 2>/dev/null',
+        '    stdout=$(cat "$dir/$id.out" 2>/dev/null)',
+        '    cp -f "$dir/$id.err" stderr.log 2>/dev/null || : > stderr.log',
+        "    if [ -s stderr.log ]; then",
+        "        stderr=$(cat stderr.log)",
+        "    else",
+        '        stderr=""',
+        "    fi",
+        '    last_ret=$(cat "$dir/$id.rc" 2>/dev/null || echo 1)',
+        '    rm -rf "$dir/$id.out" "$dir/$id.err" "$dir/$id.rc" "$dir/$id.tmp"',
+        "    return $last_ret",
+        "}",
+        "",
+        "sql_job_cancel_all() {",
+        "    local pids",
+        "    pids=$(jobs -pr)",
+        '    [ -n "$pids" ] && kill $pids 2>/dev/null',
+        "    wait 2>/dev/null",
+        "}",
+        "",
+    ]
@@ -0,0 +1,200 @@
+"""
+Persistent SQL sessions for generated shell scripts.
+
+By default every SQL action starts its own ``sqlplus``/``psql``/``mysql``
+process and pays the connection and authentication cost again. With the SQL
+session mode enabled, the generated script starts one client per
+(``SQL_DRIVER``, ``SQL_CONN``) pair the first time it is needed and keeps it
+alive until the script exits.
+
+Each session lives in ``$SHTEST_TMPDIR/sql_sessions/<driver>_<key>``:
+
+- ``in`` and ``out`` are FIFOs connected to the client's stdin and stdout;
+- a holder process keeps both FIFOs open, so the client never sees EOF
+  between two actions (actions run in ``$(...)`` subshells and cannot share
+  file descriptors with the main shell).
+
+An action writes its statements followed by a command printing a unique
+sentinel line, then reads the client output up to that sentinel. Lines
+reporting a database error are sent to stderr and make the action fail.
+Sessions are closed by the ``EXIT`` trap.
+
+Drivers without a session implementation (``redis``) keep running one
+client per action.
+"""
+
+from typing import List
+
+SESSION_DRIVERS = ("oracle", "postgres", "mysql")
+
+# Output settings applied before each request; see sql_session_preamble.
+SESSION_MODES = ("default", "plain", "csv")
+
+
+def supports_session(driver: str) -> bool:
+    return (driver or "oracle").lower() in SESSION_DRIVERS
+
+
+def session_command(script: str, conn: str, driver: str, mode: str = "default") -> str:
+    """Shell command running *script* through the session of (*driver*, *conn*).
+
+    *mode* selects the output format: ``default`` (client defaults, as for
+    ``Exécuter le script SQL``), ``plain`` (rows only, as for a query) or
+    ``csv`` (comma separated rows without header, for exports).
+    """
+    if mode not in SESSION_MODES:
+        raise ValueError(f"Unknown SQL session mode: {mode}")
+    return f'sql_session_run {(driver or "oracle").lower()} "{conn}" {script} {mode}'
+
+
+def session_trap() -> str:
+    """``EXIT`` trap closing the sessions before removing the scratch area."""
+    return "trap 'sql_session_close_all; rm -rf \"$SHTEST_TMPDIR\"' EXIT"
+
+
+_PROLOGUE = r"""
+# Persistent SQL sessions, one client per (driver, connection)
+SHTEST_SQL_SESSIONS="$SHTEST_TMPDIR/sql_sessions"
+SHTEST_SQL_TIMEOUT="${SHTEST_SQL_TIMEOUT:-300}"
+
+sql_session_dir() {
+    local key
+    key=$(printf '%s\n%s' "$1" "$2" | cksum | cut -d' ' -f1)
+    printf '%s/%s_%s' "$SHTEST_SQL_SESSIONS" "$1" "$key"
+}
+
+sql_session_open() {
+    local driver="$1" conn="$2" dir="$3"
+    local -a client
+    case "$driver" in
+        oracle) client=(sqlplus -s "$conn") ;;
+        postgres) client=(psql "$conn") ;;
+        mysql) client=(mysql "$conn" --batch --force --unbuffered) ;;
+    esac
+    if command -v stdbuf >/dev/null 2>&1; then
+        client=(stdbuf -oL "${client[@]}")
+    fi
+    mkdir -p "$dir" && mkfifo "$dir/in" "$dir/out" || return 1
+    # The holder keeps both FIFOs open for the lifetime of the session
+    (exec 7<>"$dir/in" 8<>"$dir/out"; exec sleep 2147483647) </dev/null >/dev/null 2>&1 &
+    echo $! > "$dir/holder.pid"
+    # The wrapper reaps the client and records its end in "closed"
+    (
+        "${client[@]}" <"$dir/in" >"$dir/out" 2>&1 &
+        echo $! > "$dir/client.pid"
+        wait $!
+        : > "$dir/closed"
+    ) </dev/null >/dev/null 2>&1 &
+    if [ "$driver" = oracle ]; then
+        # Saved settings are restored before each request
+        sql_session_request "$dir" oracle "STORE SET \"$dir/defaults.sql\" REPLACE" >/dev/null
+    fi
+}
+
+sql_session_preamble() {
+    local driver="$1" mode="$2" dir="$3"
+    case "$driver:$mode" in
+        oracle:*) [ -f "$dir/defaults.sql" ] && printf '@"%s"\n' "$dir/defaults.sql" ;;
+        postgres:default) printf '\\set QUIET on\n\\pset format aligned\n\\pset tuples_only off\n\\set QUIET off\n' ;;
+        postgres:plain) printf '\\set QUIET on\n\\pset format unaligned\n\\pset tuples_only on\n\\set QUIET off\n' ;;
+        postgres:csv) printf '\\set QUIET on\n\\pset format csv\n\\pset tuples_only on\n\\set QUIET off\n' ;;
+    esac
+    return 0
+}
+
+sql_session_request() {
+    local dir="$1" driver="$2" statements="$3" skip_header="${4:-0}"
+    local marker="__SHTEST_SQL_END_${RANDOM}${RANDOM}${RANDOM}__"
+    local line partial="" waited=0 status=0 rc
+    {
+        printf '%s\n' "$statements"
+        case "$driver" in
+            oracle) printf 'PROMPT %s\n' "$marker" ;;
+            postgres) printf ';\n\\echo %s\n' "$marker" ;;
+            mysql) printf "SELECT '%s' AS shtest_marker;\n" "$marker" ;;
+        esac
+    } > "$dir/in"
+    while :; do
+        if IFS= read -r -t 1 line; then
+            line="$partial$line"
+            partial=""
+            [ "$line" = "$marker" ] && return $status
+            if [ "$driver" = mysql ]; then
+                [ "$line" = shtest_marker ] && continue
+                if [ "$skip_header" = 1 ]; then
+                    skip_header=0
+                    continue
+                fi
+            fi
+            case "$driver:$line" in
+                oracle:ORA-[0-9]*|oracle:SP2-[0-9]*|postgres:ERROR:*|postgres:psql:*ERROR:*|mysql:ERROR\ [0-9]*)
+                    printf '%s\n' "$line" >&2
+                    status=1
+                    ;;
+                *) printf '%s\n' "$line" ;;
+            esac
+        else
+            rc=$?
+            [ $rc -gt 128 ] && partial="$partial$line"
+            waited=$((waited + 1))
+            if [ $rc -le 128 ] || [ -e "$dir/closed" ]; then
+                echo "SQL session closed unexpectedly ($driver)" >&2
+                sql_session_close "$dir"
+                return 1
+            fi
+            if [ $waited -ge "$SHTEST_SQL_TIMEOUT" ]; then
+                echo "SQL session timed out after ${SHTEST_SQL_TIMEOUT}s ($driver)" >&2
+                sql_session_close "$dir"
+                return 1
+            fi
+        fi
+    done < "$dir/out"
+}
+
+sql_session_run() {
+    local driver="$1" conn="$2" script="$3" mode="${4:-default}"
+    local dir statements skip_header=0
+    dir=$(sql_session_dir "$driver" "$conn")
+    if [ ! -p "$dir/in" ]; then
+        sql_session_open "$driver" "$conn" "$dir" || return 1
+    fi
+    case "$driver" in
+        oracle) statements="@\"$script\"" ;;
+        postgres) statements="\\i '$script'" ;;
+        mysql) statements="source $script" ;;
+    esac
+    [ "$driver:$mode" = mysql:csv ] && skip_header=1
+    sql_session_request "$dir" "$driver" "$(sql_session_preamble "$driver" "$mode" "$dir")
+$statements" "$skip_header"
+}
+
+sql_session_close() {
+    local dir="${1%/}" driver
+    driver=${dir##*/}
+    case "${driver%%_*}" in
+        oracle) printf 'EXIT\n' > "$dir/in" ;;
+        postgres) printf '\\q\n' > "$dir/in" ;;
+        mysql) printf 'quit\n' > "$dir/in" ;;
+    esac
+    kill "$(cat "$dir/holder.pid")" 2>/dev/null
+    for _ in 1 2 3 4 5 6 7 8 9 10; do
+        [ -e "$dir/closed" ] && break
+        sleep 0.1
+    done
+    [ -e "$dir/closed" ] || kill "$(cat "$dir/client.pid" 2>/dev/null)" 2>/dev/null
+    rm -rf "$dir"
+}
+
+sql_session_close_all() {
+    local dir
+    for dir in "$SHTEST_SQL_SESSIONS"/*/; do
+        [ -p "${dir}in" ] && sql_session_close "$dir"
+    done
+    return 0
+}
+"""
+
+
+def session_prologue() -> List[str]:
+    """Shell functions opening, using and closing SQL sessions."""
+    return _PROLOGUE.strip("\n").splitlines() + [""]
@@ -1,16 +1,19 @@
-import os
+from shtest_compiler.ast.shell_framework_ast import ActionNode
+from shtest_compiler.runtime.files import COMMAND as FILES_COMPARATOR
 
-def handle(context, params):
-    """
-    Action handler: Compares two files for equality.
-    Expects params to have 'file1' and 'file2' keys.
-    """
-    file1 = params.get("file1")
-    file2 = params.get("file2")
-    if not file1 or not file2:
-        return {"identical": False, "reason": "Missing file paths"}
-    if not os.path.isfile(file1) or not os.path.isfile(file2):
-        return {"identical": False, "reason": "One or both files do not exist"}
-    with open(file1, "rb") as f1, open(file2, "rb") as f2:
-        identical = f1.read() == f2.read()
-    return {"identical": identical, "file1": file1, "file2": file2} 
\ No newline at end of file
+
+class CompareFilesAction(ActionNode):
+    """Compare two files in chunks, printing where they first differ."""
+
+    def __init__(self, file1, file2):
+        self.file1 = file1
+        self.file2 = file2
+
+    def to_shell(self):
+        return f'{FILES_COMPARATOR} "{self.file1}" "{self.file2}"'
+
+
+def handle(params):
+    file1 = params["file1"]
+    file2 = params["file2"]
+    return CompareFilesAction(file1, file2)
@@ -2,6 +2,10 @@ from shtest_compiler.ast.shell_framework_ast import ActionNode
 
 
 class ExportVarAction(ActionNode):
+    # The generated script defines the variable itself, not only the
+    # subshell of run_action, so later steps and checkpoints see it
+    defines_variable = True
+
     def __init__(self, var, value):
         self.var = var
         self.value = value
@@ -5,18 +5,24 @@ from shtest_compiler.compiler.sql_drivers import get_sql_command
 
 
 class RunSQLScriptAction(ActionNode):
-    def __init__(self, script, sql_conn, driver="oracle"):
+    def __init__(self, script, sql_conn, driver="oracle", session=False):
         self.script = script
         self.sql_conn = sql_conn
         self.driver = driver
+        self.session = session
 
     def to_shell(self):
-        cmd = get_sql_command(script=self.script, conn=self.sql_conn, driver=self.driver)
-        return f'run_cmd "{cmd}"'
+        return get_sql_command(
+            script=self.script,
+            conn=self.sql_conn,
+            driver=self.driver,
+            session=self.session,
+        )
 
 
 def handle(params):
     script = params["script"]
     sql_conn = params["SQL_CONN"]
     driver = params.get("SQL_DRIVER", params.get("driver", "oracle"))
-    return RunSQLScriptAction(script, sql_conn, driver)
+    session = params.get("sql_session", False)
+    return RunSQLScriptAction(script, sql_conn, driver, session)
@@ -1,11 +1,22 @@
 import os
 
 from shtest_compiler.ast.shell_framework_ast import ActionNode
+from shtest_compiler.compiler.sql_cache import cache_key, cached_command, is_cacheable
+from shtest_compiler.compiler.sql_drivers import SQLITE_EXECUTOR, scratch_file
+from shtest_compiler.compiler.sql_session import session_command, supports_session
 
 
 class SQLCompareAction(ActionNode):
     def __init__(
-        self, query1, query2, sql_conn, driver="oracle", tolerance=0.0, ignore_order=False
+        self,
+        query1,
+        query2,
+        sql_conn,
+        driver="oracle",
+        tolerance=0.0,
+        ignore_order=False,
+        session=False,
+        cache=False,
     ):
         self.query1 = query1
         self.query2 = query2
@@ -13,154 +24,94 @@ class SQLCompareAction(ActionNode):
         self.driver = driver
         self.tolerance = tolerance
         self.ignore_order = ignore_order
+        self.session = session
+        self.cache = cache
+
+    @property
+    def invalidates_sql_cache(self):
+        return not (is_cacheable(self.query1) and is_cacheable(self.query2))
 
     def to_shell(self):
-        temp_file1 = f"temp_compare_1_{hash(self.query1) % 10000}.xlsx"
-        temp_file2 = f"temp_compare_2_{hash(self.query2) % 10000}.xlsx"
+        temp_file1 = scratch_file("compare_1", self.query1, ".csv")
+        temp_file2 = scratch_file("compare_2", self.query2, ".csv")
         export_cmd1 = self._export_query(self.query1, temp_file1)
         export_cmd2 = self._export_query(self.query2, temp_file2)
-        compare_cmd = self._compare_excel_files(temp_file1, temp_file2)
-        cleanup_cmd = f"rm -f {temp_file1} {temp_file2}"
+        compare_cmd = self._compare_csv_files(temp_file1, temp_file2)
+        cleanup_cmd = f'rm -f "{temp_file1}" "{temp_file2}"'
         return f"{export_cmd1} && {export_cmd2} && {compare_cmd} && {cleanup_cmd}"
 
     def _export_query(self, query, output_file):
+        command = self._rows_command(query)
+        if self.cache and is_cacheable(query):
+            key = cache_key(self.driver, self.sql_conn, query, "csv")
+            return f'{cached_command(key, command)} > "{output_file}"'
+        if "\n" in command:
+            return f'{{\n{command}\n}} > "{output_file}"'
+        return f'{command} > "{output_file}"'
+
+    def _rows_command(self, query):
+        if self.session and supports_session(self.driver):
+            return self._session_rows(query)
         if self.driver == "oracle":
-            return self._oracle_export(query, output_file)
+            return self._oracle_rows(query)
         elif self.driver == "postgres":
-            return self._postgres_export(query, output_file)
+            return self._postgres_rows(query)
         elif self.driver == "mysql":
-            return self._mysql_export(query, output_file)
+            return self._mysql_rows(query)
+        elif self.driver == "sqlite":
+            return self._sqlite_rows(query)
         else:
-            return self._oracle_export(query, output_file)
-
-    def _oracle_export(self, query, output_file):
-        temp_sql = f"temp_query_{hash(query) % 10000}.sql"
-        temp_csv = f"temp_csv_{hash(query) % 10000}.csv"
-        try:
-            return f"""cat > {temp_sql} << 'EOF'
-SET PAGESIZE 0
+            return self._oracle_rows(query)
+
+    def _write_script(self, query, temp_sql):
+        settings = ""
+        if self.driver == "oracle":
+            settings = """SET PAGESIZE 0
 SET FEEDBACK OFF
 SET VERIFY OFF
 SET HEADING OFF
 SET LINESIZE 1000
 SET TRIMSPOOL ON
 SET TRIMOUT ON
-{query}
-EOF
-sqlplus -s {self.sql_conn} @{temp_sql} > {temp_csv}
-python3 -c "
-import pandas as pd
-import sys
-try:
-    df = pd.read_csv('{temp_csv}', header=None)
-    df.to_excel('{output_file}', index=False, header=False)
-    print('Excel file created successfully')
-except Exception as e:
-    print(f'Error converting to Excel: {{e}}', file=sys.stderr)
-    sys.exit(1)
-"
-rm -f {temp_sql} {temp_csv}"""
-        except Exception as e:
-            from shtest_compiler.utils.logger import log_pipeline_error
-            import traceback
-            log_pipeline_error(f"[ERROR] {type(e).__name__}: {e}\n{traceback.format_exc()}")
-            raise
-
-    def _postgres_export(self, query, output_file):
-        temp_csv = f"temp_csv_{hash(query) % 10000}.csv"
-        try:
-            return f"""echo "{query}" | psql "{self.sql_conn}" -A -t --csv > {temp_csv}
-python3 -c "
-import pandas as pd
-import sys
-try:
-    df = pd.read_csv('{temp_csv}', header=None)
-    df.to_excel('{output_file}', index=False, header=False)
-    print('Excel file created successfully')
-except Exception as e:
-    print(f'Error converting to Excel: {{e}}', file=sys.stderr)
-    sys.exit(1)
-"
-rm -f {temp_csv}"""
-        except Exception as e:
-            from shtest_compiler.utils.logger import log_pipeline_error
-            import traceback
-            log_pipeline_error(f"[ERROR] {type(e).__name__}: {e}\n{traceback.format_exc()}")
-            raise
-
-    def _mysql_export(self, query, output_file):
-        temp_csv = f"temp_csv_{hash(query) % 10000}.csv"
-        try:
-            return f"""echo "{query}" | mysql "{self.sql_conn}" --batch --raw > {temp_csv}
-python3 -c "
-import pandas as pd
-import sys
-try:
-    df = pd.read_csv('{temp_csv}', header=None)
-    df.to_excel('{output_file}', index=False, header=False)
-    print('Excel file created successfully')
-except Exception as e:
-    print(f'Error converting to Excel: {{e}}', file=sys.stderr)
-    sys.exit(1)
-"
-rm -f {temp_csv}"""
-        except Exception as e:
-            from shtest_compiler.utils.logger import log_pipeline_error
-            import traceback
-            log_pipeline_error(f"[ERROR] {type(e).__name__}: {e}\n{traceback.format_exc()}")
-            raise
-
-    def _compare_excel_files(self, file1, file2):
-        ignore_order_flag = "True" if self.ignore_order else "False"
-        try:
-            return f'''python3 -c "
-import pandas as pd
-import numpy as np
-import sys
-
-def compare_excel_files(file1, file2, tolerance={self.tolerance}, ignore_order={ignore_order_flag}):
-    try:
-        df1 = pd.read_excel(file1, header=None)
-        df2 = pd.read_excel(file2, header=None)
-        for col in df1.columns:
-            try:
-                df1[col] = pd.to_numeric(df1[col], errors='ignore')
-                df2[col] = pd.to_numeric(df2[col], errors='ignore')
-            except:
-                pass
-        if ignore_order:
-            df1_sorted = df1.sort_values(by=list(df1.columns)).reset_index(drop=True)
-            df2_sorted = df2.sort_values(by=list(df2.columns)).reset_index(drop=True)
-        else:
-            df1_sorted = df1.reset_index(drop=True)
-            df2_sorted = df2.reset_index(drop=True)
-        if df1_sorted.shape != df2_sorted.shape:
-            print(f'SHAPE_MISMATCH: {{df1_sorted.shape}} vs {{df2_sorted.shape}}')
-            return False
-        if tolerance > 0:
-            numeric_cols = df1_sorted.select_dtypes(include=[np.number]).columns
-            if len(numeric_cols) > 0:
-                diff = np.abs(df1_sorted[numeric_cols] - df2_sorted[numeric_cols])
-                if (diff > tolerance).any().any():
-                    print(f'TOLERANCE_EXCEEDED: Max difference {{diff.max().max()}} > {{tolerance}}')
-                    return False
-        if not df1_sorted.equals(df2_sorted):
-            print('EXACT_MISMATCH: Values differ')
-            return False
-        print('COMPARISON_SUCCESS: Files are identical')
-        return True
-    except Exception as e:
-        print(f'COMPARISON_ERROR: {{e}}')
-        return False
-success = compare_excel_files('{file1}', '{file2}')
-if not success:
-    sys.exit(1)
-"'''
-        except Exception as e:
-            from shtest_compiler.utils.logger import log_pipeline_error
-            import traceback
-            log_pipeline_error(f"[ERROR] {type(e).__name__}: {e}\n{traceback.format_exc()}")
-            raise
+SET COLSEP ','
+"""
+        return f"""cat > {temp_sql} << 'EOF'
+{settings}{query}
+EOF"""
+
+    def _oracle_rows(self, query):
+        temp_sql = f'"{scratch_file("query", query, ".sql")}"'
+        return f"""{self._write_script(query, temp_sql)}
+sqlplus -s {self.sql_conn} @{temp_sql}
+rm -f {temp_sql}"""
+
+    def _session_rows(self, query):
+        temp_sql = f'"{scratch_file("query", query, ".sql")}"'
+        return f"""{self._write_script(query, temp_sql)}
+{session_command(temp_sql, self.sql_conn, self.driver, "csv")}"""
+
+    def _postgres_rows(self, query):
+        return f'echo "{query}" | psql "{self.sql_conn}" -A -t --csv'
+
+    def _mysql_rows(self, query):
+        return (
+            f'echo "{query}" | mysql "{self.sql_conn}" --batch --raw '
+            "--skip-column-names"
+        )
+
+    def _sqlite_rows(self, query):
+        return f'echo "{query}" | {SQLITE_EXECUTOR} "{self.sql_conn}" --csv'
+
+    def _compare_csv_files(self, file1, file2):
+        options = f"--tolerance {float(self.tolerance or 0.0)}"
+        if self.ignore_order:
+            options += " --ignore-order"
+        if self.driver == "mysql":
+            # mysql --batch separates columns with tabs
+            options += " --delimiter $'\\t'"
+        return (
+            f'python3 -m shtest_compiler.runtime.compare "{file1}" "{file2}" {options}'
+        )
 
 
 def handle(params):
@@ -170,4 +121,8 @@ def handle(params):
     driver = params.get("SQL_DRIVER", params.get("driver", "oracle"))
     tolerance = params.get("tolerance", 0.0)
     ignore_order = params.get("ignore_order", False)
-    return SQLCompareAction(query1, query2, sql_conn, driver, tolerance, ignore_order)
+    session = params.get("sql_session", False)
+    cache = params.get("sql_cache", False)
+    return SQLCompareAction(
+        query1, query2, sql_conn, driver, tolerance, ignore_order, session, cache
+    )
@@ -1,82 +1,116 @@
 import os
 
 from shtest_compiler.ast.shell_framework_ast import ActionNode
+from shtest_compiler.compiler.sql_cache import cache_key, cached_command, is_cacheable
+from shtest_compiler.compiler.sql_drivers import SQLITE_EXECUTOR, scratch_file
+from shtest_compiler.compiler.sql_session import session_command, supports_session
+from shtest_compiler.runtime.export import format_for
 
 
 class SQLExportAction(ActionNode):
-    def __init__(self, query, sql_conn, output_file, driver="oracle", format="excel"):
+    def __init__(
+        self,
+        query,
+        sql_conn,
+        output_file,
+        driver="oracle",
+        format=None,
+        session=False,
+        cache=False,
+    ):
         self.query = query
         self.sql_conn = sql_conn
         self.output_file = output_file
         self.driver = driver
-        self.format = format
+        self.format = format_for(output_file, format)
+        self.session = session
+        self.cache = cache
+
+    @property
+    def invalidates_sql_cache(self):
+        return not is_cacheable(self.query)
 
     def to_shell(self):
-        temp_output = f"temp_sql_output_{hash(self.query) % 10000}.csv"
         try:
-            if self.driver == "oracle":
-                sql_cmd = self._oracle_export(temp_output)
+            if self.session and supports_session(self.driver):
+                sql_cmd = self._session_export()
+            elif self.driver == "oracle":
+                sql_cmd = self._oracle_export()
             elif self.driver == "postgres":
-                sql_cmd = self._postgres_export(temp_output)
+                sql_cmd = self._postgres_export()
             elif self.driver == "mysql":
-                sql_cmd = self._mysql_export(temp_output)
-            else:
-                sql_cmd = self._oracle_export(temp_output)
-            if self.format.lower() == "excel":
-                excel_cmd = self._convert_to_excel(temp_output)
-                return f"{sql_cmd} && {excel_cmd}"
+                sql_cmd = self._mysql_export()
+            elif self.driver == "sqlite":
+                sql_cmd = self._sqlite_export()
             else:
-                return f"{sql_cmd} && cp {temp_output} {self.output_file} && rm -f {temp_output}"
+                sql_cmd = self._oracle_export()
+            if self.cache and is_cacheable(self.query):
+                key = cache_key(self.driver, self.sql_conn, self.query, "csv")
+                sql_cmd = cached_command(key, sql_cmd)
+            # The export exit status alone would hide a failing SQL client
+            return f"set -o pipefail\n{sql_cmd} | {self._export_command()}"
         except Exception as e:
             from shtest_compiler.utils.logger import log_pipeline_error
             import traceback
             log_pipeline_error(f"[ERROR] {type(e).__name__}: {e}\n{traceback.format_exc()}")
             raise
 
-    def _oracle_export(self, temp_output):
-        temp_sql = f"temp_query_{hash(self.query) % 10000}.sql"
-        return f"""cat > {temp_sql} << 'EOF'
-SET PAGESIZE 0
+    def _write_script(self, temp_sql):
+        settings = ""
+        if self.driver == "oracle":
+            settings = """SET PAGESIZE 0
 SET FEEDBACK OFF
 SET VERIFY OFF
 SET HEADING OFF
 SET LINESIZE 1000
 SET TRIMSPOOL ON
 SET TRIMOUT ON
-{self.query}
-EOF
-{self._get_oracle_command(temp_sql, self.sql_conn)} > {temp_output}
-rm -f {temp_sql}"""
+SET COLSEP ','
+"""
+        return f"""cat > {temp_sql} << 'EOF'
+{settings}{self.query}
+EOF"""
 
-    def _postgres_export(self, temp_output):
-        return (
-            f"""echo "{self.query}" | psql "{self.sql_conn}" -A -t --csv > {temp_output}"""
-        )
+    def _oracle_export(self):
+        temp_sql = f'"{scratch_file("query", self.query, ".sql")}"'
+        return f"""{self._write_script(temp_sql)}
+{self._get_oracle_command(temp_sql, self.sql_conn)}"""
 
-    def _mysql_export(self, temp_output):
-        return f"""echo "{self.query}" | mysql "{self.sql_conn}" --batch --raw > {temp_output}"""
+    def _session_export(self):
+        temp_sql = f'"{scratch_file("query", self.query, ".sql")}"'
+        return f"""{self._write_script(temp_sql)}
+{session_command(temp_sql, self.sql_conn, self.driver, "csv")}"""
+
+    def _postgres_export(self):
+        return f'echo "{self.query}" | psql "{self.sql_conn}" -A -t --csv'
+
+    def _mysql_export(self):
+        return f'echo "{self.query}" | mysql "{self.sql_conn}" --batch --raw'
+
+    def _sqlite_export(self):
+        return f'echo "{self.query}" | {SQLITE_EXECUTOR} "{self.sql_conn}" --csv'
 
     def _get_oracle_command(self, script, conn):
         return f"sqlplus -s {conn} @{script}"
 
-    def _convert_to_excel(self, csv_file):
-        return f"""python3 -c "
-import pandas as pd
-import sys
-try:
-    df = pd.read_csv('{csv_file}', header=None)
-    df.to_excel('{self.output_file}', index=False, header=False)
-    print('Excel file created successfully')
-except Exception as e:
-    print(f'Error converting to Excel: {{e}}', file=sys.stderr)
-    sys.exit(1)
-" && rm -f {csv_file}"""
+    def _export_command(self):
+        options = f"--format {self.format}"
+        if self.driver == "mysql":
+            # mysql --batch separates columns with tabs
+            options += " --delimiter $'\\t'"
+        return (
+            f'python3 -m shtest_compiler.runtime.export - "{self.output_file}" {options}'
+        )
 
 
 def handle(params):
     query = params["query"]
     sql_conn = params["SQL_CONN"]
-    output_file = params["output_file"]
+    output_file = params.get("output_file") or params["output"]
     driver = params.get("SQL_DRIVER", params.get("driver", "oracle"))
-    format = params.get("format", "excel")
-    return SQLExportAction(query, sql_conn, output_file, driver, format)
+    format = params.get("format")
+    session = params.get("sql_session", False)
+    cache = params.get("sql_cache", False)
+    return SQLExportAction(
+        query, sql_conn, output_file, driver, format, session, cache
+    )
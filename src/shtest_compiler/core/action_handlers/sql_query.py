@@ -1,61 +1,108 @@
 import os
 
 from shtest_compiler.ast.shell_framework_ast import ActionNode
-from shtest_compiler.compiler.sql_drivers import get_sql_command
+from shtest_compiler.compiler.sql_cache import cache_key, cached_command, is_cacheable
+from shtest_compiler.compiler.sql_drivers import (
+    SQLITE_EXECUTOR,
+    get_sql_command,
+    scratch_file,
+)
+from shtest_compiler.compiler.sql_session import session_command, supports_session
 
 
 class SQLQueryAction(ActionNode):
-    def __init__(self, query, sql_conn, output_file=None, driver="oracle"):
+    def __init__(
+        self,
+        query,
+        sql_conn,
+        output_file=None,
+        driver="oracle",
+        session=False,
+        cache=False,
+    ):
         self.query = query
         self.sql_conn = sql_conn
         self.output_file = output_file
         self.driver = driver
+        self.session = session
+        self.cache = cache
+
+    @property
+    def invalidates_sql_cache(self):
+        return not is_cacheable(self.query)
 
     def to_shell(self):
+        if not (self.cache and is_cacheable(self.query)):
+            return self._query(self.output_file)
+        key = cache_key(self.driver, self.sql_conn, self.query, "plain")
+        command = cached_command(key, self._query(None))
+        if self.output_file:
+            return f'{command} > "{self.output_file}"'
+        return command
+
+    def _query(self, output_file):
+        if self.session and supports_session(self.driver):
+            return self._session_query(output_file)
         if self.driver == "oracle":
-            if self.output_file:
-                return self._oracle_query_with_output()
+            if output_file:
+                return self._oracle_query_with_output(output_file)
             else:
                 return self._oracle_query_stdout()
         elif self.driver == "postgres":
-            return self._postgres_query()
+            return self._postgres_query(output_file)
         elif self.driver == "mysql":
-            return self._mysql_query()
+            return self._mysql_query(output_file)
+        elif self.driver == "sqlite":
+            return self._sqlite_query(output_file)
         else:
             return self._oracle_query_stdout()
 
     def _oracle_query_stdout(self):
-        temp_sql = f"temp_query_{hash(self.query) % 10000}.sql"
+        temp_sql = f'"{scratch_file("query", self.query, ".sql")}"'
         return f"""cat > {temp_sql} << 'EOF'
 {self.query}
 EOF
 {get_sql_command(temp_sql, self.sql_conn, self.driver)}
 rm -f {temp_sql}"""
 
-    def _oracle_query_with_output(self):
-        temp_sql = f"temp_query_{hash(self.query) % 10000}.sql"
+    def _oracle_query_with_output(self, output_file):
+        temp_sql = f'"{scratch_file("query", self.query, ".sql")}"'
         return f"""cat > {temp_sql} << 'EOF'
 {self.query}
 EOF
-{get_sql_command(temp_sql, self.sql_conn, self.driver)} > {self.output_file}
+{get_sql_command(temp_sql, self.sql_conn, self.driver)} > "{output_file}"
 rm -f {temp_sql}"""
 
-    def _postgres_query(self):
-        if self.output_file:
-            return f"""echo "{self.query}" | psql "{self.sql_conn}" -A -t > {self.output_file}"""
+    def _session_query(self, output_file):
+        temp_sql = f'"{scratch_file("query", self.query, ".sql")}"'
+        redirect = f' > "{output_file}"' if output_file else ""
+        return f"""cat > {temp_sql} << 'EOF'
+{self.query}
+EOF
+{session_command(temp_sql, self.sql_conn, self.driver, "plain")}{redirect}"""
+
+    def _postgres_query(self, output_file):
+        if output_file:
+            return f'echo "{self.query}" | psql "{self.sql_conn}" -A -t > "{output_file}"'
         else:
             return f"""echo "{self.query}" | psql "{self.sql_conn}" -A -t"""
 
-    def _mysql_query(self):
-        if self.output_file:
-            return f"""echo "{self.query}" | mysql "{self.sql_conn}" > {self.output_file}"""
+    def _mysql_query(self, output_file):
+        if output_file:
+            return f'echo "{self.query}" | mysql "{self.sql_conn}" > "{output_file}"'
         else:
             return f'''echo "{self.query}" | mysql "{self.sql_conn}"'''
 
+    def _sqlite_query(self, output_file):
+        redirect = f' > "{output_file}"' if output_file else ""
+        return f'echo "{self.query}" | {SQLITE_EXECUTOR} "{self.sql_conn}"{redirect}'
+
 
 def handle(params):
     query = params["query"]
     sql_conn = params["SQL_CONN"]
     driver = params.get("SQL_DRIVER", params.get("driver", "oracle"))
     output_file = params.get("output_file", None)
-    return SQLQueryAction(query, sql_conn, output_file, driver)
+    session = params.get("sql_session", False)
+    cache = params.get("sql_cache", False)
+    return SQLQueryAction(query, sql_conn, output_file, driver, session, cache)
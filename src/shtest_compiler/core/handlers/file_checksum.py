@@ -0,0 +1,39 @@
+from shtest_compiler.ast.shell_framework_ast import ValidationCheck
+from shtest_compiler.runtime.checksum import COMMAND as CHECKSUM, DEFAULT_ALGORITHM
+from shtest_compiler.utils.shell_utils import shell_escape
+
+
+def handle(params):
+    file_path = params.get("file")
+    checksum = str(params.get("checksum", "")).strip().lower()
+    algorithm = str(params.get("algorithm") or DEFAULT_ALGORITHM).strip().lower()
+    handler = params.get("handler", "file_checksum")
+    scope = params.get("scope", "global")
+    expected = params.get(
+        "canonical_phrase",
+        f"le fichier {file_path} a pour somme de contrôle {algorithm} {checksum}",
+    )
+    opposite = params.get(
+        "opposite",
+        f"le fichier {file_path} n'a pas pour somme de contrôle {algorithm} {checksum}",
+    )
+
+    # Return atomic command only - no if/then/else logic
+    # Digests are cached for the run, so other checks on the file do not reread it
+    actual_cmd = (
+        f"{CHECKSUM} {shell_escape(file_path)} --algorithm {shell_escape(algorithm)} "
+        f"--expect {shell_escape(checksum)}"
+    )
+
+    return ValidationCheck(
+        expected=expected,
+        actual_cmd=actual_cmd,
+        handler=handler,
+        scope=scope,
+        params={
+            "file_path": file_path,
+            "algorithm": algorithm,
+            "checksum": checksum,
+            "opposite": opposite,
+        },
+    )
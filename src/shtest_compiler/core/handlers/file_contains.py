@@ -1,10 +1,9 @@
 from shtest_compiler.ast.shell_framework_ast import ValidationCheck
+from shtest_compiler.compiler.compressed_files import read_command
 
 
 def handle(params):
-    phrase = params["canonical_phrase"]
     handler = params.get("handler", "file_contains")
-    pattern_entry = params.get("pattern_entry", {})
     file = params.get("file")
     text = params.get("text")
     # Scope logic: if file is missing, this is local (last_action)
@@ -12,11 +11,11 @@ def handle(params):
         scope = "last_action"
     else:
         scope = params.get("scope", "global")
-    expected = phrase  # template, not substituted
-    opposite_phrase = pattern_entry.get("opposite", {}).get("phrase")
-    opposite = opposite_phrase if opposite_phrase else f"NOT({expected})"
+    expected = params.get("canonical_phrase", f"le fichier {file} contient {text}")
+    opposite = params.get("opposite", f"le fichier {file} ne contient pas {text}")
     # Return atomic command only - no if/then/else logic
-    actual_cmd = f"grep -q '{text}' '{file}'"
+    # Compressed logs are streamed through their decompressor
+    actual_cmd = f"{read_command(file)} | grep -q '{text}'"
     return ValidationCheck(
         expected=expected,
         actual_cmd=actual_cmd,
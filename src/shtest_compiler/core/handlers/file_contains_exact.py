@@ -1,4 +1,5 @@
 from shtest_compiler.ast.shell_framework_ast import ValidationCheck
+from shtest_compiler.compiler.compressed_files import read_command
 
 
 def handle(params):
@@ -18,8 +19,8 @@ def handle(params):
     opposite = params.get(
         "opposite", f"le fichier {file_path} ne contient pas exactement {text}"
     )
-    # Atomic check: compare file content exactly
-    actual_cmd = f'[ "$(cat {file_path})" = "{text}" ]'
+    # Atomic check: compare file content exactly, decompressed if needed
+    actual_cmd = f'[ "$({read_command(file_path)})" = "{text}" ]'
     return ValidationCheck(
         expected=expected,
         actual_cmd=actual_cmd,
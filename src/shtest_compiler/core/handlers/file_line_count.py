@@ -0,0 +1,31 @@
+from shtest_compiler.ast.shell_framework_ast import ValidationCheck
+from shtest_compiler.compiler.compressed_files import read_command
+from shtest_compiler.utils.shell_utils import shell_escape
+
+
+def handle(params):
+    file_path = params.get("file") or params.get("groups", [None, None])[0]
+    count = params.get("count") or params.get("groups", [None, None])[1]
+    handler = params.get("handler", "file_line_count")
+    scope = params.get("scope", "global")
+    expected = params.get(
+        "canonical_phrase", f"le fichier {file_path} contient {count} lignes"
+    )
+    opposite = params.get(
+        "opposite", f"le fichier {file_path} ne contient pas {count} lignes"
+    )
+
+    # Return atomic command only - no if/then/else logic
+    # A missing file must fail, not count as empty
+    actual_cmd = (
+        f"test -f {shell_escape(file_path)} && "
+        f'[ "$({read_command(file_path)} | wc -l)" -eq {int(count)} ]'
+    )
+
+    return ValidationCheck(
+        expected=expected,
+        actual_cmd=actual_cmd,
+        handler=handler,
+        scope=scope,
+        params={"file_path": file_path, "count": count, "opposite": opposite},
+    )
@@ -1,4 +1,5 @@
 from shtest_compiler.ast.shell_framework_ast import ValidationCheck
+from shtest_compiler.runtime.files import COMMAND as FILES_COMPARATOR
 
 
 def handle(params):
@@ -20,7 +21,8 @@ def handle(params):
     )
 
     # Return atomic command only - no if/then/else logic
-    actual_cmd = f"test -f '{file1}' && test -f '{file2}' && cmp -s '{file1}' '{file2}'"
+    # The comparator fails on a missing file and prints the first difference
+    actual_cmd = f"{FILES_COMPARATOR} '{file1}' '{file2}'"
 
     return ValidationCheck(
         expected=expected,
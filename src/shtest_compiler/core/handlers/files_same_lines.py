@@ -0,0 +1,70 @@
+import os
+
+from shtest_compiler.ast.shell_framework_ast import ValidationCheck
+from shtest_compiler.core.errors import ValidationParseError
+
+COMPARATOR = "python3 -m shtest_compiler.runtime.compare"
+
+
+def _report_option(file1, file2):
+    # Full list of differences, written only when SHTEST_REPORT_DIR is set
+    name = f"{os.path.basename(file1)}_vs_{os.path.basename(file2)}.diff"
+    return f'${{SHTEST_REPORT_DIR:+--report "$SHTEST_REPORT_DIR/{name}"}}'
+
+
+def _tolerance(value):
+    try:
+        return float(str(value).replace(",", "."))
+    except ValueError:
+        raise ValidationParseError(f"Invalid tolerance: '{value}' is not a number")
+
+
+def handle(params):
+    file1 = params.get("file1")
+    file2 = params.get("file2")
+    column = params.get("column")
+    tolerance = params.get("tolerance")
+    scope = params.get("scope", "global")
+    handler = params.get("handler", "files_same_lines")
+
+    qualifier = ""
+    if column:
+        qualifier += f" par clé colonne {column}"
+    if tolerance:
+        qualifier += f" à {tolerance} près"
+    expected = params.get(
+        "canonical_phrase",
+        f"les fichiers {file1} et {file2} contiennent les mêmes lignes{qualifier}",
+    )
+    opposite = params.get(
+        "opposite",
+        f"les fichiers {file1} et {file2} ne contiennent pas les mêmes lignes{qualifier}",
+    )
+
+    # Whole lines compared exactly, unless rows are matched by key or numbers
+    # compared within a tolerance: then files are read as CSV, with the
+    # delimiter guessed from the header (";" in French-locale exports).
+    if column:
+        options = f"--key {str(column).strip()} --delimiter auto"
+    elif tolerance:
+        options = "--ignore-order --delimiter auto"
+    else:
+        options = "--ignore-order --lines"
+    if tolerance:
+        options += f" --tolerance {_tolerance(tolerance)}"
+    actual_cmd = (
+        f"{COMPARATOR} '{file1}' '{file2}' {options} {_report_option(file1, file2)}"
+    )
+    return ValidationCheck(
+        expected=expected,
+        actual_cmd=actual_cmd,
+        handler=handler,
+        scope=scope,
+        params={
+            "file1": file1,
+            "file2": file2,
+            "column": column,
+            "tolerance": tolerance,
+            "opposite": opposite,
+        },
+    )
@@ -4,11 +4,14 @@ import sys
 import openpyxl
 from openpyxl.utils import get_column_letter
 
-from shtest_compiler.command_loader import PatternRegistry
+from shtest_compiler.command_loader import PatternRegistry, load_yaml
 
 
-def export_patterns_to_excel(actions_yml, validations_yml, output_xlsx):
-    registry = PatternRegistry(actions_yml, validations_yml)
+def _patterns_workbook(actions_yml, validations_yml):
+    registry = PatternRegistry(
+        load_yaml(actions_yml).get("actions", []),
+        load_yaml(validations_yml).get("validations", []),
+    )
     wb = openpyxl.Workbook()
     ws_actions = wb.active
     ws_actions.title = "Actions"
@@ -35,20 +38,44 @@ def export_patterns_to_excel(actions_yml, validations_yml, output_xlsx):
         ws_valid.append([phrase, handler, ", ".join(aliases)])
     for col in range(1, 4):
         ws_valid.column_dimensions[get_column_letter(col)].width = 40
+    return wb
+
 
+def export_patterns_to_excel(actions_yml, validations_yml, output_xlsx):
+    wb = _patterns_workbook(actions_yml, validations_yml)
     wb.save(output_xlsx)
     print(f"Exporté vers {output_xlsx}")
 
 
-def export_tests_to_excel(input_dir, output_file):
-    """Export patterns to Excel using default YAML files."""
+def export_tests_to_excel(input_dir, output_file, tests=None):
+    """Export patterns to Excel using default YAML files.
+
+    *tests* are parsed ``ShtestFile`` ASTs (as produced by the run_all
+    pipeline); their actions are listed in a "Tests" sheet.
+    """
     actions_yml = os.path.join(
         os.path.dirname(__file__), "config", "patterns_actions.yml"
     )
     validations_yml = os.path.join(
         os.path.dirname(__file__), "config", "patterns_validations.yml"
     )
-    export_patterns_to_excel(actions_yml, validations_yml, output_file)
+    wb = _patterns_workbook(actions_yml, validations_yml)
+    if tests:
+        ws_tests = wb.create_sheet("Tests")
+        ws_tests.append(["Fichier", "Étape", "Ligne", "Action", "Résultat attendu"])
+        for test in tests:
+            path = test.path or ""
+            if path and os.path.isdir(input_dir):
+                path = os.path.relpath(path, input_dir)
+            for step in test.steps:
+                for action in step.actions:
+                    ws_tests.append(
+                        [path, step.name, action.lineno, action.command, action.result_expr]
+                    )
+        for col, width in enumerate((30, 30, 8, 60, 60), start=1):
+            ws_tests.column_dimensions[get_column_letter(col)].width = width
+    wb.save(output_file)
+    print(f"Exporté vers {output_file}")
 
 
 if __name__ == "__main__":
@@ -3,9 +3,19 @@ import sys
 from glob import glob
 
 from .compile_file import compile_file
+from .compiler.failure_policy import FAIL_FAST
 
 
-def generate_tests(input_dir: str, output_dir: str):
+def generate_tests(
+    input_dir: str,
+    output_dir: str,
+    failure_policy: str = FAIL_FAST,
+    checkpoints: bool = False,
+    fixture_cache: bool = False,
+    sql_session: bool = False,
+    sql_cache: bool = False,
+    sql_jobs: int = 1,
+):
     os.makedirs(output_dir, exist_ok=True)
     any_failed = False
     debug = os.environ.get("SHTEST_DEBUG", "0") == "1"
@@ -23,6 +33,12 @@ def generate_tests(input_dir: str, output_dir: str):
                 output_path=out_path,
                 debug=debug,
                 debug_output_path=debug_output_path,
+                failure_policy=failure_policy,
+                checkpoints=checkpoints,
+                fixture_cache=fixture_cache,
+                sql_session=sql_session,
+                sql_cache=sql_cache,
+                sql_jobs=sql_jobs,
             )
             print(f"Generated {out_path}")
         except Exception as e:
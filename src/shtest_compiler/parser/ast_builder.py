@@ -5,6 +5,7 @@ This module provides a flexible AST builder system that can be extended
 with custom builders, validators, and transformers.
 """
 
+import functools
 import os
 from abc import ABC, abstractmethod
 from typing import Any, Callable, Dict, List, Optional
@@ -14,22 +15,24 @@ import yaml
 from shtest_compiler.ast.shell_framework_ast import ValidationCheck
 from shtest_compiler.utils.shell_utils import resource_path
 
-from .core import ASTBuilder, TokenLike
+from .core import WARNING, ASTBuilder, Diagnostic, ParseError, TokenLike
 from .shtest_ast import Action, ShtestFile, TestStep
 
-# Load and cache the YAML validation patterns
-_patterns_cache = None
-
-
+@functools.lru_cache(maxsize=1)
 def load_validation_patterns():
-    global _patterns_cache
-    if _patterns_cache is not None:
-        return _patterns_cache
+    """The YAML validation patterns, loaded once and shared: do not modify."""
     patterns_path = resource_path("config/patterns_validations.yml")
     with open(patterns_path, encoding="utf-8") as f:
-        data = yaml.safe_load(f)
-    _patterns_cache = data
-    return data
+        return yaml.safe_load(f)
+
+
+def _column(action: Action, text: Optional[str] = None) -> int:
+    """Column of *text* in the line of *action*, or of the action itself."""
+    line = (action.raw_line or "").split("\n", 1)[0]
+    index = line.find(text) if text else -1
+    if index >= 0:
+        return index + 1
+    return len(line) - len(line.lstrip()) + 1
 
 
 def get_handler_and_scope_for_phrase(phrase):
@@ -50,19 +53,25 @@ class ASTValidator:
         """Add a validation function."""
         self.validators.append(validator)
 
-    def validate(self, ast: ShtestFile) -> List[str]:
-        """Run all validators and return list of errors."""
+    def validate(self, ast: ShtestFile) -> List[Diagnostic]:
+        """Run all validators and return the errors they found.
+
+        Validators return a message, a ``Diagnostic`` or a list of either.
+        """
         errors = []
         for validator in self.validators:
             try:
                 result = validator(ast)
                 if result:
-                    errors.extend(result if isinstance(result, list) else [result])
+                    for error in result if isinstance(result, list) else [result]:
+                        errors.append(
+                            error if isinstance(error, Diagnostic) else Diagnostic(str(error))
+                        )
             except Exception as e:
                 from shtest_compiler.utils.logger import log_pipeline_error
                 import traceback
                 log_pipeline_error(f"[ERROR] {type(e).__name__}: {e}\n{traceback.format_exc()}")
-                errors.append(f"Validation error: {e}")
+                errors.append(Diagnostic(f"Validation error: {e}"))
         return errors
 
 
@@ -115,31 +124,37 @@ class DefaultASTBuilder(ASTBuilder):
         self.transformer.add_transformer(self._normalize_step_names)
         self.transformer.add_transformer(self._add_default_actions)
 
-    def _validate_steps(self, ast: ShtestFile) -> List[str]:
+    def _validate_steps(self, ast: ShtestFile) -> List[Diagnostic]:
         """Validate that steps have proper structure."""
         errors = []
         for i, step in enumerate(ast.steps):
             if not step.name or step.name.strip() == "":
-                errors.append(f"Step {i+1} has empty name")
+                errors.append(Diagnostic(f"Step {i+1} has empty name", step.lineno, 1))
             if len(step.actions) == 0:
-                errors.append(f"Step '{step.name}' has no actions")
+                errors.append(
+                    Diagnostic(f"Step '{step.name}' has no actions", step.lineno, 1)
+                )
         return errors
 
-    def _validate_actions(self, ast: ShtestFile) -> List[str]:
+    def _validate_actions(self, ast: ShtestFile) -> List[Diagnostic]:
         """Validate that actions have proper structure."""
         errors = []
         for step in ast.steps:
             for i, action in enumerate(step.actions):
                 if action.command is None and action.result_expr is None:
                     errors.append(
-                        f"Action {i+1} in step '{step.name}' has neither command nor result"
+                        Diagnostic(
+                            f"Action {i+1} in step '{step.name}' has neither command nor result",
+                            action.lineno,
+                            _column(action),
+                        )
                     )
         return errors
 
     def _validate_nonempty_file(self, ast: ShtestFile) -> list:
         """Validate that the file is not empty (has at least one step)."""
         if not ast.steps or len(ast.steps) == 0:
-            return ["File is empty or contains no steps"]
+            return [Diagnostic("File is empty or contains no steps", 1, 1)]
         return []
 
     def _validate_action_commands(self, ast: ShtestFile) -> list:
@@ -152,12 +167,20 @@ class DefaultASTBuilder(ASTBuilder):
                     cmd = action.command.strip()
                     if not cmd or cmd.startswith("#"):
                         errors.append(
-                            f"Action {i+1} in step '{step.name}' has empty or comment-only command: '{action.command}'"
+                            Diagnostic(
+                                f"Action {i+1} in step '{step.name}' has empty or comment-only command: '{action.command}'",
+                                action.lineno,
+                                _column(action),
+                            )
                         )
                     # Check for malformed commands (just keywords without content)
                     if cmd in ["Action:", "Vérifier:", "Étape:"]:
                         errors.append(
-                            f"Action {i+1} in step '{step.name}' has malformed command: '{action.command}'"
+                            Diagnostic(
+                                f"Action {i+1} in step '{step.name}' has malformed command: '{action.command}'",
+                                action.lineno,
+                                _column(action),
+                            )
                         )
         return errors
 
@@ -171,16 +194,28 @@ class DefaultASTBuilder(ASTBuilder):
                     validation = action.result_expr.strip()
                     if not validation:
                         errors.append(
-                            f"Action {i+1} in step '{step.name}' has empty validation"
+                            Diagnostic(
+                                f"Action {i+1} in step '{step.name}' has empty validation",
+                                action.lineno,
+                                _column(action),
+                            )
                         )
                     elif validation.startswith("#"):
                         errors.append(
-                            f"Action {i+1} in step '{step.name}' has comment-only validation: '{action.result_expr}'"
+                            Diagnostic(
+                                f"Action {i+1} in step '{step.name}' has comment-only validation: '{action.result_expr}'",
+                                action.lineno,
+                                _column(action),
+                            )
                         )
                     # Check for incomplete validation phrases
                     elif validation in ["Vérifier:", "Le", "La", "Les"]:
                         errors.append(
-                            f"Action {i+1} in step '{step.name}' has incomplete validation: '{action.result_expr}'"
+                            Diagnostic(
+                                f"Action {i+1} in step '{step.name}' has incomplete validation: '{action.result_expr}'",
+                                action.lineno,
+                                _column(action),
+                            )
                         )
         return errors
 
@@ -192,7 +227,11 @@ class DefaultASTBuilder(ASTBuilder):
         for step in ast.steps:
             if hasattr(step, "steps") and step.steps:
                 errors.append(
-                    f"Step '{step.name}' contains nested steps, which is not allowed"
+                    Diagnostic(
+                        f"Step '{step.name}' contains nested steps, which is not allowed",
+                        step.lineno,
+                        1,
+                    )
                 )
         return errors
 
@@ -211,7 +250,11 @@ class DefaultASTBuilder(ASTBuilder):
                         and "missing the step keyword" in action.raw_line
                     ):
                         errors.append(
-                            f"Found orphaned action that should have its own step: '{action.raw_line}'"
+                            Diagnostic(
+                                f"Found orphaned action that should have its own step: '{action.raw_line}'",
+                                action.lineno,
+                                _column(action),
+                            )
                         )
                         break
                     # Also check for actions that come after comments about missing step keywords
@@ -220,12 +263,49 @@ class DefaultASTBuilder(ASTBuilder):
                         and "This should cause a syntax error" in action.raw_line
                     ):
                         errors.append(
-                            f"Found orphaned action that should have its own step: '{action.raw_line}'"
+                            Diagnostic(
+                                f"Found orphaned action that should have its own step: '{action.raw_line}'",
+                                action.lineno,
+                                _column(action),
+                            )
                         )
                         break
 
         return errors
 
+    def _check_phrases(self, ast: ShtestFile) -> List[Diagnostic]:
+        """Resolve every action and validation phrase as the compiler will.
+
+        Validations that cannot be compiled are errors; action phrases that
+        will run as raw shell commands are warnings.
+        """
+        from shtest_compiler.compiler.phrase_checks import (
+            action_problems,
+            validation_problems,
+        )
+
+        diagnostics = []
+        for step in ast.steps:
+            for action in step.actions:
+                if action.command:
+                    for problem in action_problems(action.command):
+                        diagnostics.append(
+                            Diagnostic(
+                                problem,
+                                action.lineno,
+                                _column(action, action.command),
+                                severity=WARNING,
+                            )
+                        )
+                validation = (action.result_expr or "").strip()
+                # Empty and comment-only validations are reported above
+                if validation and not validation.startswith("#"):
+                    for phrase, problem in validation_problems(validation):
+                        diagnostics.append(
+                            Diagnostic(problem, action.lineno, _column(action, phrase))
+                        )
+        return diagnostics
+
     def _normalize_step_names(self, ast: ShtestFile) -> ShtestFile:
         """Normalize step names (trim whitespace, etc.)."""
         for step in ast.steps:
@@ -245,21 +325,35 @@ class DefaultASTBuilder(ASTBuilder):
         # Apply transformations
         ast = self.transformer.transform(ast)
 
+        # Problems that do not stop the parse: they are all reported with the
+        # structural errors, and the compiler refuses a test with errors
+        ast.diagnostics.extend(self._check_phrases(ast))
+        ast.diagnostics.sort(key=lambda d: d.lineno or 0)
+        for diagnostic in ast.diagnostics:
+            diagnostic.path = diagnostic.path or path
+
         # Validate the AST
         errors = self.validator.validate(ast)
         if errors:
-            from .core import ParseError
             from shtest_compiler.utils.logger import log_pipeline_error
             import traceback
-            log_pipeline_error(f"[ERROR] AST validation failed: {'; '.join(errors)}\n{traceback.format_exc()}")
-            raise ParseError(f"AST validation failed: {'; '.join(errors)}")
+            message = f"AST validation failed: {'; '.join(e.message for e in errors)}"
+            log_pipeline_error(f"[ERROR] {message}\n{traceback.format_exc()}")
+            for error in errors:
+                error.path = error.path or path
+            diagnostics = sorted(errors + ast.diagnostics, key=lambda d: d.lineno or 0)
+            raise ParseError(message, diagnostics=diagnostics)
 
         return ast
 
     def _build_basic_ast(
         self, tokens: List[TokenLike], path: Optional[str] = None
     ) -> ShtestFile:
-        """Build the basic AST structure from tokens."""
+        """Build the basic AST structure from tokens.
+
+        Lines that are not part of a step are recorded in ``diagnostics`` and
+        skipped, so that the rest of the file is still checked.
+        """
         shtest = ShtestFile(path=path)
         current_step = None
 
@@ -269,6 +363,30 @@ class DefaultASTBuilder(ASTBuilder):
                 current_step = shtest.add_step(token.value.strip(), lineno=token.lineno)
                 continue
 
+            if token.kind == "TEXT":
+                shtest.diagnostics.append(
+                    Diagnostic(
+                        f"Unrecognized line: '{token.value}' (expected 'Étape:', 'Action:' or 'Résultat:')",
+                        token.lineno,
+                        (token.column or 0) + 1,
+                    )
+                )
+                continue
+
+            if current_step is None and token.kind in (
+                "ACTION_ONLY",
+                "ACTION_RESULT",
+                "RESULT_ONLY",
+            ):
+                shtest.diagnostics.append(
+                    Diagnostic(
+                        f"Action outside of a step: '{token.value}'",
+                        token.lineno,
+                        (token.column or 0) + 1,
+                    )
+                )
+                continue
+
             # Combine ACTION_ONLY + RESULT_ONLY as a single Action
             if (
                 token.kind == "ACTION_ONLY"
@@ -0,0 +1,198 @@
+"""
+On-disk cache of parsed .shtest files.
+
+Each parsed file is stored under the hash of its content, in a compact
+versioned form (zlib-compressed JSON) holding its ``ShtestFile``. Once ``SHTEST_AST_CACHE`` names
+a directory, every tool parsing through ``ConfigurableParser`` (verify,
+compile, run_all, the Excel export) loads unchanged files from it instead of
+lexing and parsing them again::
+
+    export SHTEST_AST_CACHE=~/.cache/shtest/ast
+    shtest verify tests/       # parses every file and fills the cache
+    shtest verify tests/       # loads every unchanged file
+
+An entry records the fingerprint of what produced it: the package code, the
+configuration files (grammar and phrase patterns), the plugins, and the
+grammar and AST builder of the parser. An entry with another fingerprint is
+ignored, then replaced, so editing a pattern or a plugin invalidates the
+cache without any action. Only files that parse are cached.
+
+Entries hold no phrase resolution: the compiler resolves each phrase again
+with its parameters, so a handler name stored here would only make misses
+pay for pattern matching twice.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zlib
+from typing import Optional
+
+from ..utils.shell_utils import resource_manifest
+from .core import Diagnostic
+from .shtest_ast import Action, ShtestFile, TestStep
+
+FORMAT_VERSION = 2
+
+CACHE_VARIABLE = "SHTEST_AST_CACHE"
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def dump_ast(ast: ShtestFile) -> dict:
+    """JSON-ready form of *ast*; its path is left out, as entries are shared
+    by every file with the same content."""
+    return {
+        "steps": [
+            [
+                step.name,
+                step.lineno,
+                [
+                    [action.command, action.result_expr, action.lineno, action.raw_line]
+                    for action in step.actions
+                ],
+            ]
+            for step in ast.steps
+        ],
+        "variables": ast.variables,
+        "arguments": ast.arguments,
+        "last_file_var": ast.last_file_var,
+        "diagnostics": [
+            [d.message, d.lineno, d.column, d.severity] for d in ast.diagnostics
+        ],
+    }
+
+
+def load_ast(data: dict, path: Optional[str] = None) -> ShtestFile:
+    """The ``ShtestFile`` of the file *path* from its ``dump_ast`` form."""
+    ast = ShtestFile(
+        variables=data["variables"],
+        arguments=data["arguments"],
+        last_file_var=data["last_file_var"],
+        path=path,
+    )
+    for name, lineno, actions in data["steps"]:
+        ast.steps.append(
+            TestStep(
+                name=name,
+                lineno=lineno,
+                actions=[
+                    Action(command, result_expr, None, action_lineno, raw_line)
+                    for command, result_expr, action_lineno, raw_line in actions
+                ],
+            )
+        )
+    ast.diagnostics = [
+        Diagnostic(message, lineno, column, path, severity)
+        for message, lineno, column, severity in data["diagnostics"]
+    ]
+    return ast
+
+
+def source_fingerprint() -> str:
+    """Hash of the (mtime, size) of the package code, configuration and plugins."""
+    files = set()
+    for root, dirs, names in os.walk(PACKAGE_DIR):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        files.update(os.path.join(root, name) for name in names if name.endswith(".py"))
+    files.update(path for path in resource_manifest().values() if os.path.isfile(path))
+    digest = hashlib.sha256(str(FORMAT_VERSION).encode())
+    for path in sorted(files):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        digest.update(f"{path}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode())
+    return digest.hexdigest()
+
+
+class AstCache:
+    """Parsed files of *directory*, keyed by content hash.
+
+    The fingerprint of the package is computed once; ``refresh`` computes it
+    again, for long-running processes whose configuration may change. An
+    instance may be shared by parsers running in several threads.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = os.path.expanduser(directory)
+        self.hits = 0
+        self.misses = 0
+        self._fingerprint: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        self._fingerprint = None
+
+    def fingerprint(self, parser) -> str:
+        """Fingerprint of the entries produced by *parser*."""
+        if self._fingerprint is None:
+            self._fingerprint = source_fingerprint()
+        components = [self._fingerprint] + [
+            f"{type(c).__module__}.{type(c).__qualname__}"
+            for c in (parser.lexer, parser.grammar, parser.ast_builder)
+        ]
+        return hashlib.sha256("\n".join(components).encode()).hexdigest()
+
+    def _entry_path(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + ".ast")
+
+    def load(self, parser, text: str, path: Optional[str] = None) -> Optional[ShtestFile]:
+        """The cached AST of *text*, or None when there is no valid entry."""
+        try:
+            with open(self._entry_path(text), "rb") as f:
+                payload = json.loads(zlib.decompress(f.read()))
+            if payload["version"] != FORMAT_VERSION or payload["fingerprint"] != self.fingerprint(
+                parser
+            ):
+                return None
+            return load_ast(payload["ast"], path)
+        except (OSError, ValueError, KeyError, TypeError, zlib.error):
+            # Missing, stale or unreadable entries are parsed again
+            return None
+
+    def store(self, parser, text: str, ast: ShtestFile) -> ShtestFile:
+        """Cache *ast*, parsed from *text*; writes are atomic, so processes
+        filling the same cache never read a partial entry."""
+        payload = {
+            "version": FORMAT_VERSION,
+            "fingerprint": self.fingerprint(parser),
+            "ast": dump_ast(ast),
+        }
+        data = zlib.compress(
+            json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        )
+        target = self._entry_path(text)
+        try:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            fd, temporary = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temporary, target)
+        except OSError as e:
+            # The cache only saves time: a read-only directory disables it
+            from ..utils.logger import log_warning
+
+            log_warning(f"AST cache not written to {target}: {e}")
+        return ast
+
+    def parse(self, parser, text: str, path: Optional[str] = None) -> ShtestFile:
+        """The AST of *text*: loaded from the cache, or parsed and stored."""
+        ast = self.load(parser, text, path)
+        with self._lock:
+            if ast is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if ast is not None:
+            return ast
+        return self.store(parser, text, parser.parse(text, path=path))
+
+
+def default_cache() -> Optional[AstCache]:
+    """The cache named by ``SHTEST_AST_CACHE``, None when it is not set."""
+    directory = os.environ.get(CACHE_VARIABLE)
+    return AstCache(directory) if directory else None
@@ -5,9 +5,11 @@ Configurable parser that can use different lexers, grammars, and AST builders.
 import os
 from typing import Optional
 
+from ..compiler.profiling import stage
 from ..utils.logger import debug_log, is_debug_enabled
 from .ast_builder import DefaultASTBuilder
-from .core import ParseError
+from .ast_cache import AstCache, default_cache
+from .core import ParseError, diagnostics_of
 from .grammar import DefaultGrammar
 from .lexer import ConfigurableLexer
 from .shtest_ast import ShtestFile
@@ -22,38 +24,48 @@ class ConfigurableParser:
         grammar: Optional[DefaultGrammar] = None,
         ast_builder: Optional[DefaultASTBuilder] = None,
         debug: bool = False,
+        cache: Optional[AstCache] = None,
     ):
         # Use global debug configuration
         self.debug = debug or is_debug_enabled()
         self.lexer = lexer or ConfigurableLexer(debug=self.debug)
         self.grammar = grammar or DefaultGrammar()
         self.ast_builder = ast_builder or DefaultASTBuilder()
+        # Files are loaded from the AST cache when SHTEST_AST_CACHE is set
+        self.cache = cache if cache is not None else default_cache()
 
     def parse(self, text: str, path: Optional[str] = None) -> ShtestFile:
         """Parse text into an AST."""
         try:
             if self.debug:
                 debug_log(f"Parsing text with {len(text.splitlines())} lines")
-            tokens = list(self.lexer.lex(text))
+            with stage("lex"):
+                tokens = list(self.lexer.lex(text))
             if self.debug:
                 debug_log(f"Got {len(tokens)} tokens")
-            grammar_result = self.grammar.match(tokens)
-            ast = self.ast_builder.build(grammar_result, path=path)
+            with stage("grammar"):
+                grammar_result = self.grammar.match(tokens)
+            with stage("ast"):
+                ast = self.ast_builder.build(grammar_result, path=path)
             return ast
         except Exception as e:
             from shtest_compiler.utils.logger import log_pipeline_error
             import traceback
             log_pipeline_error(f"[ERROR] Parser error: {e}\n{traceback.format_exc()}")
-            raise ParseError(f"Parser error: {e}")
+            raise ParseError(f"Parser error: {e}", diagnostics=diagnostics_of(e))
 
     def parse_file(self, file_path: str) -> ShtestFile:
-        """Parse a file into an AST."""
+        """Parse a file into an AST, or load it from the AST cache."""
         try:
             with open(file_path, encoding="utf-8") as f:
                 text = f.read()
+            if self.cache is not None:
+                return self.cache.parse(self, text, path=file_path)
             return self.parse(text, path=file_path)
         except Exception as e:
             from shtest_compiler.utils.logger import log_pipeline_error
             import traceback
             log_pipeline_error(f"[ERROR] Parser error in file {file_path}: {e}\n{traceback.format_exc()}")
-            raise ParseError(f"Parser error in file {file_path}: {e}")
+            raise ParseError(
+                f"Parser error in file {file_path}: {e}", diagnostics=diagnostics_of(e)
+            )
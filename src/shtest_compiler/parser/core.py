@@ -2,18 +2,79 @@
 Core types and interfaces for the modular parser.
 """
 
-from typing import Any, List, Optional, Protocol, runtime_checkable
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Protocol, runtime_checkable
+
+
+ERROR = "error"
+WARNING = "warning"
+
+
+@dataclass
+class Diagnostic:
+    """One problem found in a .shtest file; lines and columns start at 1.
+
+    Errors stop the compilation; warnings flag what will compile but most
+    likely not as intended (an action phrase run as a raw shell command).
+    """
+
+    message: str
+    lineno: Optional[int] = None
+    column: Optional[int] = None
+    path: Optional[str] = None
+    severity: str = ERROR
+
+    @property
+    def is_error(self) -> bool:
+        return self.severity == ERROR
+
+    def __str__(self) -> str:
+        message = self.message if self.is_error else f"{self.severity}: {self.message}"
+        location = [str(part) for part in (self.path, self.lineno, self.column) if part]
+        return ":".join(location + [" " + message]) if location else message
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "line": self.lineno,
+            "column": self.column,
+            "severity": self.severity,
+            "message": self.message,
+        }
+
+
+def diagnostics_of(error: Exception) -> List[Diagnostic]:
+    """The diagnostics carried by *error*, or a single one built from it."""
+    diagnostics = getattr(error, "diagnostics", None)
+    if diagnostics:
+        return list(diagnostics)
+    return [
+        Diagnostic(
+            getattr(error, "message", None) or str(error),
+            getattr(error, "lineno", None),
+            getattr(error, "column", None),
+        )
+    ]
 
 
 class ParseError(Exception):
-    """Exception raised for parser errors."""
+    """Exception raised for parser errors.
+
+    ``diagnostics`` lists every error found, with its position; it defaults
+    to a single diagnostic made of *message*, *lineno* and *column*.
+    """
 
     def __init__(
-        self, message: str, lineno: Optional[int] = None, column: Optional[int] = None
+        self,
+        message: str,
+        lineno: Optional[int] = None,
+        column: Optional[int] = None,
+        diagnostics: Optional[List[Diagnostic]] = None,
     ):
         self.message = message
         self.lineno = lineno
         self.column = column
+        self.diagnostics = diagnostics or [Diagnostic(message, lineno, column)]
         super().__init__(self._format_message())
 
     def _format_message(self) -> str:
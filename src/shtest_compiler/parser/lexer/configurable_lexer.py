@@ -7,16 +7,12 @@ from typing import Any, Dict, Iterator, Optional
 
 import yaml
 
-from ...utils.logger import debug_log, is_debug_enabled
+from ...utils.logger import debug_log, is_debug_enabled, trace, tracing
 from .core import Token, TokenType
 from .filters import EmptyFilter, Filter, WhitespaceFilter
 from .pattern_loader import PatternLoader
 from .tokenizers import FallbackTokenizer, RegexTokenizer, Tokenizer
 
-debug_log(
-    "LEXER DEBUG ACTIVE: src/shtest_compiler/parser/lexer/configurable_lexer.py loaded"
-)
-
 
 class ConfigurableLexer:
     """A lexer that can be configured with different tokenizers and filters."""
@@ -180,8 +176,8 @@ class ConfigurableLexer:
 
     def lex(self, text: str) -> Iterator[Token]:
         """Lex text into tokens."""
-        if self.debug:
-            debug_log(f"Lexing text with {len(text.splitlines())} lines")
+        if tracing.lexer:
+            trace("lexer", "lex", "%d lines", text.count("\n") + 1)
         lines = text.split("\n")
         for lineno, line in enumerate(lines, 1):
             stripped = line.strip()
@@ -190,12 +186,15 @@ class ConfigurableLexer:
                 tokens = list(tokenizer.tokenize(line))
                 if tokens:
                     token = tokens[0]
+                    # Tokenizers only see this line: place the token in the file
+                    token.lineno = lineno
+                    token.column = len(line) - len(line.lstrip())
                     # Only yield if not TEXT, or if it's the fallback
                     if token.type != TokenType.TEXT or isinstance(
                         tokenizer, FallbackTokenizer
                     ):
-                        if self.debug:
-                            debug_log(f"Yielding token: {token}")
+                        if tracing.lexer:
+                            trace("lexer", "lex", "token %s", token)
                         yield token
                         matched = True
                         break
@@ -204,25 +203,20 @@ class ConfigurableLexer:
                 token = Token(
                     type=TokenType.TEXT, value=stripped, lineno=lineno, original=line
                 )
-                if self.debug:
-                    debug_log(f"Yielding fallback TEXT token: {token}")
+                if tracing.lexer:
+                    trace("lexer", "lex", "fallback TEXT token %s", token)
                 yield token
 
     def lex_file(self, file_path: str) -> Iterator[Token]:
         """Lex a file into tokens."""
-        if self.debug:
-            debug_log(f"Lexing file: {file_path}")
+        if tracing.lexer:
+            trace("lexer", "lex_file", "%s", file_path)
 
         try:
             with open(file_path, "r", encoding="utf-8") as f:
                 text = f.read()
 
-            for token in self.lex(text):
-                if self.debug:
-                    debug_log(
-                        f"ConfigurableLexer.lex_file: Yielding token kind={token.kind}, value={token.value}, result={getattr(token, 'result', None)}, original={getattr(token, 'original', None)}"
-                    )
-                yield token
+            yield from self.lex(text)
 
         except Exception as e:
             from shtest_compiler.utils.logger import log_pipeline_error
@@ -7,7 +7,7 @@ by the configurable lexer to process tokens.
 
 from typing import Iterator, List
 
-from ...utils.logger import debug_log, is_debug_enabled
+from ...utils.logger import trace, tracing
 from .core import Token
 
 
@@ -35,8 +35,8 @@ class EmptyFilter(Filter):
         """Remove empty tokens."""
         for token in tokens:
             if token.kind != "EMPTY":
-                if verbose and is_debug_enabled():
-                    debug_log(f"Token: {token}")
+                if verbose and tracing.lexer:
+                    trace("lexer", "EmptyFilter", "%s", token)
                 yield token
 
 
@@ -47,8 +47,8 @@ class WhitespaceFilter(Filter):
         """Remove whitespace-only tokens."""
         for token in tokens:
             if token.value.strip():
-                if verbose and is_debug_enabled():
-                    debug_log(f"Token: {token}")
+                if verbose and tracing.lexer:
+                    trace("lexer", "WhitespaceFilter", "%s", token)
                 yield token
 
 
@@ -59,8 +59,8 @@ class CommentFilter(Filter):
         """Remove comment tokens."""
         for token in tokens:
             if not token.value.startswith("#"):
-                if verbose and is_debug_enabled():
-                    debug_log(f"Token: {token}")
+                if verbose and tracing.lexer:
+                    trace("lexer", "CommentFilter", "%s", token)
                 yield token
 
 
@@ -70,8 +70,8 @@ class DebugFilter(Filter):
     def filter(self, tokens: List[Token], verbose: bool = False) -> Iterator[Token]:
         """Add debug information to tokens."""
         for token in tokens:
-            if verbose and is_debug_enabled():
-                debug_log(f"Processing token: {token}")
+            if verbose and tracing.lexer:
+                trace("lexer", "DebugFilter", "%s", token)
             yield token
 
 
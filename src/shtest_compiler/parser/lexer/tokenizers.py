@@ -8,7 +8,7 @@ by the configurable lexer.
 import re
 from typing import Any, Dict, Iterator, List
 
-from ...utils.logger import debug_log, is_debug_enabled
+from ...utils.logger import trace, tracing
 from .core import Token, TokenType
 
 
@@ -57,10 +57,8 @@ class RegexTokenizer(Tokenizer):
 
             # Skip empty lines
             if not stripped:
-                if self.debug or is_debug_enabled():
-                    debug_log(
-                        f"RegexTokenizer.tokenize: Yielding EMPTY token at line {lineno}"
-                    )
+                if tracing.lexer:
+                    trace("lexer", "RegexTokenizer.tokenize", "EMPTY at line %d", lineno)
                 yield Token(
                     type=TokenType.EMPTY, value="", lineno=lineno, original=line
                 )
@@ -76,9 +74,16 @@ class RegexTokenizer(Tokenizer):
                     lineno=lineno,
                     original=line,
                 )
-                if self.debug or is_debug_enabled():
-                    debug_log(
-                        f"RegexTokenizer.tokenize: Yielding token type={token.type}, value={token.value}, result={getattr(token, 'result', None)}, original={getattr(token, 'original', None)} at line {lineno}"
+                if tracing.lexer:
+                    trace(
+                        "lexer",
+                        "RegexTokenizer.tokenize",
+                        "type=%s, value=%s, result=%s, original=%s at line %d",
+                        token.type,
+                        token.value,
+                        token.result,
+                        token.original,
+                        lineno,
                     )
                 yield token
             else:
@@ -86,9 +91,13 @@ class RegexTokenizer(Tokenizer):
                 token = Token(
                     type=TokenType.TEXT, value=stripped, lineno=lineno, original=line
                 )
-                if self.debug or is_debug_enabled():
-                    debug_log(
-                        f"RegexTokenizer.tokenize: Yielding TEXT token value={stripped} at line {lineno}"
+                if tracing.lexer:
+                    trace(
+                        "lexer",
+                        "RegexTokenizer.tokenize",
+                        "TEXT value=%s at line %d",
+                        stripped,
+                        lineno,
                     )
                 yield token
 
@@ -27,6 +27,7 @@ class ShtestFile:
     arguments: Dict[str, str] = field(default_factory=dict)  # Legacy argument storage
     last_file_var: List[Optional[str]] = field(default_factory=lambda: [None])
     path: Optional[str] = None
+    diagnostics: List = field(default_factory=list)  # Warnings found while parsing
 
     def get_grouped_steps(self) -> Dict[str, List[Action]]:
         grouped = {
@@ -6,20 +6,14 @@ This module provides the main parser for converting .shtest files into AST nodes
 
 from typing import List, Optional
 
-from ..utils.logger import debug_log, is_debug_enabled
+from ..utils.logger import trace, tracing
 from .lexer import Token
 from .shtest_ast import Action, ShtestFile, TestStep
 
-debug_log("PARSER DEBUG ACTIVE: src/shtest_compiler/parser/shtest_parser.py loaded")
-
 
 class ShtestParser:
     """Parser for .shtest files."""
 
-    def __init__(self):
-        """Initialize the parser."""
-        self.debug = is_debug_enabled()
-
     def parse(self, tokens: List[Token]) -> ShtestFile:
         """
         Parse tokens into a ShtestFile AST.
@@ -37,9 +31,13 @@ class ShtestParser:
 
         for i, token in enumerate(tokens):
             if token.kind == "STEP":
-                if self.debug:
-                    debug_log(
-                        f"Parser: Processing STEP token: value='{token.value}' at line {token.lineno}"
+                if tracing.parser:
+                    trace(
+                        "parser",
+                        "ShtestParser.parse",
+                        "Processing STEP token: value='%s' at line %s",
+                        token.value,
+                        token.lineno,
                     )
 
                 # Add any pending action to the previous step
@@ -49,9 +47,12 @@ class ShtestParser:
 
                 # If this is the first step and there are orphans, add a synthetic step
                 if current_step is None and orphan_actions:
-                    if self.debug:
-                        debug_log(
-                            f"Parser: Creating synthetic 'Orphan Actions' step with {len(orphan_actions)} actions"
+                    if tracing.parser:
+                        trace(
+                            "parser",
+                            "ShtestParser.parse",
+                            "Creating synthetic 'Orphan Actions' step with %s actions",
+                            len(orphan_actions),
                         )
                     synthetic = TestStep(name="Orphan Actions", lineno=1)
                     synthetic.actions = orphan_actions.copy()
@@ -63,9 +64,13 @@ class ShtestParser:
                 shtest_file.steps.append(current_step)
 
             elif token.kind == "ACTION_ONLY":
-                if self.debug:
-                    debug_log(
-                        f"Parser: Processing ACTION_ONLY token: value='{token.value}' at line {token.lineno}"
+                if tracing.parser:
+                    trace(
+                        "parser",
+                        "ShtestParser.parse",
+                        "Processing ACTION_ONLY token: value='%s' at line %s",
+                        token.value,
+                        token.lineno,
                     )
 
                 if pending_action and current_step:
@@ -79,17 +84,24 @@ class ShtestParser:
                 )
 
                 if current_step is None:
-                    if self.debug:
-                        debug_log(
-                            f"Parser: Adding orphan action: {token.value}"
+                    if tracing.parser:
+                        trace(
+                            "parser",
+                            "ShtestParser.parse",
+                            "Adding orphan action: %s",
+                            token.value,
                         )
                     orphan_actions.append(pending_action)
                     pending_action = None
 
             elif token.kind == "RESULT_ONLY":
-                if self.debug:
-                    debug_log(
-                        f"Parser: Processing RESULT_ONLY token: value='{token.value}' at line {token.lineno}"
+                if tracing.parser:
+                    trace(
+                        "parser",
+                        "ShtestParser.parse",
+                        "Processing RESULT_ONLY token: value='%s' at line %s",
+                        token.value,
+                        token.lineno,
                     )
 
                 if pending_action:
@@ -97,9 +109,13 @@ class ShtestParser:
                     if current_step:
                         current_step.actions.append(pending_action)
                     elif current_step is None:
-                        if self.debug:
-                            debug_log(
-                                f"Parser: Adding orphan action with result: {pending_action.command} -> {token.value}"
+                        if tracing.parser:
+                            trace(
+                                "parser",
+                                "ShtestParser.parse",
+                                "Adding orphan action with result: %s -> %s",
+                                pending_action.command,
+                                token.value,
                             )
                         orphan_actions.append(pending_action)
                     pending_action = None
@@ -113,16 +129,23 @@ class ShtestParser:
                     if current_step:
                         current_step.actions.append(action)
                     elif current_step is None:
-                        if self.debug:
-                            debug_log(
-                                f"Parser: Adding orphan result-only action: {token.value}"
+                        if tracing.parser:
+                            trace(
+                                "parser",
+                                "ShtestParser.parse",
+                                "Adding orphan result-only action: %s",
+                                token.value,
                             )
                         orphan_actions.append(action)
 
             elif token.kind == "ACTION_RESULT":
-                if self.debug:
-                    debug_log(
-                        f"Parser: Processing ACTION_RESULT token: value='{token.value}' at line {token.lineno}"
+                if tracing.parser:
+                    trace(
+                        "parser",
+                        "ShtestParser.parse",
+                        "Processing ACTION_RESULT token: value='%s' at line %s",
+                        token.value,
+                        token.lineno,
                     )
 
                 if pending_action and current_step:
@@ -150,9 +173,13 @@ class ShtestParser:
                 if current_step:
                     current_step.actions.append(action)
                 elif current_step is None:
-                    if self.debug:
-                        debug_log(
-                            f"Parser: Adding orphan action-result: {action.command} -> {action.result_expr}"
+                    if tracing.parser:
+                        trace(
+                            "parser",
+                            "ShtestParser.parse",
+                            "Adding orphan action-result: %s -> %s",
+                            action.command,
+                            action.result_expr,
                         )
                     orphan_actions.append(action)
 
@@ -161,17 +188,23 @@ class ShtestParser:
             if current_step:
                 current_step.actions.append(pending_action)
             elif current_step is None:
-                if self.debug:
-                    debug_log(
-                        f"Parser: Adding final orphan action: {pending_action.command}"
+                if tracing.parser:
+                    trace(
+                        "parser",
+                        "ShtestParser.parse",
+                        "Adding final orphan action: %s",
+                        pending_action.command,
                     )
                 orphan_actions.append(pending_action)
 
         # If there are still orphans at the end and no steps, add them as a synthetic step
         if orphan_actions and not shtest_file.steps:
-            if self.debug:
-                debug_log(
-                    f"Parser: Creating final synthetic 'Orphan Actions' step with {len(orphan_actions)} actions"
+            if tracing.parser:
+                trace(
+                    "parser",
+                    "ShtestParser.parse",
+                    "Creating final synthetic 'Orphan Actions' step with %s actions",
+                    len(orphan_actions),
                 )
             synthetic = TestStep(name="Orphan Actions", lineno=1)
             synthetic.actions = orphan_actions
@@ -222,6 +222,21 @@ def _to_postfix(tokens: List[str]) -> List[str]:
     return output
 
 
+def is_compound_expression(expression: str) -> bool:
+    """Whether *expression* combines validations with ``et``, ``ou`` or parentheses."""
+    return (
+        " et " in expression
+        or " ou " in expression
+        or "(" in expression
+        or ")" in expression
+    )
+
+
+def validation_atoms(expression: str) -> List[str]:
+    """The atomic validations of the compound *expression*, in order."""
+    return [tok for tok in _tokenize_expression(expression) if tok not in ("et", "ou", "(", ")")]
+
+
 def parse_validation_expression(expression: str) -> ASTNode:
     if not expression or not expression.strip():
         raise ValueError("Validation expression is empty.")
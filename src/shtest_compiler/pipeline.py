@@ -0,0 +1,142 @@
+"""
+Single-parse pipeline over a set of ``.shtest`` files.
+
+Each file is parsed once; the same ``ShtestFile`` then feeds verification,
+shell generation and the Excel catalog, so ``run_all`` no longer parses the
+tree three times. Errors are collected per file instead of stopping at the
+first one::
+
+    compiler = ModularCompiler()
+    results = parse_files(shtest_files(["tests"]), compiler.parser)
+    generate_scripts(results, compiler, "output", base_dir="tests")
+    failed = [result for result in results if not result.ok]
+"""
+
+import glob
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+from .compiler.compiler import ModularCompiler
+from .parser.core import Diagnostic, diagnostics_of
+from .parser.shtest_ast import ShtestFile
+
+
+@dataclass
+class FileResult:
+    path: str
+    ast: Optional[ShtestFile] = None  # None when the file does not parse
+    output_path: Optional[str] = None  # Generated script, if any
+    errors: List[Diagnostic] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def shtest_files(paths: Sequence[str]) -> List[str]:
+    """The ``.shtest`` files named by *paths*, directories searched recursively.
+
+    Paths may be glob patterns (``tests/**/*.shtest``); a pattern matching
+    nothing is kept as is, so that the missing file is reported.
+    """
+    files = []
+    for path in paths:
+        if glob.has_magic(path) and not os.path.exists(path):
+            matches = sorted(glob.glob(path, recursive=True))
+            if matches:
+                files.extend(
+                    shtest_files(
+                        [m for m in matches if os.path.isdir(m) or m.endswith(".shtest")]
+                    )
+                )
+                continue
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(
+                    os.path.join(root, name) for name in sorted(names) if name.endswith(".shtest")
+                )
+        else:
+            files.append(path)
+    # Overlapping paths or patterns name some files more than once
+    return list(dict.fromkeys(files))
+
+
+def file_diagnostics(path: str, error: Exception) -> List[Diagnostic]:
+    """The diagnostics of *error*, raised while processing the file *path*."""
+    diagnostics = diagnostics_of(error)
+    for diagnostic in diagnostics:
+        diagnostic.path = diagnostic.path or path
+    return diagnostics
+
+
+def parse_files(paths: Sequence[str], parser) -> List[FileResult]:
+    """Parse every file of *paths* with *parser*, keeping going on errors."""
+    results = []
+    for path in paths:
+        result = FileResult(path)
+        try:
+            result.ast = parser.parse_file(path)
+        except Exception as e:
+            # parse_file already logged the traceback
+            result.errors.extend(file_diagnostics(path, e))
+        else:
+            result.errors.extend(d for d in result.ast.diagnostics if d.is_error)
+        results.append(result)
+    return results
+
+
+def script_path(path: str, output_dir: str, base_dir: Optional[str] = None) -> str:
+    """Output path of the script of *path*, mirroring its place under *base_dir*."""
+    if base_dir and os.path.isdir(base_dir):
+        relative = os.path.relpath(path, base_dir)
+    else:
+        relative = os.path.basename(path)
+    return os.path.join(output_dir, os.path.splitext(relative)[0] + ".sh")
+
+
+def generate_scripts(
+    results: Sequence[FileResult],
+    compiler: ModularCompiler,
+    output_dir: str,
+    base_dir: Optional[str] = None,
+    debug: bool = False,
+) -> None:
+    """Write the script of every parsed file of *results* into *output_dir*.
+
+    Files with errors are skipped; generation errors are added to the file's
+    result. With *debug*, each script gets its ``.txt`` debug log.
+    """
+    for result in results:
+        if not result.ok:
+            continue
+        output_path = script_path(result.path, output_dir, base_dir)
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        debug_output_path = os.path.splitext(output_path)[0] + ".txt" if debug else None
+        try:
+            result.output_path = compiler.compile_file(
+                result.path,
+                output_path,
+                debug_output_path=debug_output_path,
+                ast=result.ast,
+            )
+        except Exception as e:
+            # compile_file already logged the traceback
+            result.errors.extend(file_diagnostics(result.path, e))
+
+
+def run_pipeline(
+    paths: Sequence[str],
+    output_dir: Optional[str] = None,
+    debug: bool = False,
+    **options,
+) -> List[FileResult]:
+    """Parse *paths* (files or directories) once and, given *output_dir*,
+    generate their scripts. *options* are passed to ``ModularCompiler``."""
+    compiler = ModularCompiler(**options)
+    results = parse_files(shtest_files(paths), compiler.parser)
+    if output_dir is not None:
+        base_dir = paths[0] if len(paths) == 1 else None
+        generate_scripts(results, compiler, output_dir, base_dir, debug)
+    return results
@@ -4,10 +4,10 @@ import os
 import sys
 
 # Legacy parser import removed - not used in this file
-from shtest_compiler.utils.logger import debug_log, set_debug
-from shtest_compiler.export_to_excel import export_tests_to_excel
-from shtest_compiler.generate_tests import generate_tests
-from shtest_compiler.verify_syntax import check_file
+from shtest_compiler.compiler.compiler import ModularCompiler
+from shtest_compiler.compiler.failure_policy import FAIL_FAST, FAILURE_POLICIES
+from shtest_compiler.pipeline import generate_scripts, parse_files, shtest_files
+from shtest_compiler.utils.logger import TRACE_CATEGORIES, debug_log, set_debug
 
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.ini")
 
@@ -21,36 +21,22 @@ def read_config():
     return input_dir, output_dir, sql_driver
 
 
-def run_syntax_check(input_path):
+def run_syntax_check(input_path, parser=None):
+    """Parse every .shtest file of *input_path* once and report all syntax
+    errors; return the per-file results, ASTs included, for the next steps."""
     print("[1/3] Vérification de la syntaxe...")
-    errors = []
-
-    # Handle single file vs directory
-    if os.path.isfile(input_path):
-        files_to_check = [input_path]
-    else:
-        files_to_check = []
-        for root, dirs, files in os.walk(input_path):
-            for file in files:
-                if file.endswith(".shtest"):
-                    files_to_check.append(os.path.join(root, file))
-
-    for file_path in files_to_check:
-        try:
-            check_file(file_path)
-        except Exception as e:
-            from shtest_compiler.utils.logger import log_pipeline_error
-            import traceback
-            log_pipeline_error(f"[ERROR] {type(e).__name__}: {e}\n{traceback.format_exc()}")
-            raise
+    if parser is None:
+        parser = ModularCompiler().parser
+    results = parse_files(shtest_files([input_path]), parser)
 
+    errors = [error for result in results for error in result.errors]
     if errors:
         print("Erreurs de syntaxe détectées:")
         for error in errors:
             print(f"  - {error}")
-        sys.exit(1)
     else:
         print("Syntaxe OK")
+    return results
 
 
 def main():
@@ -64,13 +50,59 @@ def main():
     parser.add_argument(
         "--no-excel", action="store_true", help="Ne pas générer le fichier Excel"
     )
+    parser.add_argument(
+        "--on-failure",
+        choices=FAILURE_POLICIES,
+        default=FAIL_FAST,
+        help="Comportement des scripts générés lorsqu'une validation échoue",
+    )
+    parser.add_argument(
+        "--checkpoints",
+        action="store_true",
+        help="Permettre la reprise des scripts générés avec --from-step/--only-step",
+    )
+    parser.add_argument(
+        "--fixture-cache",
+        action="store_true",
+        help="Restaurer les étapes de préparation de fichiers depuis un cache",
+    )
+    parser.add_argument(
+        "--sql-session",
+        action="store_true",
+        help="Ouvrir une seule session SQL par connexion au lieu d'une par action",
+    )
+    parser.add_argument(
+        "--sql-cache",
+        action="store_true",
+        help="Réutiliser le résultat des requêtes en lecture jusqu'à la prochaine écriture",
+    )
+    parser.add_argument(
+        "--sql-jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Exécuter jusqu'à N requêtes en lecture consécutives d'une étape en parallèle",
+    )
     parser.add_argument(
         "--debug", action="store_true", help="Enable debug mode for detailed logging"
     )
+    parser.add_argument(
+        "--trace",
+        metavar="CATEGORIES",
+        help=(
+            "Activer le débogage pour certaines catégories seulement, séparées par "
+            f"des virgules ({', '.join(TRACE_CATEGORIES)})"
+        ),
+    )
     args = parser.parse_args()
 
     # Set global debug configuration
-    set_debug(args.debug)
+    categories = args.trace.split(",") if args.trace else None
+    args.debug = args.debug or bool(categories)
+    try:
+        set_debug(args.debug, categories)
+    except ValueError as e:
+        parser.error(str(e))
     if args.debug:
         os.environ["SHTEST_DEBUG"] = "1"
 
@@ -81,16 +113,45 @@ def main():
         os.environ["SQL_DRIVER"] = config_driver
     excel_file = args.excel or os.path.join(output_dir, "tests_summary.xlsx")
 
-    run_syntax_check(input_dir)
+    # One compiler for the whole run: each file is parsed once, and the same
+    # AST is used for the syntax check, the scripts and the Excel catalog
+    compiler = ModularCompiler(
+        failure_policy=args.on_failure,
+        checkpoints=args.checkpoints,
+        fixture_cache=args.fixture_cache,
+        sql_session=args.sql_session,
+        sql_cache=args.sql_cache,
+        sql_jobs=args.sql_jobs,
+    )
+    results = run_syntax_check(input_dir, compiler.parser)
 
     if not args.no_shell:
         print("[2/3] Génération des scripts...")
-        generate_tests(input_dir=input_dir, output_dir=output_dir)
+        os.makedirs(output_dir, exist_ok=True)
+        generate_scripts(results, compiler, output_dir, input_dir, debug=args.debug)
+        for result in results:
+            if result.ok and result.output_path:
+                print(f"Generated {result.output_path}")
 
     if not args.no_excel:
         print("[3/3] Export Excel...")
-        export_tests_to_excel(input_dir=input_dir, output_file=excel_file)
-
+        # openpyxl is only needed for this step
+        from shtest_compiler.export_to_excel import export_tests_to_excel
+
+        os.makedirs(os.path.dirname(os.path.abspath(excel_file)), exist_ok=True)
+        export_tests_to_excel(
+            input_dir=input_dir,
+            output_file=excel_file,
+            tests=[result.ast for result in results if result.ast is not None],
+        )
+
+    failed = [result for result in results if not result.ok]
+    if failed:
+        print("[FAIL] One or more files failed to compile.", file=sys.stderr)
+        for result in failed:
+            for error in result.errors:
+                print(f"  - {error}", file=sys.stderr)
+        sys.exit(1)
     print("Terminé avec succès.")
 
 
@@ -70,8 +70,13 @@ def compile_e2e_tests(verbose=False):
         raise
 
 
-def run_integration_tests(verbose=False):
-    """Run all integration tests"""
+def run_integration_tests(verbose=False, sandbox=False, sandbox_root=None):
+    """Run all integration tests
+
+    With *sandbox*, each script runs in its own workspace under *sandbox_root*
+    (``/dev/shm`` by default) mirroring the script's directory. Workspaces are
+    removed in the background and waited for before returning.
+    """
     print("Running Integration Tests...")
 
     integration_dir = Path("tests/integration")
@@ -86,12 +91,28 @@ def run_integration_tests(verbose=False):
 
     passed = 0
     failed = 0
+    cleanups = []
 
     for script in shell_scripts:
         print(f"  Running {script.name}...")
+        workspace = None
         try:
+            if sandbox:
+                from shtest_compiler.utils.sandbox import Sandbox, write_targets
+
+                workspace = Sandbox(
+                    str(script.parent),
+                    root=sandbox_root,
+                    prefix=f"{script.stem}-",
+                    copied=write_targets(script.read_text(encoding="utf-8")),
+                )
             result = subprocess.run(
-                ["bash", str(script)], capture_output=not verbose, text=True, timeout=30
+                ["bash", str(script.resolve())],
+                capture_output=not verbose,
+                text=True,
+                timeout=30,
+                cwd=workspace.path if workspace else None,
+                env=workspace.environ() if workspace else None,
             )
             if result.returncode == 0:
                 print(f"    {script.name} passed")
@@ -109,7 +130,12 @@ def run_integration_tests(verbose=False):
             import traceback
             log_pipeline_error(f"[ERROR] {type(e).__name__}: {e}\n{traceback.format_exc()}")
             failed += 1
+        finally:
+            if workspace:
+                cleanups.append(workspace.cleanup_async())
 
+    for cleanup in cleanups:
+        cleanup.join()
     print(f"Integration Tests Summary: {passed} passed, {failed} failed")
     return failed == 0
 
@@ -128,36 +154,20 @@ def verify_e2e_syntax():
         print("No E2E tests found")
         return False
 
+    from shtest_compiler.verify_syntax import has_errors, verify_paths
+
     passed = 0
     failed = 0
 
-    for shtest_file in shtest_files:
-        print(f"  Verifying {shtest_file.name}...")
-        try:
-            # Use the new ConfigurableParser for verification
-            from shtest_compiler.parser.configurable_parser import ConfigurableParser
-
-            with open(shtest_file, encoding="utf-8") as f:
-                content = f.read()
-
-            parser = ConfigurableParser(debug=False)
-            shtest_obj = parser.parse(content, path=str(shtest_file))
-
-            # Verify that the ShtestFile object has the expected structure
-            if hasattr(shtest_obj, "steps") and isinstance(shtest_obj.steps, list):
-                print(f"    {shtest_file.name} syntax OK")
-                passed += 1
-            else:
-                print(
-                    f"    {shtest_file.name} syntax error: Invalid ShtestFile structure"
-                )
-                failed += 1
-
-        except Exception as e:
-            from shtest_compiler.utils.logger import log_pipeline_error
-            import traceback
-            log_pipeline_error(f"[ERROR] {type(e).__name__}: {e}\n{traceback.format_exc()}")
+    # Files are checked across a process pool, then reported in order
+    for path, diagnostics in verify_paths([str(f) for f in shtest_files]):
+        for diagnostic in diagnostics:
+            print(f"    {diagnostic}")
+        if has_errors(diagnostics):
             failed += 1
+        else:
+            print(f"    {Path(path).name} syntax OK")
+            passed += 1
 
     print(f"Syntax Verification Summary: {passed} passed, {failed} failed")
     return failed == 0
@@ -177,6 +187,15 @@ def main():
     )
     parser.add_argument("--all", action="store_true", help="Run all tests (default)")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
+    parser.add_argument(
+        "--sandbox",
+        action="store_true",
+        help="Run each integration test in its own sandbox workspace",
+    )
+    parser.add_argument(
+        "--sandbox-root",
+        help="Directory holding the sandboxes (default: $SHTEST_SANDBOX_ROOT or /dev/shm)",
+    )
 
     args = parser.parse_args()
 
@@ -202,7 +221,9 @@ def main():
         print()
 
     if args.integration or args.all:
-        success &= run_integration_tests(args.verbose)
+        success &= run_integration_tests(
+            args.verbose, sandbox=args.sandbox, sandbox_root=args.sandbox_root
+        )
         print()
 
     print("=" * 50)
@@ -0,0 +1,7 @@
+"""
+Runtime helpers invoked by generated shell scripts.
+
+These modules only depend on the standard library so that they can run on
+test hosts where the compiler's optional dependencies are not installed. Formats that need a third-party library (XLSX, Parquet
+exports) import it only when they are requested.
+"""
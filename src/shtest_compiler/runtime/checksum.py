@@ -0,0 +1,187 @@
+"""
+Content checksums of files, with a per-run cache.
+
+Used by the ``Le fichier ... a pour somme de contrôle ...`` validation::
+
+    python3 -m shtest_compiler.runtime.checksum data.csv \\
+        [--algorithm sha256] [--expect 9f86d081...]
+
+Any ``hashlib`` algorithm is accepted (``sha256`` by default, ``md5``,
+``sha1``, ``blake2b``...), as well as ``xxh32``, ``xxh64``, ``xxh3_64`` and
+``xxh128`` when the ``xxhash`` package is installed.
+
+When ``SHTEST_HASH_CACHE`` names a file, digests are recorded there under the
+file identity (path, device and inode, size, modification time), so a file
+that is checked several times during a run is read only once. Generated
+scripts point it into their scratch directory, so the cache lives as long as
+the run. A file that is rewritten gets a new size or modification time and is
+hashed again.
+
+Exit status: 0 if the digest matches ``--expect`` (or none was given), 1 if
+it differs, 2 on error.
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+from typing import Dict, Optional, Sequence, Tuple
+
+COMMAND = "python3 -m shtest_compiler.runtime.checksum"
+CACHE_VARIABLE = "SHTEST_HASH_CACHE"
+
+DEFAULT_ALGORITHM = "sha256"
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_XXHASH_ALGORITHMS = ("xxh32", "xxh64", "xxh3_64", "xxh128")
+
+CacheKey = Tuple[str, str, str, str, str]
+
+
+def new_hasher(algorithm: str = DEFAULT_ALGORITHM):
+    """Hash object for *algorithm*; ``ValueError`` if it is unknown."""
+    algorithm = algorithm.lower()
+    if algorithm in _XXHASH_ALGORITHMS:
+        import xxhash
+
+        return getattr(xxhash, algorithm)()
+    return hashlib.new(algorithm)
+
+
+class HashCache:
+    """Digests already computed during the run, stored in an append-only file.
+
+    Each entry is one line, appended with a single write, so scripts hashing
+    files concurrently can share the cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Optional[Dict[CacheKey, str]] = None
+
+    @staticmethod
+    def _key(path: str, stat: os.stat_result, algorithm: str) -> CacheKey:
+        return (
+            algorithm.lower(),
+            f"{stat.st_dev}:{stat.st_ino}",
+            str(stat.st_size),
+            str(stat.st_mtime_ns),
+            os.path.realpath(path),
+        )
+
+    def _load(self) -> Dict[CacheKey, str]:
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.path, encoding="utf-8", errors="replace") as handle:
+                    for line in handle:
+                        fields = line.rstrip("\n").split("\t", 5)
+                        if len(fields) == 6:
+                            *identity, digest, path = fields
+                            self._entries[(*identity, path)] = digest
+            except FileNotFoundError:
+                pass
+        return self._entries
+
+    def get(
+        self, path: str, stat: os.stat_result, algorithm: str = DEFAULT_ALGORITHM
+    ) -> Optional[str]:
+        return self._load().get(self._key(path, stat, algorithm))
+
+    def put(
+        self,
+        path: str,
+        stat: os.stat_result,
+        digest: str,
+        algorithm: str = DEFAULT_ALGORITHM,
+    ) -> None:
+        key = self._key(path, stat, algorithm)
+        self._load()[key] = digest
+        if "\n" in key[-1]:
+            return
+        *identity, real_path = key
+        line = "\t".join((*identity, digest, real_path)) + "\n"
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, line.encode("utf-8", "surrogateescape"))
+            finally:
+                os.close(fd)
+        except OSError:
+            pass  # the cache only saves work
+
+
+def open_cache() -> Optional[HashCache]:
+    """The run's hash cache, if the environment names one."""
+    path = os.environ.get(CACHE_VARIABLE)
+    return HashCache(path) if path else None
+
+
+def file_digest(
+    path: str,
+    algorithm: str = DEFAULT_ALGORITHM,
+    cache: Optional[HashCache] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> str:
+    """Hex digest of the content of *path*, read in chunks unless cached."""
+    stat = os.stat(path)
+    if cache is not None:
+        digest = cache.get(path, stat, algorithm)
+        if digest is not None:
+            return digest
+    hasher = new_hasher(algorithm)
+    with open(path, "rb") as handle:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    digest = hasher.hexdigest()
+    if cache is not None:
+        cache.put(path, stat, digest, algorithm)
+    return digest
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog=COMMAND,
+        description="Calculer ou vérifier la somme de contrôle de fichiers",
+    )
+    parser.add_argument("files", nargs="+", help="Fichiers à lire")
+    parser.add_argument(
+        "--algorithm",
+        default=DEFAULT_ALGORITHM,
+        help="Algorithme (sha256 par défaut, md5, sha1, blake2b, xxh64...)",
+    )
+    parser.add_argument(
+        "--expect", help="Somme attendue (hexadécimal) ; un seul fichier"
+    )
+    args = parser.parse_args(argv)
+    if args.expect and len(args.files) > 1:
+        parser.error("--expect ne s'utilise qu'avec un seul fichier")
+
+    cache = open_cache()
+    try:
+        digests = [(path, file_digest(path, args.algorithm, cache)) for path in args.files]
+    except ImportError as e:
+        print(f"CHECKSUM_ERROR: algorithm {args.algorithm} requires {e.name}")
+        return 2
+    except (OSError, ValueError) as e:
+        print(f"CHECKSUM_ERROR: {e}")
+        return 2
+
+    if args.expect is None:
+        for path, digest in digests:
+            print(f"{digest}  {path}")
+        return 0
+    digest = digests[0][1]
+    expected = args.expect.strip().lower()
+    if digest == expected:
+        print(f"CHECKSUM_OK: {args.algorithm} {digest}")
+        return 0
+    print(f"CHECKSUM_MISMATCH: {args.algorithm} expected {expected}, got {digest}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,498 @@
+"""
+Streaming comparison of two CSV exports or text files.
+
+Used by the ``Comparer les résultats de la requête ... avec ...`` action and
+the ``Les fichiers ... contiennent les mêmes lignes`` validations::
+
+    python3 -m shtest_compiler.runtime.compare left.csv right.csv \\
+        [--tolerance 0.01] [--ignore-order | --key 1] [--lines] \\
+        [--max-differences 10] [--report differences.txt] [--delimiter auto]
+
+Rows are read one at a time, so memory does not grow with the size of the
+files, except in order-insensitive modes:
+
+- ``--ignore-order`` without tolerance: each row is reduced to a 16-byte
+  digest and the two files are compared as multisets of digests. Above
+  ``_PARTITION_BYTES`` of input, digests are first spilled to disk in
+  partitions, which are counted one at a time;
+- ``--ignore-order`` with a tolerance: each file is sorted externally (sorted
+  chunks spilled to disk, then merged) and the sorted streams are compared row
+  by row;
+- ``--key N`` (columns from 1, ``--key 1,3`` for a composite key): both files
+  are sorted externally on the key, then joined. Keys found on one side only
+  are reported, and rows sharing a key are compared cell by cell.
+
+Only the differences themselves are kept in memory.
+
+``--delimiter auto`` picks the most frequent of ``,``, ``;``, tab and ``|`` in
+the first line of the left file.
+
+Cells are stripped of surrounding whitespace (SQL*Plus pads its columns).
+Cells that parse as numbers on both sides are compared numerically, within
+``tolerance``. With ``--lines``, each line of a text file is compared as a
+whole, exactly, without CSV parsing.
+
+The first ``--max-differences`` differences are printed; ``--report`` writes
+all of them to a file as they are found.
+
+Exit status: 0 if the files match, 1 if they differ, 2 on error.
+"""
+
+import argparse
+import csv
+import hashlib
+import heapq
+import math
+import os
+import pickle
+import sys
+import tempfile
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import groupby, islice, zip_longest
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+Row = List[str]
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Rows pickled together in a spilled chunk; keeps the merge phase streaming.
+_SPILL_BATCH = 1_000
+
+# Input size counted in memory at once by the digest comparison, and bound on
+# the partition files open together.
+_PARTITION_BYTES = 256 * 1024 * 1024
+_MAX_PARTITIONS = 512
+
+_DIGEST_SIZE = 16
+
+_NUMBER_START = frozenset("0123456789+-.")
+
+# Candidates of --delimiter auto, the default first so that it wins ties.
+_DELIMITERS = (",", ";", "\t", "|")
+
+
+@dataclass
+class ComparisonResult:
+    left_rows: int = 0
+    right_rows: int = 0
+    difference_count: int = 0
+    differences: List[str] = field(default_factory=list)
+    max_differences: int = 10
+    report: Optional[TextIO] = None
+
+    @property
+    def identical(self) -> bool:
+        return self.difference_count == 0 and self.left_rows == self.right_rows
+
+    @property
+    def wants_details(self) -> bool:
+        """Whether another difference would still be printed or reported."""
+        return self.report is not None or len(self.differences) < self.max_differences
+
+    def add(self, difference: str) -> None:
+        self.difference_count += 1
+        self.describe(difference)
+
+    def describe(self, difference: str) -> None:
+        if len(self.differences) < self.max_differences:
+            self.differences.append(difference)
+        if self.report is not None:
+            self.report.write(difference + "\n")
+
+
+def _read_rows(path: str, delimiter: str) -> Iterator[Row]:
+    with open(path, newline="", encoding="utf-8", errors="replace") as handle:
+        for row in csv.reader(handle, delimiter=delimiter):
+            cells = [cell.strip() for cell in row]
+            if any(cells):
+                yield cells
+
+
+def sniff_delimiter(path: str) -> str:
+    """Guess the column delimiter of *path* from its first non-empty line."""
+    with open(path, newline="", encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            if line.strip():
+                return max(_DELIMITERS, key=line.count)
+    return _DELIMITERS[0]
+
+
+def _read_lines(path: str) -> Iterator[Row]:
+    with open(path, newline="", encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            yield [line.rstrip("\r\n")]
+
+
+def _as_number(cell: str) -> Optional[float]:
+    # Cheap pre-check: raising ValueError for every text cell is slow.
+    if not cell or cell[0] not in _NUMBER_START:
+        return None
+    try:
+        value = float(cell)
+    except ValueError:
+        return None
+    return None if math.isnan(value) else value
+
+
+def _normalize(cell: str) -> str:
+    number = _as_number(cell)
+    return cell if number is None else repr(number)
+
+
+def _sort_key(row: Row) -> Tuple:
+    # Numbers sort numerically and before text within a column.
+    return tuple(
+        (0, number, "") if number is not None else (1, 0.0, cell)
+        for cell, number in ((cell, _as_number(cell)) for cell in row)
+    )
+
+
+def _key_cells(row: Row, columns: Sequence[int]) -> Row:
+    return [row[column] if column < len(row) else "" for column in columns]
+
+
+def _cells_match(left: str, right: str, tolerance: Optional[float]) -> bool:
+    if left == right:
+        return True
+    if tolerance is None:
+        return False
+    a, b = _as_number(left), _as_number(right)
+    if a is None or b is None:
+        return False
+    return abs(a - b) <= tolerance
+
+
+def _row_digest(row: Row) -> bytes:
+    encoded = "\x1f".join([_normalize(cell) for cell in row]).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=_DIGEST_SIZE).digest()
+
+
+def _line_digest(row: Row) -> bytes:
+    encoded = row[0].encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=_DIGEST_SIZE).digest()
+
+
+def _sorted_rows(
+    rows: Iterator[Row],
+    chunk_size: int,
+    workdir: str,
+    sort_key: Callable[[Row], Tuple] = _sort_key,
+) -> Iterator[Row]:
+    """Sort *rows* with bounded memory by spilling sorted chunks to *workdir*."""
+    spills = []
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        chunk.sort(key=sort_key)
+        fd, path = tempfile.mkstemp(dir=workdir, suffix=".chunk")
+        with os.fdopen(fd, "wb") as handle:
+            for start in range(0, len(chunk), _SPILL_BATCH):
+                pickle.dump(chunk[start : start + _SPILL_BATCH], handle)
+        spills.append(path)
+
+    def replay(path: str) -> Iterator[Row]:
+        with open(path, "rb") as handle:
+            while True:
+                try:
+                    yield from pickle.load(handle)
+                except EOFError:
+                    return
+
+    return heapq.merge(*(replay(path) for path in spills), key=sort_key)
+
+
+def _compare_streams(
+    left: Iterator[Row],
+    right: Iterator[Row],
+    tolerance: Optional[float],
+    result: ComparisonResult,
+) -> None:
+    for line, (a, b) in enumerate(zip_longest(left, right), start=1):
+        if a is not None:
+            result.left_rows += 1
+        if b is not None:
+            result.right_rows += 1
+        if a is None or b is None:
+            continue
+        for column, (x, y) in enumerate(zip_longest(a, b, fillvalue=""), start=1):
+            if not _cells_match(x, y, tolerance):
+                result.add(f"row {line}, column {column}: {x!r} != {y!r}")
+                break
+
+
+def _compare_keyed(
+    left: Iterator[Row],
+    right: Iterator[Row],
+    columns: Sequence[int],
+    tolerance: float,
+    result: ComparisonResult,
+) -> None:
+    """Join two streams sorted on the key *columns* and compare matching rows."""
+
+    def group_key(row: Row) -> Tuple:
+        return _sort_key(_key_cells(row, columns))
+
+    left_groups = groupby(left, group_key)
+    right_groups = groupby(right, group_key)
+    a = next(left_groups, None)
+    b = next(right_groups, None)
+    while a is not None or b is not None:
+        # Advancing a groupby discards the previous group: copy it first.
+        if b is None or (a is not None and a[0] < b[0]):
+            pairs = zip_longest(list(a[1]), ())
+            a = next(left_groups, None)
+        elif a is None or b[0] < a[0]:
+            pairs = zip_longest((), list(b[1]))
+            b = next(right_groups, None)
+        else:
+            pairs = zip_longest(list(a[1]), list(b[1]))
+            a = next(left_groups, None)
+            b = next(right_groups, None)
+        for x, y in pairs:
+            if y is None:
+                result.left_rows += 1
+                result.add(f"only in left: {x!r}")
+                continue
+            result.right_rows += 1
+            if x is None:
+                result.add(f"only in right: {y!r}")
+                continue
+            result.left_rows += 1
+            key = ",".join(_key_cells(x, columns))
+            for column, (p, q) in enumerate(zip_longest(x, y, fillvalue=""), start=1):
+                if not _cells_match(p, q, tolerance):
+                    result.add(f"key {key!r}, column {column}: {p!r} != {q!r}")
+                    break
+
+
+def _partition(digest: bytes, partitions: int) -> int:
+    return int.from_bytes(digest[:4], "big") % partitions
+
+
+def _unmatched_digests(
+    left_rows: Iterator[Row],
+    right_rows: Iterator[Row],
+    digest: Callable[[Row], bytes],
+    partitions: int,
+    result: ComparisonResult,
+) -> Dict[bytes, int]:
+    """Digests found more often on one side (positive: left, negative: right)."""
+    if partitions == 1:
+        balance: Counter = Counter()
+        for row in left_rows:
+            result.left_rows += 1
+            balance[digest(row)] += 1
+        for row in right_rows:
+            result.right_rows += 1
+            balance[digest(row)] -= 1
+        return {key: count for key, count in balance.items() if count}
+
+    unmatched: Dict[bytes, int] = {}
+    record = 1 + _DIGEST_SIZE
+    with tempfile.TemporaryDirectory(prefix="shtest-compare-") as workdir:
+        paths = [os.path.join(workdir, f"{i}.digests") for i in range(partitions)]
+        handles = [open(path, "wb") for path in paths]
+        try:
+            for rows, side in ((left_rows, b"L"), (right_rows, b"R")):
+                for row in rows:
+                    if side == b"L":
+                        result.left_rows += 1
+                    else:
+                        result.right_rows += 1
+                    key = digest(row)
+                    handles[_partition(key, partitions)].write(side + key)
+        finally:
+            for handle in handles:
+                handle.close()
+        for path in paths:
+            balance = Counter()
+            with open(path, "rb") as handle:
+                while True:
+                    block = handle.read(record * 65536)
+                    if not block:
+                        break
+                    for start in range(0, len(block), record):
+                        key = block[start + 1 : start + record]
+                        balance[key] += 1 if block[start] == ord("L") else -1
+            unmatched.update((key, count) for key, count in balance.items() if count)
+    return unmatched
+
+
+def _compare_digests(
+    left_path: str,
+    right_path: str,
+    read: Callable[[str], Iterator[Row]],
+    digest: Callable[[Row], bytes],
+    result: ComparisonResult,
+) -> None:
+    size = os.path.getsize(left_path) + os.path.getsize(right_path)
+    unmatched = _unmatched_digests(
+        read(left_path),
+        read(right_path),
+        digest,
+        min(size // _PARTITION_BYTES + 1, _MAX_PARTITIONS),
+        result,
+    )
+    result.difference_count = sum(abs(count) for count in unmatched.values())
+    if not unmatched:
+        return
+    # Second pass to describe the unmatched rows of each side.
+    for path, side, sign in ((left_path, "left", 1), (right_path, "right", -1)):
+        for row in read(path):
+            if not result.wants_details:
+                return
+            key = digest(row)
+            if unmatched.get(key, 0) * sign > 0:
+                unmatched[key] -= sign
+                result.describe(f"only in {side}: {row!r}")
+
+
+def compare_csv(
+    left_path: str,
+    right_path: str,
+    tolerance: float = 0.0,
+    ignore_order: bool = False,
+    max_differences: int = 10,
+    delimiter: str = ",",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    key: Optional[Sequence[int]] = None,
+    lines: bool = False,
+    report: Optional[TextIO] = None,
+) -> ComparisonResult:
+    """Compare two CSV files without loading them into memory.
+
+    *key* lists the 0-based key columns of a key-based comparison. With
+    *lines*, text lines are compared exactly and *tolerance* is ignored.
+    """
+    result = ComparisonResult(max_differences=max_differences, report=report)
+    if lines:
+        read, digest, tolerance = _read_lines, _line_digest, None
+    else:
+
+        def read(path: str) -> Iterator[Row]:
+            return _read_rows(path, delimiter)
+
+        digest = _row_digest
+    if ignore_order and not tolerance and not key:
+        _compare_digests(left_path, right_path, read, digest, result)
+        return result
+    left = read(left_path)
+    right = read(right_path)
+    if not ignore_order and not key:
+        _compare_streams(left, right, tolerance, result)
+        return result
+    with tempfile.TemporaryDirectory(prefix="shtest-compare-") as workdir:
+        if key:
+
+            def sort_key(row: Row) -> Tuple:
+                return _sort_key(_key_cells(row, key)) + _sort_key(row)
+
+            _compare_keyed(
+                _sorted_rows(left, chunk_size, workdir, sort_key),
+                _sorted_rows(right, chunk_size, workdir, sort_key),
+                key,
+                tolerance,
+                result,
+            )
+        else:
+            _compare_streams(
+                _sorted_rows(left, chunk_size, workdir),
+                _sorted_rows(right, chunk_size, workdir),
+                tolerance,
+                result,
+            )
+    return result
+
+
+def _key_columns(value: str) -> List[int]:
+    try:
+        columns = [int(column) - 1 for column in value.split(",")]
+    except ValueError:
+        columns = [-1]
+    if any(column < 0 for column in columns):
+        raise argparse.ArgumentTypeError(f"invalid key columns: {value!r}")
+    return columns
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m shtest_compiler.runtime.compare",
+        description="Comparer deux fichiers CSV ou texte en flux",
+    )
+    parser.add_argument("left", help="Premier fichier CSV")
+    parser.add_argument("right", help="Second fichier CSV")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.0, help="Écart numérique toléré"
+    )
+    parser.add_argument(
+        "--ignore-order", action="store_true", help="Ignorer l'ordre des lignes"
+    )
+    parser.add_argument(
+        "--key",
+        type=_key_columns,
+        help="Colonnes clés (à partir de 1, ex. 1 ou 1,3) : lignes appariées par clé",
+    )
+    parser.add_argument(
+        "--lines",
+        action="store_true",
+        help="Comparer des lignes de texte entières, sans découpage CSV",
+    )
+    parser.add_argument(
+        "--max-differences",
+        type=int,
+        default=10,
+        help="Nombre maximal de différences affichées",
+    )
+    parser.add_argument(
+        "--report", help="Fichier recevant la liste complète des différences"
+    )
+    parser.add_argument(
+        "--delimiter",
+        default=",",
+        help="Séparateur de colonnes, ou auto pour le deviner depuis l'en-tête",
+    )
+    args = parser.parse_args(argv)
+    if args.lines and (args.key or args.tolerance):
+        parser.error("--lines ne se combine pas avec --key ni --tolerance")
+
+    try:
+        if args.delimiter == "auto":
+            args.delimiter = sniff_delimiter(args.left)
+        report = open(args.report, "w", encoding="utf-8") if args.report else None
+        try:
+            result = compare_csv(
+                args.left,
+                args.right,
+                tolerance=args.tolerance,
+                ignore_order=args.ignore_order,
+                max_differences=args.max_differences,
+                delimiter=args.delimiter,
+                key=args.key,
+                lines=args.lines,
+                report=report,
+            )
+        finally:
+            if report is not None:
+                report.close()
+    except (OSError, csv.Error) as e:
+        print(f"COMPARISON_ERROR: {e}")
+        return 2
+
+    if result.identical:
+        print(f"COMPARISON_SUCCESS: Files are identical ({result.left_rows} rows)")
+        return 0
+    if result.left_rows != result.right_rows:
+        print(f"ROW_COUNT_MISMATCH: {result.left_rows} vs {result.right_rows} rows")
+    if result.difference_count:
+        print(f"MISMATCH: {result.difference_count} difference(s)")
+    for difference in result.differences:
+        print(f"  {difference}")
+    if args.report:
+        print(f"REPORT: {args.report}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+Streaming export of SQL results to CSV, XLSX or Parquet.
+
+Used by the ``Exporter les résultats de la requête ... vers ...`` action. The
+database client writes its rows to stdout, which is piped into::
+
+    python3 -m shtest_compiler.runtime.export - out.xlsx [--format xlsx]
+
+Rows are written as they are read, so memory stays constant whatever the size
+of the result set:
+
+- ``csv``: passthrough (re-delimited only if the client does not emit commas);
+- ``xlsx``: openpyxl ``write_only`` workbook, a new sheet is started every
+  1,048,576 rows (the Excel limit);
+- ``parquet``: pyarrow streaming CSV reader feeding a ``ParquetWriter``.
+
+openpyxl and pyarrow are only imported for the format that needs them.
+
+Exit status: 0 on success, 2 on error.
+"""
+
+import argparse
+import csv
+import io
+import os
+import shutil
+import sys
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Sequence, Union
+
+FORMATS = ("csv", "xlsx", "parquet")
+
+EXCEL_MAX_ROWS = 1_048_576
+
+_EXTENSIONS = {".csv": "csv", ".xlsx": "xlsx", ".parquet": "parquet"}
+_ALIASES = {"excel": "xlsx", "xls": "xlsx", "pq": "parquet"}
+
+
+def format_for(output: str, requested: Optional[str] = None) -> str:
+    """Resolve the export format from *requested* or the *output* extension."""
+    if requested:
+        name = requested.strip().lower()
+        name = _ALIASES.get(name, name)
+        if name not in FORMATS:
+            raise ValueError(
+                f"Unknown export format '{requested}'. "
+                f"Expected one of: {', '.join(FORMATS)}"
+            )
+        return name
+    extension = os.path.splitext(output)[1].lower()
+    return _EXTENSIONS.get(extension, "csv")
+
+
+def _typed(cell: str) -> Union[str, int, float]:
+    text = cell.strip()
+    if not text or text[0] not in "0123456789+-.":
+        return cell
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return cell
+
+
+def _rows(source: BinaryIO, delimiter: str) -> Iterator[List[str]]:
+    text = io.TextIOWrapper(source, encoding="utf-8", errors="replace", newline="")
+    for row in csv.reader(text, delimiter=delimiter):
+        if row:
+            yield row
+
+
+def write_csv(source: BinaryIO, output: str, delimiter: str = ",") -> int:
+    if delimiter == ",":
+        with open(output, "wb") as target:
+            shutil.copyfileobj(source, target)
+        return 0
+    count = 0
+    with open(output, "w", newline="", encoding="utf-8") as target:
+        writer = csv.writer(target)
+        for row in _rows(source, delimiter):
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_xlsx(
+    rows: Iterable[List[str]], output: str, max_rows: int = EXCEL_MAX_ROWS
+) -> int:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = None
+    count = 0
+    for row in rows:
+        if count % max_rows == 0:
+            sheet = workbook.create_sheet(f"Sheet{count // max_rows + 1}")
+        sheet.append([_typed(cell) for cell in row])
+        count += 1
+    if sheet is None:
+        workbook.create_sheet("Sheet1")
+    workbook.save(output)
+    return count
+
+
+def write_parquet(source: BinaryIO, output: str, delimiter: str = ",") -> int:
+    from pyarrow import csv as pa_csv
+    from pyarrow import parquet as pq
+
+    reader = pa_csv.open_csv(
+        source,
+        read_options=pa_csv.ReadOptions(autogenerate_column_names=True),
+        parse_options=pa_csv.ParseOptions(delimiter=delimiter),
+    )
+    count = 0
+    with pq.ParquetWriter(output, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+
+def export(
+    source: BinaryIO, output: str, fmt: str = "csv", delimiter: str = ","
+) -> int:
+    """Stream *source* into *output*; return the number of rows written.
+
+    The CSV passthrough does not count rows and returns 0.
+    """
+    if fmt == "xlsx":
+        return write_xlsx(_rows(source, delimiter), output)
+    if fmt == "parquet":
+        return write_parquet(source, output, delimiter)
+    return write_csv(source, output, delimiter)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m shtest_compiler.runtime.export",
+        description="Exporter des résultats SQL en flux",
+    )
+    parser.add_argument("input", help="Fichier produit par le client SQL ('-' = stdin)")
+    parser.add_argument("output", help="Fichier à générer")
+    parser.add_argument(
+        "--format",
+        help="csv, xlsx ou parquet (déduit de l'extension du fichier par défaut)",
+    )
+    parser.add_argument("--delimiter", default=",", help="Séparateur en entrée")
+    args = parser.parse_args(argv)
+
+    try:
+        fmt = format_for(args.output, args.format)
+        if args.input == "-":
+            export(sys.stdin.buffer, args.output, fmt, args.delimiter)
+        else:
+            with open(args.input, "rb") as source:
+                export(source, args.output, fmt, args.delimiter)
+    except ImportError as e:
+        print(f"EXPORT_ERROR: format {fmt} requires {e.name}", file=sys.stderr)
+        return 2
+    except (OSError, ValueError, csv.Error) as e:
+        print(f"EXPORT_ERROR: {e}", file=sys.stderr)
+        return 2
+    print(f"Export {fmt} created: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""
+Chunked comparison of two files.
+
+Used by the ``Comparer le fichier ... avec ...`` action and the ``les fichiers
+... sont identiques`` validation::
+
+    python3 -m shtest_compiler.runtime.files expected.txt actual.txt \\
+        [--quiet] [--context 3] [--max-lines 20]
+
+Files with the same size are compared in fixed-size chunks, so memory does not
+grow with the size of the files. With ``--quiet`` the comparison stops as soon
+as the answer is known (different sizes, first differing chunk) and nothing is
+printed, like ``cmp -s``. Otherwise the first differing byte is located, with
+its line and column, and a unified diff excerpt of the lines around it is
+printed for text files. The excerpt reads at most ``--max-lines`` lines of
+each file, whatever their size.
+
+Files whose digests are both in the run's hash cache (see
+``shtest_compiler.runtime.checksum``) and match are identical without being
+read.
+
+Exit status: 0 if the files are identical, 1 if they differ, 2 on error.
+"""
+
+import argparse
+import difflib
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import BinaryIO, List, Optional, Sequence, Tuple
+
+from shtest_compiler.runtime.checksum import HashCache, open_cache
+
+COMMAND = "python3 -m shtest_compiler.runtime.files"
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+DEFAULT_CONTEXT = 3
+DEFAULT_MAX_LINES = 20
+
+# Bytes read back before the differing line to find its context lines, and
+# longest line read for the excerpt.
+_CONTEXT_WINDOW = 64 * 1024
+_MAX_LINE_BYTES = 4096
+
+_HUNK = re.compile(r"^@@ -(\d+)((?:,\d+)?) \+(\d+)((?:,\d+)?) @@")
+
+
+@dataclass
+class FileDifference:
+    offset: int  # first differing byte, from 0
+    line: int  # line of that byte, from 1
+    column: int  # column of that byte, from 1
+    line_start: int  # offset of the first byte of that line
+    left_size: int
+    right_size: int
+    excerpt: List[str] = field(default_factory=list)
+
+
+def _mismatch(left: bytes, right: bytes) -> int:
+    """Index of the first differing byte of two chunks.
+
+    Returns the length of the shorter chunk when it is a prefix of the other.
+    Halves are compared as whole slices, so the search does O(log n) memory
+    comparisons instead of a Python loop over the bytes.
+    """
+    low, high = 0, min(len(left), len(right))
+    while low < high:
+        middle = (low + high) // 2
+        if left[low : middle + 1] == right[low : middle + 1]:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _cached_identical(
+    cache: Optional[HashCache],
+    left: str,
+    right: str,
+    left_stat: os.stat_result,
+    right_stat: os.stat_result,
+) -> bool:
+    """Whether cached digests already prove the two files identical."""
+    if cache is None:
+        return False
+    left_digest = cache.get(left, left_stat)
+    return left_digest is not None and left_digest == cache.get(right, right_stat)
+
+
+def files_identical(
+    left: str,
+    right: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache: Optional[HashCache] = None,
+) -> bool:
+    """Whether two files have the same content, stopping at the first difference."""
+    left_stat, right_stat = os.stat(left), os.stat(right)
+    if os.path.samestat(left_stat, right_stat):
+        return True
+    if left_stat.st_size != right_stat.st_size:
+        return False
+    if _cached_identical(cache, left, right, left_stat, right_stat):
+        return True
+    with open(left, "rb") as left_file, open(right, "rb") as right_file:
+        while True:
+            chunk = left_file.read(chunk_size)
+            if chunk != right_file.read(chunk_size):
+                return False
+            if not chunk:
+                return True
+
+
+def find_difference(
+    left: str,
+    right: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache: Optional[HashCache] = None,
+) -> Optional[FileDifference]:
+    """Locate the first differing byte of two files, or ``None`` if identical."""
+    left_stat, right_stat = os.stat(left), os.stat(right)
+    if os.path.samestat(left_stat, right_stat):
+        return None
+    if left_stat.st_size == right_stat.st_size and _cached_identical(
+        cache, left, right, left_stat, right_stat
+    ):
+        return None
+    offset = 0
+    lines = 0
+    line_start = 0
+    with open(left, "rb") as left_file, open(right, "rb") as right_file:
+        while True:
+            left_chunk = left_file.read(chunk_size)
+            right_chunk = right_file.read(chunk_size)
+            differ = left_chunk != right_chunk
+            if not differ and not left_chunk:
+                return None
+            same = left_chunk
+            if differ:
+                same = left_chunk[: _mismatch(left_chunk, right_chunk)]
+            lines += same.count(b"\n")
+            newline = same.rfind(b"\n")
+            if newline >= 0:
+                line_start = offset + newline + 1
+            offset += len(same)
+            if differ:
+                return FileDifference(
+                    offset=offset,
+                    line=lines + 1,
+                    column=offset - line_start + 1,
+                    line_start=line_start,
+                    left_size=left_stat.st_size,
+                    right_size=right_stat.st_size,
+                )
+
+
+def _read_lines(stream: BinaryIO, count: int) -> Tuple[List[bytes], bool]:
+    """Read up to *count* lines; also tell whether the file goes on."""
+    lines = []
+    for _ in range(count):
+        line = stream.readline(_MAX_LINE_BYTES)
+        if not line:
+            return lines, False
+        lines.append(line)
+    return lines, bool(stream.read(1))
+
+
+def _shift_hunk(line: str, shift: int) -> str:
+    match = _HUNK.match(line)
+    if not match:
+        return line
+    left_start, left_count, right_start, right_count = match.groups()
+    return (
+        f"@@ -{int(left_start) + shift}{left_count} "
+        f"+{int(right_start) + shift}{right_count} @@"
+        + line[match.end() :]
+    )
+
+
+def diff_excerpt(
+    left: str,
+    right: str,
+    difference: FileDifference,
+    context: int = DEFAULT_CONTEXT,
+    max_lines: int = DEFAULT_MAX_LINES,
+) -> List[str]:
+    """Unified diff of the lines around *difference*, or ``[]`` for binary files.
+
+    The files are identical up to the differing line, so its context lines
+    are read once, from a bounded window before it.
+    """
+    with open(left, "rb") as left_file, open(right, "rb") as right_file:
+        window_start = max(0, difference.line_start - _CONTEXT_WINDOW)
+        left_file.seek(window_start)
+        before = left_file.read(difference.line_start - window_start)
+        before_lines = before.splitlines(keepends=True)
+        if window_start > 0 and before_lines:
+            before_lines.pop(0)  # partial line cut by the window
+        before_lines = before_lines[-context:] if context > 0 else []
+        excerpt_start = difference.line_start - sum(map(len, before_lines))
+        count = len(before_lines) + max(max_lines - len(before_lines), 1)
+
+        left_file.seek(excerpt_start)
+        right_file.seek(excerpt_start)
+        left_lines, left_more = _read_lines(left_file, count)
+        right_lines, right_more = _read_lines(right_file, count)
+
+    if any(b"\0" in line for line in left_lines + right_lines):
+        return []
+    first_line = difference.line - len(before_lines)
+    diff = difflib.unified_diff(
+        [line.decode("utf-8", "replace").rstrip("\r\n") for line in left_lines],
+        [line.decode("utf-8", "replace").rstrip("\r\n") for line in right_lines],
+        fromfile=left,
+        tofile=right,
+        n=context,
+        lineterm="",
+    )
+    excerpt = [_shift_hunk(line, first_line - 1) for line in diff]
+    if left_more or right_more:
+        # Later hunks may only come from where the excerpt was cut
+        hunks = [i for i, line in enumerate(excerpt) if line.startswith("@@")]
+        if len(hunks) > 1:
+            del excerpt[hunks[1] :]
+        excerpt.append(f"... (extrait limité à {count} lignes)")
+    return excerpt
+
+
+def compare_files(
+    left: str,
+    right: str,
+    context: int = DEFAULT_CONTEXT,
+    max_lines: int = DEFAULT_MAX_LINES,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache: Optional[HashCache] = None,
+) -> Optional[FileDifference]:
+    """Find the first difference of two files, with its diff excerpt."""
+    difference = find_difference(left, right, chunk_size, cache)
+    if difference is not None:
+        difference.excerpt = diff_excerpt(left, right, difference, context, max_lines)
+    return difference
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog=COMMAND,
+        description="Comparer deux fichiers octet par octet",
+    )
+    parser.add_argument("left", help="Premier fichier")
+    parser.add_argument("right", help="Second fichier")
+    parser.add_argument(
+        "--quiet",
+        "-s",
+        action="store_true",
+        help="N'afficher aucune différence, seulement le code de retour",
+    )
+    parser.add_argument(
+        "--context",
+        type=int,
+        default=DEFAULT_CONTEXT,
+        help="Lignes de contexte autour de la première différence",
+    )
+    parser.add_argument(
+        "--max-lines",
+        type=int,
+        default=DEFAULT_MAX_LINES,
+        help="Nombre maximal de lignes lues pour l'extrait de diff",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Taille des blocs comparés (octets)",
+    )
+    args = parser.parse_args(argv)
+
+    cache = open_cache()
+    try:
+        if args.quiet:
+            identical = files_identical(args.left, args.right, args.chunk_size, cache)
+            return 0 if identical else 1
+        difference = compare_files(
+            args.left,
+            args.right,
+            args.context,
+            args.max_lines,
+            args.chunk_size,
+            cache,
+        )
+    except OSError as e:
+        print(f"COMPARISON_ERROR: {e}")
+        return 2
+
+    if difference is None:
+        return 0
+    print(
+        f"FILES_DIFFER: first difference at byte {difference.offset} "
+        f"(line {difference.line}, column {difference.column})"
+    )
+    if difference.left_size != difference.right_size:
+        print(
+            f"SIZE_MISMATCH: {difference.left_size} vs {difference.right_size} bytes"
+        )
+    for line in difference.excerpt:
+        print(line)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
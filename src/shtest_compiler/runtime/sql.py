@@ -0,0 +1,126 @@
+"""
+In-process SQL executor for the ``sqlite`` driver.
+
+Plays the role of ``sqlplus``/``psql``/``mysql`` for SQLite databases, using
+the DB-API module shipped with Python, so SQL tests can run without a
+database server::
+
+    python3 -m shtest_compiler.runtime.sql test.db script.sql
+    echo "SELECT * FROM t;" | python3 -m shtest_compiler.runtime.sql test.db --csv
+
+``SQL_CONN`` is the path of the database file (``sqlite:///`` URLs are
+accepted too). Statements run in autocommit mode, like the ``sqlite3`` shell,
+so explicit ``BEGIN``/``COMMIT`` blocks behave as usual. Rows returned by a
+statement are printed without header, ``|``-separated (the ``sqlite3`` shell
+list mode) or as CSV with ``--csv``.
+
+Exit status: 0 on success, 1 if a statement fails (execution stops there),
+2 if the database cannot be opened.
+"""
+
+import argparse
+import csv
+import sqlite3
+import sys
+from typing import Any, Iterable, Iterator, Optional, Sequence, TextIO
+
+_URL_PREFIX = "sqlite:///"
+
+
+def connect_sqlite(conn: str) -> sqlite3.Connection:
+    """Open the SQLite database named by a ``SQL_CONN`` value."""
+    path = conn[len(_URL_PREFIX):] if conn.startswith(_URL_PREFIX) else conn
+    return sqlite3.connect(path, timeout=30, isolation_level=None)
+
+
+def split_statements(lines: Iterable[str]) -> Iterator[str]:
+    """Yield the complete statements of a script, read line by line.
+
+    A trailing statement without ``;`` is executed at the end of the script.
+    """
+    buffer = ""
+    for line in lines:
+        # Several statements may share a line; a ";" inside a literal leaves
+        # the statement incomplete and is kept in the buffer.
+        *pieces, rest = line.split(";")
+        for piece in pieces:
+            buffer += piece + ";"
+            if sqlite3.complete_statement(buffer):
+                yield buffer
+                buffer = ""
+        buffer += rest
+    if buffer.strip():
+        yield buffer
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+def execute(
+    connection: Any, statements: Iterable[str], out: TextIO, as_csv: bool = False
+) -> int:
+    """Run *statements* on a DB-API *connection*, printing returned rows.
+
+    Returns the number of rows printed.
+    """
+    writer = csv.writer(out, lineterminator="\n") if as_csv else None
+    count = 0
+    cursor = connection.cursor()
+    try:
+        for statement in statements:
+            cursor.execute(statement)
+            if cursor.description is None:
+                continue
+            for row in iter(cursor.fetchone, None):
+                cells = [_cell(value) for value in row]
+                if writer:
+                    writer.writerow(cells)
+                else:
+                    out.write("|".join(cells) + "\n")
+                count += 1
+    finally:
+        cursor.close()
+    return count
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m shtest_compiler.runtime.sql",
+        description="Exécuter un script SQL sur une base SQLite",
+    )
+    parser.add_argument("database", help="Fichier de base de données (SQL_CONN)")
+    parser.add_argument(
+        "script", nargs="?", default="-", help="Script SQL ('-' = stdin, par défaut)"
+    )
+    parser.add_argument("--csv", action="store_true", help="Lignes au format CSV")
+    args = parser.parse_args(argv)
+
+    try:
+        connection = connect_sqlite(args.database)
+    except sqlite3.Error as e:
+        print(f"SQL_ERROR: cannot open {args.database}: {e}", file=sys.stderr)
+        return 2
+    try:
+        if args.script == "-":
+            execute(connection, split_statements(sys.stdin), sys.stdout, args.csv)
+        else:
+            with open(args.script, encoding="utf-8") as script:
+                execute(connection, split_statements(script), sys.stdout, args.csv)
+    except OSError as e:
+        print(f"SQL_ERROR: {e}", file=sys.stderr)
+        return 2
+    except sqlite3.Error as e:
+        print(f"SQL_ERROR: {e}", file=sys.stderr)
+        return 1
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,19 @@
 import argparse
+import json
 import sys
+from contextlib import nullcontext
 
 from shtest_compiler.compile_expr import compile_validation
 from shtest_compiler.compile_file import compile_file
-from shtest_compiler.export_to_excel import export_patterns_to_excel
-from shtest_compiler.verify_syntax import main as verify_main
-from shtest_compiler.utils.logger import debug_log, set_debug, log_pipeline_error
+from shtest_compiler.compiler.failure_policy import FAIL_FAST, FAILURE_POLICIES
+from shtest_compiler.compiler.profiling import CompileProfile, profile_files, profiling
+from shtest_compiler.verify_syntax import FORMATS as VERIFY_FORMATS, main as verify_main
+from shtest_compiler.utils.logger import (
+    TRACE_CATEGORIES,
+    debug_log,
+    log_pipeline_error,
+    set_debug,
+)
 
 
 def main():
@@ -17,6 +25,14 @@ def main():
         action="store_true",
         help="Enable debug mode for detailed logging (can be used anywhere)",
     )
+    parser.add_argument(
+        "--trace",
+        metavar="CATEGORIES",
+        help=(
+            "Activer le débogage pour certaines catégories seulement, séparées par "
+            f"des virgules ({', '.join(TRACE_CATEGORIES)})"
+        ),
+    )
 
     subparsers = parser.add_subparsers(dest="command", required=True)
 
@@ -42,14 +58,96 @@ def main():
     )
     parser_file.add_argument("--output", help="Fichier de sortie pour le script généré")
     parser_file.add_argument(
+        "--on-failure",
+        choices=FAILURE_POLICIES,
+        default=FAIL_FAST,
+        help="Comportement du script généré lorsqu'une validation échoue",
+    )
+    parser_file.add_argument(
+        "--checkpoints",
+        action="store_true",
+        help="Permettre la reprise du script généré avec --from-step/--only-step",
+    )
+    parser_file.add_argument(
+        "--fixture-cache",
+        action="store_true",
+        help="Restaurer les étapes de préparation de fichiers depuis un cache",
+    )
+    parser_file.add_argument(
+        "--sql-session",
+        action="store_true",
+        help="Ouvrir une seule session SQL par connexion au lieu d'une par action",
+    )
+    parser_file.add_argument(
+        "--sql-cache",
+        action="store_true",
+        help="Réutiliser le résultat des requêtes en lecture jusqu'à la prochaine écriture",
+    )
+    parser_file.add_argument(
+        "--sql-jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Exécuter jusqu'à N requêtes en lecture consécutives d'une étape en parallèle",
+    )
+    parser_file.add_argument(
+        "--timings",
+        action="store_true",
+        help="Afficher le temps passé dans chaque étape de compilation et chaque handler",
+    )
+    parser_file.add_argument(
+        "--debug", action="store_true", help="Enable debug mode for detailed logging"
+    )
+
+    # Subcommande profile
+    parser_profile = subparsers.add_parser(
+        "profile",
+        help="Mesurer les étapes de compilation et les handlers de fichiers .shtest",
+    )
+    parser_profile.add_argument(
+        "paths", nargs="+", help="Fichiers .shtest ou dossiers à compiler"
+    )
+    parser_profile.add_argument(
+        "--output-dir", help="Conserver les scripts générés dans ce dossier"
+    )
+    parser_profile.add_argument(
+        "--allocations",
+        action="store_true",
+        help="Mesurer aussi la mémoire allouée (tracemalloc, plus lent)",
+    )
+    parser_profile.add_argument(
+        "--cprofile", metavar="FICHIER", help="Écrire un profil cProfile (pstats)"
+    )
+    parser_profile.add_argument(
+        "--tracemalloc", metavar="FICHIER", help="Écrire un instantané tracemalloc"
+    )
+    parser_profile.add_argument(
+        "--top", type=int, default=10, help="Nombre de handlers affichés"
+    )
+    parser_profile.add_argument(
+        "--json", metavar="FICHIER", help="Écrire les mesures au format JSON"
+    )
+    parser_profile.add_argument(
         "--debug", action="store_true", help="Enable debug mode for detailed logging"
     )
 
     # Subcommande verify_syntax
     parser_verify = subparsers.add_parser(
-        "verify", help="Vérifier uniquement la syntaxe d'un fichier .shtest"
+        "verify", help="Vérifier uniquement la syntaxe de fichiers .shtest"
+    )
+    parser_verify.add_argument(
+        "paths", nargs="+", help="Fichiers .shtest, dossiers ou motifs glob à vérifier"
+    )
+    parser_verify.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        metavar="N",
+        help="Nombre de processus (par défaut, un par processeur)",
+    )
+    parser_verify.add_argument(
+        "--format", choices=VERIFY_FORMATS, default="text", help="Format du rapport"
     )
-    parser_verify.add_argument("file", help="Fichier .shtest à vérifier")
     parser_verify.add_argument(
         "--verbose", action="store_true", help="Afficher les détails du parsing"
     )
@@ -79,7 +177,12 @@ def main():
 
     # If --debug is present anywhere, enable debug globally
     debug_flag = getattr(args, "debug", False) or "--debug" in unknown
-    set_debug(debug_flag)
+    categories = args.trace.split(",") if args.trace else None
+    debug_flag = debug_flag or bool(categories)
+    try:
+        set_debug(debug_flag, categories)
+    except ValueError as e:
+        parser.error(str(e))
     debug_log("ENTRYPOINT DEBUG ACTIVE: src/shtest_compiler/shtest.py loaded")
 
     # Re-parse with all args for subcommand
@@ -95,15 +198,23 @@ def main():
         print("\n".join(lines))
 
     elif args.command == "compile_file":
+        profile = CompileProfile()
         try:
-            output_path = compile_file(
-                input_path=args.file,
-                output_path=args.output,
-                grammar=getattr(args, "grammar", "default"),
-                ast_builder=getattr(args, "ast_builder", "default"),
-                debug=debug_flag,
-                debug_output_path=getattr(args, "debug_output_path", None),
-            )
+            with profiling(profile) if args.timings else nullcontext():
+                output_path = compile_file(
+                    input_path=args.file,
+                    output_path=args.output,
+                    grammar=getattr(args, "grammar", "default"),
+                    ast_builder=getattr(args, "ast_builder", "default"),
+                    debug=debug_flag,
+                    debug_output_path=getattr(args, "debug_output_path", None),
+                    failure_policy=args.on_failure,
+                    checkpoints=args.checkpoints,
+                    fixture_cache=args.fixture_cache,
+                    sql_session=args.sql_session,
+                    sql_cache=args.sql_cache,
+                    sql_jobs=args.sql_jobs,
+                )
         except Exception as e:
             import traceback
             from shtest_compiler.parser.core import ParseError
@@ -119,25 +230,40 @@ def main():
             raise
         if not args.output:
             print(f"Compiled file: {output_path}")
+        if args.timings:
+            profile.files = 1
+            print(profile.report(), file=sys.stderr)
 
-    elif args.command == "verify":
-        # Pass the file argument to verify_syntax
-
-        # Temporarily modify sys.argv to pass the file argument
-        original_argv = sys.argv.copy()
-        sys.argv = [sys.argv[0], args.file]
-        if args.verbose:
-            sys.argv.append("--verbose")
-        if getattr(args, "debug", False):
-            sys.argv.append("--debug")
+    elif args.command == "profile":
+        profile = profile_files(
+            args.paths,
+            output_dir=args.output_dir,
+            allocations=args.allocations,
+            cprofile_path=args.cprofile,
+            tracemalloc_path=args.tracemalloc,
+            debug=debug_flag,
+        )
+        print(profile.report(top=args.top))
+        for path, error in profile.errors:
+            print(f"ERREUR {path}: {error}", file=sys.stderr)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(profile.as_dict(), f, indent=2)
+        if profile.errors:
+            sys.exit(1)
 
-        try:
-            verify_main()
-        finally:
-            # Restore original sys.argv
-            sys.argv = original_argv
+    elif args.command == "verify":
+        verify_args = list(args.paths) + ["--format", args.format]
+        if args.jobs:
+            verify_args += ["--jobs", str(args.jobs)]
+        if args.verbose or getattr(args, "debug", False):
+            verify_args.append("--verbose")
+        verify_main(verify_args)
 
     elif args.command == "to_excel":
+        # openpyxl is only needed for this command
+        from shtest_compiler.export_to_excel import export_patterns_to_excel
+
         if args.verbose or getattr(args, "debug", False):
             print(f"Export des patterns vers {args.output_xlsx}...")
         export_patterns_to_excel(
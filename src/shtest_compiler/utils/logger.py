@@ -1,10 +1,25 @@
 
 import logging
+import os
+import pickle
 import sys
 import socket
 import datetime
+import tempfile
+import threading
+import time
+import weakref
+from collections import deque
 from enum import Enum
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Any, Iterator, List, Optional, Tuple
+
+# Records kept in memory by the log store; older ones are spilled to disk.
+DEFAULT_MAX_RECORDS = 10_000
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+# Trace point categories, selectable with ``shtest --trace lexer,handler``.
+TRACE_CATEGORIES = ("lexer", "parser", "registry", "handler", "emitter", "resources")
 
 class LogType(Enum):
     PIPELINE_ERROR = "PIPELINE_ERROR"
@@ -12,6 +27,123 @@ class LogType(Enum):
     ACTION = "ACTION"
     DEBUG = "DEBUG"
 
+@lru_cache(maxsize=1)
+def _hostname() -> str:
+    return socket.gethostname()
+
+def _remove(spill, path: str) -> None:
+    spill.close()
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _format_message(msg: Any, args: tuple) -> str:
+    """Apply %-style arguments the way logging does, only when needed."""
+    message = str(msg)
+    if args:
+        try:
+            return message % args
+        except (TypeError, ValueError):
+            return f"{message} {args}"
+    return message
+
+# Immutable argument types: a record may keep them unformatted.
+_SCALARS = (str, int, float, bool, bytes, type(None))
+
+def _freeze(msg: Any, args: tuple) -> Tuple[Any, tuple]:
+    """Format *msg* now unless every argument is an immutable scalar.
+
+    Mutable arguments would be formatted in their state at export time, and
+    keeping them would keep them alive as long as the record.
+    """
+    if all(type(arg) in _SCALARS for arg in args):
+        return msg, args
+    return _format_message(msg, args), ()
+
+class LogStore:
+    """Records of one compilation, bounded in memory.
+
+    Records whose arguments are all scalars keep them unformatted; others are
+    formatted when logged. Past ``max_records``, the oldest ones are formatted
+    and pickled to a temporary file, so memory stays bounded and an export
+    still sees them.
+    """
+
+    def __init__(self, max_records: int = DEFAULT_MAX_RECORDS):
+        self.max_records = max_records
+        self._records: deque = deque()
+        self._spill = None
+        self._spill_path = None
+        self._spilled = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._spilled + len(self._records)
+
+    def append(self, level: str, msg: Any, args: tuple = ()) -> None:
+        msg, args = _freeze(msg, args)
+        self._records.append((time.time(), level, msg, args))
+        if len(self._records) > self.max_records:
+            self._spill_oldest()
+
+    def _spill_oldest(self) -> None:
+        with self._lock:
+            if self._spill is None:
+                fd, self._spill_path = tempfile.mkstemp(prefix="shtest-log-")
+                self._spill = os.fdopen(fd, "wb")
+                self._cleanup = weakref.finalize(self, _remove, self._spill, self._spill_path)
+            while len(self._records) > self.max_records:
+                created, level, msg, args = self._records.popleft()
+                pickle.dump((created, level, _format_message(msg, args)), self._spill)
+                self._spilled += 1
+
+    def __iter__(self) -> Iterator[Tuple[float, str, str]]:
+        """Records in order, as ``(created, level, message)``.
+
+        Iterates over a snapshot: records logged meanwhile are not included.
+        """
+        with self._lock:
+            spilled = self._spilled
+            if self._spill is not None:
+                self._spill.flush()
+            records = list(self._records)
+        if spilled:
+            with open(self._spill_path, "rb") as spill:
+                for _ in range(spilled):
+                    yield pickle.load(spill)
+        for created, level, msg, args in records:
+            yield created, level, _format_message(msg, args)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._spill is not None:
+                self._cleanup()
+                self._spill = None
+            self._records.clear()
+            self._spilled = 0
+
+class TraceFlags:
+    """Whether each trace category is on, as plain attributes.
+
+    Hot call sites guard their trace points with the attribute, so that with
+    tracing off they cost one attribute lookup and build no message::
+
+        if tracing.lexer:
+            trace("lexer", "tokenize", "line %d: %s", lineno, token)
+    """
+
+    __slots__ = TRACE_CATEGORIES
+
+    def __init__(self):
+        for category in TRACE_CATEGORIES:
+            setattr(self, category, False)
+
+    def enabled(self) -> List[str]:
+        return [category for category in TRACE_CATEGORIES if getattr(self, category)]
+
+tracing = TraceFlags()
+
 class RFC5424Formatter(logging.Formatter):
     def formatTime(self, record, datefmt=None):
         dt = datetime.datetime.utcfromtimestamp(record.created)
@@ -26,15 +158,20 @@ class RFC5424Formatter(logging.Formatter):
         else:
             return dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
     def format(self, record):
-        record.hostname = socket.gethostname()
+        record.hostname = _hostname()
         record.asctime = self.formatTime(record, self.datefmt)
         return f"{record.asctime} {record.hostname} {record.name}[{record.process}]: [{getattr(record, 'log_type', record.levelname)}] {record.getMessage()}"
 
 class SingletonLogger:
-    """Logger singleton with RFC 5424 formatting, log storage, and export."""
+    """Logger singleton with RFC 5424 formatting, log storage, and export.
+
+    Records are stored in the log scope of the thread logging them, so that
+    compilations running in a thread pool each export their own records. A
+    thread that never started a scope logs into the scope of the main thread.
+    """
     _instance = None
     _debug_enabled = False
-    _log_store: List[Tuple[str, str]] = []
+    _quiet = False
 
     def __new__(cls):
         if cls._instance is None:
@@ -50,14 +187,43 @@ class SingletonLogger:
             handler.setFormatter(formatter)
             self.logger.addHandler(handler)
         self.logger.setLevel(logging.INFO)
+        self._shared_store = LogStore()
+        self._scopes = threading.local()
+
+    @property
+    def _log_store(self) -> LogStore:
+        store = getattr(self._scopes, "store", None)
+        return self._shared_store if store is None else store
 
-    def _store_log(self, level: LogType, msg: str):
-        self._log_store.append((level.value, str(msg)))
+    def _store_log(self, level: LogType, msg, args: tuple = ()):
+        self._log_store.append(level.value, msg, args)
+
+    def start_scope(self, max_records: int = DEFAULT_MAX_RECORDS):
+        """Drop the records of the calling thread and start those of a new compilation."""
+        store = LogStore(max_records)
+        if threading.current_thread() is threading.main_thread():
+            previous, self._shared_store = self._shared_store, store
+        else:
+            previous, self._scopes.store = getattr(self._scopes, "store", None), store
+        if previous is not None:
+            previous.close()
 
     def set_debug(self, enabled: bool):
         self._debug_enabled = enabled
-        self._log_store = [] if enabled else self._log_store
-        self.logger.setLevel(logging.DEBUG if enabled else logging.INFO)
+        if enabled:
+            self.start_scope()
+        self._set_level()
+
+    def set_quiet(self, quiet: bool):
+        """Keep records off the console; they are still stored for export_log."""
+        self._quiet = quiet
+        self._set_level()
+
+    def _set_level(self):
+        if self._quiet:
+            self.logger.setLevel(logging.CRITICAL)
+        else:
+            self.logger.setLevel(logging.DEBUG if self._debug_enabled else logging.INFO)
 
     def is_debug_enabled(self):
         return self._debug_enabled
@@ -65,42 +231,71 @@ class SingletonLogger:
     def log_pipeline_error(self, msg, *args, **kwargs):
         extra = {'log_type': LogType.PIPELINE_ERROR.value}
         self.logger.error(msg, *args, extra=extra, **kwargs)
-        self._store_log(LogType.PIPELINE_ERROR, msg)
+        self._store_log(LogType.PIPELINE_ERROR, msg, args)
 
     def log_warning(self, msg, *args, **kwargs):
         extra = {'log_type': LogType.WARNING.value}
         self.logger.warning(msg, *args, extra=extra, **kwargs)
-        self._store_log(LogType.WARNING, msg)
+        self._store_log(LogType.WARNING, msg, args)
 
     def log_action(self, msg, *args, **kwargs):
         extra = {'log_type': LogType.ACTION.value}
         self.logger.info(msg, *args, extra=extra, **kwargs)
-        self._store_log(LogType.ACTION, msg)
+        self._store_log(LogType.ACTION, msg, args)
 
     def debug(self, msg, *args, **kwargs):
         if self._debug_enabled:
             extra = {'log_type': LogType.DEBUG.value}
             self.logger.debug(msg, *args, extra=extra, **kwargs)
-            self._store_log(LogType.DEBUG, msg)
+            self._store_log(LogType.DEBUG, msg, args)
+
+    def trace(self, category: str, point: str, msg, args: tuple = ()):
+        message = f"[{category}] {point}: {msg}" if msg else f"[{category}] {point}"
+        extra = {'log_type': LogType.DEBUG.value}
+        self.logger.log(logging.DEBUG, message, *args, extra=extra)
+        self._store_log(LogType.DEBUG, message, args)
 
     def export_log(self, path: str, include_levels: List[str] = None):
+        """Write the records of the calling thread's scope, with their logging time."""
+        prefix = f"{_hostname()} shtest_compiler[{os.getpid()}]"
         with open(path, "w", encoding="utf-8") as f:
-            for level, message in self._log_store:
+            for created, level, message in self._log_store:
                 if include_levels is None or level in include_levels:
-                    hostname = socket.gethostname()
-                    import os
-                    timestamp = datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%fZ')
-                    f.write(f"{timestamp} {hostname} shtest_compiler[{os.getpid()}]: [{level}] {message}\n")
+                    timestamp = datetime.datetime.utcfromtimestamp(created).strftime(TIMESTAMP_FORMAT)
+                    f.write(f"{timestamp} {prefix}: [{level}] {message}\n")
 
     def reset(self):
         self._debug_enabled = False
-        self._log_store = []
+        self._quiet = False
+        self._set_level()
+        self.start_scope()
 
 # Utility functions
 logger = SingletonLogger()
 
-def set_debug(enabled: bool):
+def set_debug(enabled: bool, categories: Optional[List[str]] = None):
+    """Turn debug logging on or off; *categories* limits the trace points."""
     logger.set_debug(enabled)
+    set_trace_categories((categories or TRACE_CATEGORIES) if enabled else ())
+
+def set_trace_categories(categories):
+    unknown = set(categories) - set(TRACE_CATEGORIES)
+    if unknown:
+        raise ValueError(
+            f"Unknown trace categories: {', '.join(sorted(unknown))} "
+            f"(expected: {', '.join(TRACE_CATEGORIES)})"
+        )
+    for category in TRACE_CATEGORIES:
+        setattr(tracing, category, category in categories)
+
+def trace(category: str, point: str, msg="", *args):
+    """Record the trace point *point*.
+
+    ``msg % args`` is built on export when *args* are scalars, when logged
+    otherwise.
+    """
+    if getattr(tracing, category):
+        logger.trace(category, point, msg, args)
 
 def is_debug_enabled():
     return logger.is_debug_enabled()
@@ -120,5 +315,12 @@ def debug_log(msg, *args, **kwargs):
 def export_log(path: str, include_levels: List[str] = None):
     logger.export_log(path, include_levels)
 
+def set_quiet(quiet: bool = True):
+    logger.set_quiet(quiet)
+
+def start_log_scope(max_records: int = DEFAULT_MAX_RECORDS):
+    logger.start_scope(max_records)
+
 def reset_logger():
     logger.reset()
+    set_trace_categories(())
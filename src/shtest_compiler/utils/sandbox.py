@@ -0,0 +1,177 @@
+"""
+Per-test sandbox workspaces for running generated scripts.
+
+Generated scripts work with paths relative to their current directory. Running
+each script inside its own sandbox keeps parallel runs from colliding and keeps
+the file churn on a fast filesystem (``/dev/shm`` when available).
+
+The sandbox mirrors the test's input directory: directories are recreated and
+files are linked to the originals. Files the script writes in place or
+timestamps (``touch``, ``chmod``, ``sed -i``, ``>``/``>>`` redirections, see
+:func:`write_targets`) are copied instead, so the originals are never changed.
+New files, deletions and copies stay inside the sandbox.
+"""
+
+import os
+import shlex
+import shutil
+import tempfile
+import threading
+from typing import Iterable, Optional, Set
+
+# Directories that are never mirrored into a sandbox.
+SKIPPED_DIRS = (".git", "__pycache__", ".shtest_checkpoints", ".shtest_fixtures")
+
+
+def default_sandbox_root() -> str:
+    """Return ``$SHTEST_SANDBOX_ROOT``, ``/dev/shm`` or the temp directory."""
+    root = os.environ.get("SHTEST_SANDBOX_ROOT")
+    if root:
+        return root
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+# Commands that modify the files they are given, with the options taking a value.
+_WRITING_COMMANDS = {
+    "touch": {"-t", "-d", "-r"},
+    "chmod": set(),
+    "chown": set(),
+    "truncate": {"-s", "-r"},
+    "sed": {"-e", "-f"},
+}
+# Commands whose first operand is not a file (mode, owner, sed script).
+_LEADING_OPERAND = {"chmod", "chown"}
+_SEPARATORS = {";", "&&", "||", "|", "&", "(", ")"}
+# Words whose argument is itself a command (generated scripts wrap every action
+# in ``run_action "<command>"``).
+_EVALUATING = {"run_action", "eval", "-c"}
+
+
+def _tokens(command: str) -> list:
+    """Split *command* into shell words, descending into quoted sub-commands."""
+    lexer = shlex.shlex(command, posix=True, punctuation_chars=";&|()<>")
+    lexer.whitespace_split = True
+    try:
+        words = list(lexer)
+    except ValueError:
+        return []
+    tokens = []
+    for word in words:
+        if tokens and tokens[-1] in _EVALUATING:
+            tokens.append(";")
+            tokens.extend(_tokens(word))
+            tokens.append(";")
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def write_targets(script: str) -> Set[str]:
+    """Return the paths *script* writes in place or timestamps.
+
+    Only literal paths are found; paths built from variables are skipped.
+    """
+    targets = set()
+    for line in script.splitlines():
+        tokens = _tokens(line)
+        command = None
+        operands = []
+        for i, token in enumerate(tokens + [";"]):
+            if token in _SEPARATORS:
+                if command == "sed -i" or command in _LEADING_OPERAND:
+                    targets.update(operands[1:])
+                elif command and command != "sed":
+                    targets.update(operands)
+                command = None
+            elif token in (">", ">>"):
+                if i + 1 < len(tokens):
+                    targets.add(tokens[i + 1])
+            elif command is None:
+                command = token if token in _WRITING_COMMANDS else ""
+                operands = []
+                takes_value = False
+            elif command:
+                if takes_value:
+                    takes_value = False
+                elif token.startswith("-"):
+                    takes_value = token in _WRITING_COMMANDS[command.split()[0]]
+                    if command == "sed" and token.startswith("-i"):
+                        command = "sed -i"
+                else:
+                    operands.append(token)
+    return {target for target in targets if target and "$" not in target}
+
+
+def _mirror(
+    source: str, target: str, excluded: Iterable[str], copied: Iterable[str]
+) -> None:
+    for entry in os.scandir(source):
+        src_path = os.path.abspath(entry.path)
+        dest_path = os.path.join(target, entry.name)
+        if src_path in excluded or entry.name in SKIPPED_DIRS:
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            os.mkdir(dest_path)
+            _mirror(entry.path, dest_path, excluded, copied)
+        elif src_path in copied:
+            shutil.copy2(src_path, dest_path)
+        else:
+            os.symlink(src_path, dest_path)
+
+
+class Sandbox:
+    """A throw-away workspace mirroring *source_dir*.
+
+    Paths in *copied* (relative to *source_dir*, e.g. from :func:`write_targets`)
+    are copied into the sandbox instead of linked.
+    """
+
+    def __init__(
+        self,
+        source_dir: str = ".",
+        root: Optional[str] = None,
+        prefix: str = "shtest-",
+        copied: Iterable[str] = (),
+    ):
+        self.source_dir = os.path.abspath(source_dir)
+        self.root = os.path.abspath(root or default_sandbox_root())
+        self.path = tempfile.mkdtemp(prefix=prefix, dir=self.root)
+        copied = {os.path.abspath(os.path.join(self.source_dir, p)) for p in copied}
+        # A sandbox root nested in the source tree must not mirror itself.
+        _mirror(self.source_dir, self.path, {self.root, self.path}, copied)
+
+    def environ(self) -> dict:
+        """Environment for a script run in the sandbox.
+
+        The fixture cache stays in the source directory so that every sandbox
+        shares it.
+        """
+        env = dict(os.environ)
+        env.setdefault(
+            "SHTEST_FIXTURE_CACHE", os.path.join(self.source_dir, ".shtest_fixtures")
+        )
+        return env
+
+    def cleanup(self) -> None:
+        """Remove the sandbox synchronously."""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def cleanup_async(self) -> threading.Thread:
+        """Remove the sandbox in a background thread and return the thread.
+
+        The thread is a daemon so that exiting never blocks on a large delete;
+        join it to make sure the sandbox is gone.
+        """
+        thread = threading.Thread(
+            target=self.cleanup, name=f"cleanup-{self.path}", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def __enter__(self) -> "Sandbox":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.cleanup_async()
@@ -1,36 +1,104 @@
-import sys
 import os
+import sys
+from functools import lru_cache
+from typing import Dict, Tuple
 
-def resource_path(relative_path):
-    """Get absolute path to resource, works for dev and for PyInstaller (external data)."""
-    if getattr(sys, 'frozen', False):  # Running as compiled exe
-        base_path = os.path.dirname(sys.executable)
-        print(f"Running as compiled exe, base_path: {base_path}")
-    else:
-        base_path = os.path.dirname(os.path.dirname(__file__))
-    
-    full_path = os.path.join(base_path, relative_path)
-    print(f"resource_path: {relative_path} -> {full_path}")
-    
-    # Check if file exists and log the result
-    if os.path.exists(full_path):
-        print(f"✓ File exists: {full_path}")
-    else:
-        print(f"✗ File not found: {full_path}")
-        # List contents of the directory to help debug
+from shtest_compiler.utils.logger import trace, tracing
+
+# Top-level entries of a resource root that hold configuration and plugins.
+RESOURCE_DIRECTORIES = ("config", "plugins")
+RESOURCE_SUFFIXES = (".yml", ".yaml")
+
+
+@lru_cache(maxsize=1)
+def resource_roots() -> Tuple[str, ...]:
+    """Directories searched for resources, most specific first.
+
+    A PyInstaller executable reads its configuration next to the executable
+    (external data), then falls back to the files bundled in ``_MEIPASS``. From
+    a source checkout or an installed package, resources live in the
+    ``shtest_compiler`` package directory.
+    """
+    if getattr(sys, "frozen", False):
+        roots = [os.path.dirname(sys.executable)]
+        bundle = getattr(sys, "_MEIPASS", None)
+        if bundle and bundle not in roots:
+            roots.append(bundle)
+        return tuple(roots)
+    return (os.path.dirname(os.path.dirname(os.path.abspath(__file__))),)
+
+
+def _manifest_key(relative_path: str) -> str:
+    return os.path.normpath(relative_path).replace(os.sep, "/")
+
+
+@lru_cache(maxsize=1)
+def resource_manifest() -> Dict[str, str]:
+    """Configuration and plugin files, by path relative to their root.
+
+    Built once per process: the top-level YAML files of each root and
+    everything under ``config/`` and ``plugins/``. When a resource exists in
+    several roots, the first root wins.
+    """
+    manifest: Dict[str, str] = {}
+    for root in reversed(resource_roots()):
         try:
-            dir_path = os.path.dirname(full_path)
-            if os.path.exists(dir_path):
-                print(f"Contents of {dir_path}:")
-                for item in os.listdir(dir_path):
-                    print(f"  - {item}")
-            else:
-                print(f"Directory does not exist: {dir_path}")
-        except Exception as e:
-            print(f"Error listing directory: {e}")
-    
+            names = os.listdir(root)
+        except OSError:
+            continue
+        for name in names:
+            if name.endswith(RESOURCE_SUFFIXES):
+                manifest[name] = os.path.join(root, name)
+        for directory in RESOURCE_DIRECTORIES:
+            top = os.path.join(root, directory)
+            for dirpath, dirnames, filenames in os.walk(top):
+                dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+                manifest[_manifest_key(os.path.relpath(dirpath, root))] = dirpath
+                for fname in filenames:
+                    full_path = os.path.join(dirpath, fname)
+                    manifest[_manifest_key(os.path.relpath(full_path, root))] = full_path
+    return manifest
+
+
+@lru_cache(maxsize=None)
+def _resolve(relative_path: str) -> Tuple[str, bool]:
+    if os.path.isabs(relative_path):
+        return relative_path, True
+    found = resource_manifest().get(_manifest_key(relative_path))
+    if found is not None:
+        return found, True
+    return os.path.join(resource_roots()[0], relative_path), False
+
+
+def resource_path(relative_path):
+    """Get absolute path to resource, works for dev, installed package and PyInstaller.
+
+    Lookups go through the cached manifest and touch the file system only the
+    first time. Resolutions, and resources found in no root, are reported in
+    the ``resources`` trace category.
+    """
+    full_path, found = _resolve(relative_path)
+    if tracing.resources:
+        if found:
+            trace("resources", "resource_path", "%s -> %s", relative_path, full_path)
+        else:
+            trace(
+                "resources",
+                "resource_path",
+                "%s not found (searched %s)",
+                relative_path,
+                ", ".join(resource_roots()),
+            )
     return full_path
 
+
+def clear_resource_cache():
+    """Forget the manifest, e.g. after installing a plugin at runtime."""
+    _resolve.cache_clear()
+    resource_manifest.cache_clear()
+    resource_roots.cache_clear()
+
+
 def list_meipass():
     """Display the contents of the PyInstaller temporary directory (_MEIPASS)"""
     if not hasattr(sys, '_MEIPASS'):
@@ -1,6 +1,32 @@
+"""
+Syntax verification of .shtest files.
+
+``verify_paths`` checks files, directories (searched recursively) and glob
+patterns across a process pool, and returns every problem found with its
+file, line and column: syntax errors, validation phrases that cannot be
+compiled, and (as warnings) action phrases that will run as raw commands::
+
+    shtest verify tests/ "other/**/*.shtest" --jobs 8 --format json
+
+Each worker builds its parser once and keeps it for all the files it checks.
+"""
+
 import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
 
 from shtest_compiler.parser.configurable_parser import ConfigurableParser
+from shtest_compiler.parser.core import Diagnostic
+from shtest_compiler.pipeline import file_diagnostics, shtest_files
+from shtest_compiler.utils.logger import set_debug, set_quiet
+
+FORMATS = ("text", "json")
+
+# Parser of the current process, built on first use
+_parser: Optional[ConfigurableParser] = None
 
 
 def check_file(file_path: str, debug: bool = False) -> bool:
@@ -21,26 +47,106 @@ def check_file(file_path: str, debug: bool = False) -> bool:
         raise
 
 
-def main():
+def verify_file(path: str) -> List[Diagnostic]:
+    """The errors and warnings of the file *path*, empty when it is valid."""
+    global _parser
+    if _parser is None:
+        _parser = ConfigurableParser()
+    try:
+        return _parser.parse_file(path).diagnostics
+    except Exception as e:
+        return file_diagnostics(path, e)
+
+
+def _init_worker(debug: bool) -> None:
+    set_debug(debug)
+    set_quiet(not debug)
+
+
+def verify_paths(
+    paths: Sequence[str], jobs: Optional[int] = None, debug: bool = False
+) -> List[Tuple[str, List[Diagnostic]]]:
+    """Check every .shtest file named by *paths* (files, directories or globs).
+
+    Files are spread over *jobs* worker processes (all the CPUs by default;
+    1 checks them in this process). Returns ``(path, diagnostics)`` for each
+    file, in the order of *paths*.
+    """
+    files = shtest_files(paths)
+    jobs = min(jobs or os.cpu_count() or 1, len(files))
+    if jobs <= 1:
+        return [(path, verify_file(path)) for path in files]
+    # Large chunks keep the per-file cost close to the parse itself
+    chunksize = max(1, len(files) // (jobs * 4))
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(debug,)
+    ) as executor:
+        return list(zip(files, executor.map(verify_file, files, chunksize=chunksize)))
+
+
+def has_errors(diagnostics: Sequence[Diagnostic]) -> bool:
+    return any(diagnostic.is_error for diagnostic in diagnostics)
+
+
+def report(results: Sequence[Tuple[str, List[Diagnostic]]], fmt: str = "text") -> str:
+    """Text (one ``file:line:column: message`` line per problem) or JSON report."""
+    found = [diagnostic for _, diagnostics in results for diagnostic in diagnostics]
+    errors = [diagnostic for diagnostic in found if diagnostic.is_error]
+    warnings = [diagnostic for diagnostic in found if not diagnostic.is_error]
+    failed = sum(1 for _, diagnostics in results if has_errors(diagnostics))
+    if fmt == "json":
+        return json.dumps(
+            {
+                "files": len(results),
+                "failed": failed,
+                "errors": [diagnostic.as_dict() for diagnostic in errors],
+                "warnings": [diagnostic.as_dict() for diagnostic in warnings],
+            },
+            indent=2,
+            ensure_ascii=False,
+        )
+    lines = [str(diagnostic) for diagnostic in found]
+    if errors:
+        lines.append(
+            f"{len(errors)} erreur(s) dans {failed} fichier(s) sur {len(results)} vérifié(s)."
+        )
+    else:
+        lines.append(f"[✔] Syntaxe valide ({len(results)} fichier(s) vérifié(s)).")
+    if warnings:
+        lines.append(f"{len(warnings)} avertissement(s).")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None):
     parser = argparse.ArgumentParser(
-        description="Vérifie uniquement la syntaxe d'un fichier .shtest"
+        description="Vérifie uniquement la syntaxe de fichiers .shtest"
+    )
+    parser.add_argument(
+        "paths", nargs="+", help="Fichiers .shtest, dossiers ou motifs glob à vérifier"
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        metavar="N",
+        help="Nombre de processus (par défaut, un par processeur)",
+    )
+    parser.add_argument(
+        "--format", choices=FORMATS, default="text", help="Format du rapport"
     )
-    parser.add_argument("file", help="Fichier .shtest à vérifier")
     parser.add_argument(
         "--verbose", action="store_true", help="Afficher les détails du parsing"
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
-    try:
-        if check_file(args.file, debug=args.verbose):
-            print("[✔] Syntaxe valide.")
-        else:
-            print("[ERROR] Erreur de syntaxe.")
-            exit(1)
-    except Exception as e:
-        print(f"[ERROR] Erreur de syntaxe: {e}")
-        exit(1)
+    # Errors are reported below; the logger would print each one again
+    set_debug(args.verbose)
+    set_quiet(not args.verbose)
+    results = verify_paths(args.paths, jobs=args.jobs, debug=args.verbose)
+    print(report(results, args.format))
+    if any(has_errors(diagnostics) for _, diagnostics in results):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
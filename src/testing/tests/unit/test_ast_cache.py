@@ -0,0 +1,85 @@
+from shtest_compiler.compiler.compiler import ModularCompiler
+from shtest_compiler.parser import ast_cache
+from shtest_compiler.parser.ast_cache import AstCache, dump_ast, load_ast
+from shtest_compiler.parser.configurable_parser import ConfigurableParser
+
+SOURCE = (
+    "Étape: Préparation\n"
+    "Action: Créer le dossier /tmp/a ; Résultat: retour 0 et stdout contient ok\n"
+    "Action: créer le contexte ; Résultat: retour 0\n"
+)
+
+
+def _source(tmp_path, name="a.shtest"):
+    path = tmp_path / name
+    path.write_text(SOURCE, encoding="utf-8")
+    return str(path)
+
+
+def test_serialized_ast_round_trips():
+    ast = ConfigurableParser().parse(SOURCE, path="a.shtest")
+    assert ast.diagnostics  # The unknown action phrase warning
+    assert load_ast(dump_ast(ast), "a.shtest") == ast
+
+
+def test_unchanged_files_are_loaded_instead_of_parsed(tmp_path):
+    cache = AstCache(str(tmp_path / "cache"))
+    path = _source(tmp_path)
+    parsed = ConfigurableParser(cache=cache).parse_file(path)
+
+    parser = ConfigurableParser(cache=cache)
+    parser.parse = None  # A hit never parses
+    copy = _source(tmp_path, "copy.shtest")
+    loaded = parser.parse_file(copy)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert loaded.path == copy
+    assert loaded.steps == parsed.steps
+    assert [d.path for d in loaded.diagnostics] == [copy]
+
+
+def test_a_miss_resolves_no_phrase(tmp_path, monkeypatch):
+    from shtest_compiler.compiler import action_utils
+
+    resolved = []
+    real = action_utils.canonize_action
+    monkeypatch.setattr(
+        action_utils, "canonize_action", lambda phrase: resolved.append(phrase) or real(phrase)
+    )
+    parser = ConfigurableParser(cache=AstCache(str(tmp_path / "cache")))
+    parser.parse_file(_source(tmp_path))
+    uncached = len(resolved)
+    resolved.clear()
+    ConfigurableParser().parse_file(_source(tmp_path))
+    # Storing the entry costs no pattern matching beyond the parse itself
+    assert uncached == len(resolved)
+
+
+def test_changes_to_the_package_invalidate_entries(tmp_path, monkeypatch):
+    cache = AstCache(str(tmp_path / "cache"))
+    parser = ConfigurableParser(cache=cache)
+    parser.parse_file(_source(tmp_path))
+    monkeypatch.setattr(ast_cache, "source_fingerprint", lambda: "edited patterns")
+    cache.refresh()
+    parser.parse_file(_source(tmp_path))
+    parser.parse_file(_source(tmp_path))
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_unreadable_entries_are_parsed_again(tmp_path):
+    cache = AstCache(str(tmp_path / "cache"))
+    parser = ConfigurableParser(cache=cache)
+    parser.parse_file(_source(tmp_path))
+    [entry] = (tmp_path / "cache").rglob("*.ast")
+    entry.write_bytes(b"not zlib")
+    assert parser.parse_file(_source(tmp_path)).steps
+    assert cache.misses == 2
+
+
+def test_compiler_uses_the_cache_named_by_the_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv(ast_cache.CACHE_VARIABLE, str(tmp_path / "cache"))
+    path = _source(tmp_path)
+    for _ in range(2):
+        compiler = ModularCompiler()
+        compiler.compile_file(path, str(tmp_path / "a.sh"), debug_output_path=str(tmp_path / "a.txt"))
+    assert compiler.parser.cache.hits == 1
+    assert "mkdir" in (tmp_path / "a.sh").read_text(encoding="utf-8")
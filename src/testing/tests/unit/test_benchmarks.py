@@ -0,0 +1,53 @@
+import json
+
+from benchmarks.compare import compare_results, main as compare_main
+from benchmarks.corpus import ACTIONS, generate_corpus
+from benchmarks.run import STAGES, run_benchmark
+
+
+def test_corpus_is_reproducible(tmp_path):
+    first = generate_corpus(tmp_path / "a", files=2, steps=3, actions=3, seed=7)
+    second = generate_corpus(tmp_path / "b", files=2, steps=3, actions=3, seed=7)
+    assert [p.name for p in first] == ["test_0001.shtest", "test_0002.shtest"]
+    for left, right in zip(first, second):
+        a = left.read_text(encoding="utf-8").replace(str(tmp_path / "a"), "ROOT")
+        b = right.read_text(encoding="utf-8").replace(str(tmp_path / "b"), "ROOT")
+        assert a == b
+    assert (tmp_path / "a" / "data" / "rows.csv").exists()
+
+
+def test_corpus_mixes_aliases_and_compound_validations(tmp_path):
+    (path,) = generate_corpus(tmp_path, files=1, steps=2, actions=len(ACTIONS))
+    text = path.read_text(encoding="utf-8")
+    assert text.count("Étape:") == 2
+    assert text.count("Action:") == 2 * (2 + len(ACTIONS))
+    assert "créer un dossier" in text
+    assert " ou " in text and " et " in text
+    assert "somme de contrôle sha256" in text
+
+
+def test_benchmark_times_every_stage_and_runs_the_scripts(tmp_path):
+    sources = generate_corpus(tmp_path, files=1, steps=1, actions=0)
+    results = run_benchmark(sources, repeat=1, runtime=True)
+    assert set(results["best"]) == set(STAGES)
+    (run,) = results["runs"]
+    assert run["runtime_failures"] == []
+    assert run["files"][0]["file"] == "test_0001.shtest"
+    assert run["stages"]["runtime"] > 0
+    json.dumps(results)
+
+
+def test_compare_flags_regressions_above_the_threshold(tmp_path, capsys):
+    base = {"best": {"lex": 0.010, "bind": 0.0001, "framework": 0.0}}
+    head = {"best": {"lex": 0.013, "bind": 0.0005, "framework": 0.0}}
+    rows = {row[0]: row for row in compare_results(base, head, threshold=10)}
+    assert rows["lex"][4] and round(rows["lex"][3]) == 30
+    assert not rows["bind"][4]  # below the noise floor
+    assert rows["framework"][3] is None
+
+    (tmp_path / "base.json").write_text(json.dumps(base))
+    (tmp_path / "head.json").write_text(json.dumps(head))
+    args = [str(tmp_path / "base.json"), str(tmp_path / "head.json")]
+    assert compare_main(args) == 1
+    assert "lex" in capsys.readouterr().out.splitlines()[-1]
+    assert compare_main(args + ["--threshold", "50"]) == 0
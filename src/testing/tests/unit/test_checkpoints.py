@@ -0,0 +1,91 @@
+import shutil
+import subprocess
+
+import pytest
+
+from shtest_compiler.ast.shell_framework_ast import (
+    InlineShellCode,
+    ShellFrameworkAST,
+    ShellTestStep,
+)
+from shtest_compiler.ast.shellframework_to_shellscript_visitor import (
+    ShellFrameworkToShellScriptVisitor,
+)
+from shtest_compiler.compiler.compiler import ModularCompiler
+from shtest_compiler.compiler.failure_policy import CONTINUE_STEP
+
+
+def _build_ast():
+    steps = [
+        ShellTestStep(
+            name=name,
+            actions=[InlineShellCode(code_lines=[f'run_action "echo {name}"'])],
+            validations=[],
+        )
+        for name in ("Préparation", "L'exécution")
+    ]
+    return ShellFrameworkAST(helpers=[], steps=steps, global_code=["#!/bin/bash"])
+
+
+def test_checkpoints_disabled_by_default():
+    lines = ShellFrameworkToShellScriptVisitor().visit(_build_ast()).lines
+    assert not any("should_run_step" in line for line in lines)
+    assert 'run_action "echo Préparation"' in lines
+
+
+def test_steps_are_guarded_and_numbered():
+    visitor = ShellFrameworkToShellScriptVisitor(checkpoints=True)
+    lines = visitor.visit(_build_ast()).lines
+    assert "if should_run_step 1; then" in lines
+    assert "if should_run_step 2; then" in lines
+    assert '    run_action "echo Préparation"' in lines
+    assert "    checkpoint_step 2 'L'\\''exécution'" in lines
+    # The option parsing comes before the first step
+    assert lines.index("while [ $# -gt 0 ]; do") < lines.index(
+        "if should_run_step 1; then"
+    )
+
+
+def test_checkpoint_is_written_before_end_of_step():
+    visitor = ShellFrameworkToShellScriptVisitor(
+        failure_policy=CONTINUE_STEP, checkpoints=True
+    )
+    lines = visitor.visit(_build_ast()).lines
+    start = lines.index("if should_run_step 1; then")
+    step_lines = lines[start : lines.index("fi", start) + 1]
+    assert step_lines[1] == "    SHTEST_STEP='Préparation'"
+    assert step_lines[-3:] == [
+        "    checkpoint_step 1 'Préparation'",
+        "    end_step",
+        "fi",
+    ]
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash is not available")
+def test_resumed_run_keeps_its_own_run_variables(tmp_path):
+    source = tmp_path / "resume.shtest"
+    source.write_text(
+        "Étape: Un\n"
+        "Action: Définir la variable MY_VAR = one ; Résultat: retour 0\n"
+        "Étape: Deux\n"
+        'Action: echo "$MY_VAR" ; Résultat: stdout contient one\n'
+        'Action: test -d "$(dirname "$SHTEST_HASH_CACHE")" ; Résultat: retour 0\n',
+        encoding="utf-8",
+    )
+    script = ModularCompiler(checkpoints=True).compile_file(
+        str(source), str(tmp_path / "resume.sh")
+    )
+
+    def run(*args):
+        return subprocess.run(
+            ["bash", script, *args], cwd=tmp_path, text=True, capture_output=True
+        )
+
+    assert run().returncode == 0
+    saved = (tmp_path / ".shtest_checkpoints" / "resume" / "step_1.env").read_text()
+    # Only what the test defined: not the run's scratch area, nor PATH
+    assert saved.splitlines() == ['declare -x MY_VAR="one"']
+    resumed = run("--from-step", "2")
+    assert resumed.returncode == 0, resumed.stdout + resumed.stderr
+    assert "Resuming after step 1" in resumed.stdout
+    assert "OK: stdout contient one" in resumed.stdout
@@ -0,0 +1,70 @@
+import bz2
+import gzip
+import lzma
+import shutil
+import subprocess
+
+import pytest
+
+from shtest_compiler.ast.shtest_to_shellframework_visitor import (
+    ShtestToShellFrameworkVisitor,
+)
+from shtest_compiler.compiler.compressed_files import read_command, reader_prologue
+from shtest_compiler.core.handlers import (
+    file_contains,
+    file_contains_exact,
+    file_line_count,
+)
+from shtest_compiler.parser.shtest_ast import ShtestFile
+
+CONTENT = b"start\nERROR boom\nend\n"
+
+
+def _read(path):
+    script = "\n".join(reader_prologue() + [read_command(str(path))])
+    return subprocess.run(["bash"], input=script.encode(), capture_output=True)
+
+
+def test_content_validations_read_through_the_decompressor():
+    contains = file_contains.handle({"file": "app.log.gz", "text": "boom"})
+    assert contains.actual_cmd == "shtest_read 'app.log.gz' | grep -q 'boom'"
+    exact = file_contains_exact.handle({"file": "app.log.gz", "text": "ok"})
+    assert exact.actual_cmd == '[ "$(shtest_read \'app.log.gz\')" = "ok" ]'
+    count = file_line_count.handle({"file": "app.log.gz", "count": "3"})
+    assert count.actual_cmd == (
+        "test -f 'app.log.gz' && [ \"$(shtest_read 'app.log.gz' | wc -l)\" -eq 3 ]"
+    )
+    assert count.params["opposite"] == "le fichier app.log.gz ne contient pas 3 lignes"
+
+
+def test_generated_scripts_define_the_reader():
+    global_code = ShtestToShellFrameworkVisitor().visit(ShtestFile(steps=[])).global_code
+    assert "shtest_read() {" in global_code
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash is not available")
+@pytest.mark.parametrize(
+    "name, compress, tool",
+    [
+        ("app.log", lambda data: data, "cat"),
+        ("app.log.1.gz", gzip.compress, "gzip"),
+        ("rotated.log", gzip.compress, "gzip"),  # detected by content
+        ("app.log.bz2", bz2.compress, "bzip2"),
+        ("app.log.xz", lzma.compress, "xz"),
+    ],
+)
+def test_reader_streams_compressed_files(tmp_path, name, compress, tool):
+    if shutil.which(tool) is None:
+        pytest.skip(f"{tool} is not available")
+    path = tmp_path / name
+    path.write_bytes(compress(CONTENT))
+    result = _read(path)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == CONTENT
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash is not available")
+def test_reader_fails_on_missing_files(tmp_path):
+    result = _read(tmp_path / "missing.log")
+    assert result.returncode != 0
+    assert result.stdout == b""
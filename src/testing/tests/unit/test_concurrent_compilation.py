@@ -0,0 +1,76 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from shtest_compiler.compiler.compiler import ModularCompiler
+from shtest_compiler.compiler.matcher_registry import MatcherRegistry
+from shtest_compiler.compiler.profiling import CompileProfile, profiling
+from shtest_compiler.utils import logger
+
+
+def _write_tests(tmp_path, count):
+    sources = []
+    for i in range(count):
+        path = tmp_path / f"t{i}.shtest"
+        directory = tmp_path / f"d{i}"
+        path.write_text(
+            "Étape: Préparation\n"
+            f"Action: Créer le dossier {directory} ; Résultat: le dossier {directory} existe\n",
+            encoding="utf-8",
+        )
+        sources.append(str(path))
+    return sources
+
+
+def test_one_compiler_compiles_files_from_a_thread_pool(tmp_path):
+    sources = _write_tests(tmp_path, 8)
+    logger.set_debug(True, ["handler"])
+    logger.set_quiet(True)
+    try:
+        compiler = ModularCompiler()
+
+        def compile_one(job):
+            source, name = job
+            script = str(tmp_path / f"{name}.sh")
+            log = str(tmp_path / f"{name}.txt")
+            compiler.compile_file(source, script, debug_output_path=log)
+            with open(script, encoding="utf-8") as f, open(log, encoding="utf-8") as g:
+                return f.read(), g.read()
+
+        serial = [compile_one((source, f"serial{i}")) for i, source in enumerate(sources)]
+        jobs = [(source, f"parallel{i}") for i, source in enumerate(sources * 4)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            parallel = list(pool.map(compile_one, jobs))
+    finally:
+        logger.reset_logger()
+    assert [script for script, _ in parallel] == [script for script, _ in serial] * 4
+    for (source, _), (_, log) in zip(jobs, parallel):
+        # Each exported log only holds the records of its own compilation
+        assert [other for other in sources if other in log] == [source]
+
+
+def test_a_profile_only_records_its_own_thread(tmp_path):
+    [source] = _write_tests(tmp_path, 1)
+    profile = CompileProfile()
+    with profiling(profile):
+        thread = threading.Thread(
+            target=ModularCompiler().compile_file, args=(source, str(tmp_path / "t0.sh"))
+        )
+        thread.start()
+        thread.join()
+    assert (tmp_path / "t0.sh").exists()
+    assert profile.stages == {} and profile.handlers == {}
+
+
+def test_registering_a_matcher_leaves_running_compilations_unchanged():
+    class Late:
+        name = "late"
+
+        def match(self, expected, *args):
+            return expected
+
+    registry = MatcherRegistry()
+    running = registry.matchers
+    registry.register(Late())
+    assert registry.list() == ["late"]
+    assert running == {}
+    assert registry.run_matcher("ok") == "ok"
@@ -0,0 +1,79 @@
+import pytest
+
+from shtest_compiler.ast.shell_framework_ast import (
+    InlineShellCode,
+    ShellFrameworkAST,
+    ShellTestStep,
+    ValidationCheck,
+)
+from shtest_compiler.ast.shellframework_to_shellscript_visitor import (
+    ShellFrameworkToShellScriptVisitor,
+)
+from shtest_compiler.compiler.failure_policy import (
+    CONTINUE_ALL,
+    CONTINUE_STEP,
+    FAIL_FAST,
+    check_failure_policy,
+)
+from shtest_compiler.parser.shunting_yard import Atomic, BinaryOp
+
+
+def _build_ast():
+    check = ValidationCheck(
+        expected="stdout contient ok",
+        actual_cmd='echo "$stdout" | grep -q "ok"',
+        handler="stdout_contains",
+        scope="last_action",
+        params={"opposite": "stdout ne contient pas ok"},
+    )
+    step = ShellTestStep(
+        name="Étape d'essai",
+        actions=[InlineShellCode(code_lines=['run_action "echo ok"', check])],
+        validations=[],
+    )
+    return ShellFrameworkAST(helpers=[], steps=[step], global_code=["#!/bin/bash"])
+
+
+def test_check_failure_policy_normalizes():
+    assert check_failure_policy(None) == FAIL_FAST
+    assert check_failure_policy("Continue_All") == CONTINUE_ALL
+
+
+def test_check_failure_policy_rejects_unknown():
+    with pytest.raises(ValueError, match="Unknown failure policy"):
+        check_failure_policy("retry")
+
+
+def test_fail_fast_keeps_exit_on_failure():
+    lines = ShellFrameworkToShellScriptVisitor().visit(_build_ast()).lines
+    assert "    exit 1" in lines
+    assert not any("record_failure" in line for line in lines)
+
+
+def test_continue_all_records_and_reports_at_end():
+    visitor = ShellFrameworkToShellScriptVisitor(failure_policy=CONTINUE_ALL)
+    lines = visitor.visit(_build_ast()).lines
+    assert "    record_failure 'stdout ne contient pas ok'" in lines
+    assert "SHTEST_STEP='Étape d'\\''essai'" in lines
+    assert "end_step" not in lines
+    assert lines.index("report_failures") < lines.index(
+        "echo 'All steps and validations passed.'"
+    )
+
+
+def test_continue_step_stops_at_end_of_step():
+    visitor = ShellFrameworkToShellScriptVisitor(failure_policy=CONTINUE_STEP)
+    lines = visitor.visit(_build_ast()).lines
+    assert "end_step" in lines
+    assert "    exit 1" not in lines
+
+
+def test_compound_operands_do_not_record_failures():
+    visitor = ShellFrameworkToShellScriptVisitor(failure_policy=CONTINUE_ALL)
+    node = BinaryOp(
+        op="ou", left=Atomic("stdout contient ok"), right=Atomic("stderr contient ko")
+    )
+    lines = visitor.visit(node)
+    recorded = [line for line in lines if "record_failure" in line]
+    assert recorded == ["    record_failure 'Compound validation (ou)'"]
+    assert lines.count("    false") == 2
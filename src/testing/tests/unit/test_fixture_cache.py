@@ -0,0 +1,104 @@
+import shutil
+import subprocess
+
+import pytest
+
+from shtest_compiler.ast.shell_framework_ast import (
+    InlineShellCode,
+    ShellFrameworkAST,
+    ShellTestStep,
+)
+from shtest_compiler.ast.shellframework_to_shellscript_visitor import (
+    ShellFrameworkToShellScriptVisitor,
+)
+from shtest_compiler.compiler.compiler import ModularCompiler
+from shtest_compiler.compiler.fixture_cache import detect_fixture
+
+SETUP = [
+    "Créer le dossier ./work/in",
+    "Copier le fichier ./data/a.csv vers ./work/in/a.csv",
+]
+
+
+def test_file_setup_step_is_a_fixture():
+    fixture = detect_fixture(SETUP)
+    assert fixture is not None
+    assert fixture.targets == ["./work/in", "./work/in/a.csv"]
+    assert fixture.sources == ["./data/a.csv"]
+
+
+def test_identical_setup_steps_share_the_same_key():
+    aliased = ["créer un dossier ./work/in", SETUP[1]]
+    assert detect_fixture(aliased).key == detect_fixture(SETUP).key
+    assert detect_fixture(SETUP[:1]).key != detect_fixture(SETUP).key
+
+
+def test_steps_with_other_actions_are_not_fixtures():
+    assert detect_fixture(SETUP + ["echo ok"]) is None
+    assert detect_fixture(SETUP + ["exécuter le script SQL init.sql"]) is None
+    assert detect_fixture([]) is None
+
+
+def test_fixture_step_is_wrapped_with_restore_and_save():
+    step = ShellTestStep(
+        name="Préparation",
+        actions=[InlineShellCode(code_lines=['run_action "mkdir -p ./work/in"'])],
+        validations=[],
+        fixture=detect_fixture(SETUP),
+    )
+    ast = ShellFrameworkAST(helpers=[], steps=[step], global_code=["#!/bin/bash"])
+    lines = ShellFrameworkToShellScriptVisitor().visit(ast).lines
+    assert 'mkdir -p "$SHTEST_FIXTURE_CACHE"' in lines
+    restore = lines.index(
+        f"if fixture_restore '{step.fixture.key}' './data/a.csv'; then"
+    )
+    # The step always runs: restored actions are skipped by run_action
+    assert lines[restore + 4] == 'run_action "mkdir -p ./work/in"'
+    assert lines[restore + 8] == (
+        "    fixture_save --no-recursion './work/in' './work/in/a.csv'"
+    )
+
+
+def test_copied_trees_are_archived_with_their_content():
+    fixture = detect_fixture(["Copier le dossier ./data vers ./work/data"])
+    assert fixture.trees == ["./work/data"]
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash is not available")
+def test_restored_fixture_is_validated_and_holds_only_created_paths(tmp_path):
+    (tmp_path / "work").mkdir()
+    (tmp_path / "work" / "old.txt").write_text("not created by the step")
+    source = tmp_path / "fixture.shtest"
+    source.write_text(
+        "Étape: Préparation\n"
+        "Action: Créer le dossier work ; Résultat: le dossier work existe\n"
+        "Action: Créer le fichier work/a.txt ; Résultat: le fichier work/a.txt existe\n",
+        encoding="utf-8",
+    )
+    script = ModularCompiler(fixture_cache=True).compile_file(
+        str(source), str(tmp_path / "fixture.sh")
+    )
+
+    def run():
+        shutil.rmtree(tmp_path / "work", ignore_errors=True)
+        return subprocess.run(["bash", script], cwd=tmp_path, text=True, capture_output=True)
+
+    subprocess.run(["bash", script], cwd=tmp_path, check=True, capture_output=True)
+    [archive] = (tmp_path / ".shtest_fixtures").glob("*.tar")
+    listing = subprocess.run(
+        ["tar", "-tPf", str(archive)], text=True, capture_output=True, check=True
+    ).stdout.split()
+    assert listing == ["work/", "work/a.txt"]
+
+    restored = run()
+    assert "Fixture restored from cache: Préparation" in restored.stdout
+    assert "OK: le fichier work/a.txt existe" in restored.stdout
+
+    # A broken snapshot no longer passes: the validations run after a restore
+    shutil.rmtree(tmp_path / "work")
+    (tmp_path / "work").mkdir()
+    subprocess.run(
+        ["tar", "-cPf", str(archive), "--no-recursion", "work"], cwd=tmp_path, check=True
+    )
+    broken = run()
+    assert "FAIL: le fichier work/a.txt n'existe pas" in broken.stdout
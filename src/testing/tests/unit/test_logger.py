@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from shtest_compiler.utils import logger
+from shtest_compiler.utils.logger import LogStore
+
+
+def test_store_spills_old_records_and_keeps_their_order():
+    store = LogStore(max_records=3)
+    for i in range(10):
+        store.append("ACTION", "step %d of %s", (i, "ten"))
+    assert len(store) == 10
+    assert len(store._records) == 3
+    assert [message for _, _, message in store] == [f"step {i} of ten" for i in range(10)]
+    spill = store._spill_path
+    store.close()
+    assert not os.path.exists(spill)
+
+
+def test_scalar_arguments_are_formatted_lazily():
+    store = LogStore()
+    store.append("DEBUG", "line %d: %s", (3, "token"))
+    store.append("DEBUG", "100% literal")
+    assert list(store._records)[0][2:] == ("line %d: %s", (3, "token"))
+    assert [message for _, _, message in store] == ["line 3: token", "100% literal"]
+
+
+def test_other_arguments_are_frozen_when_logged():
+    params = {"file": "a.txt"}
+    store = LogStore()
+    store.append("DEBUG", "params %s", (params,))
+    params["file"] = "b.txt"
+    # The record holds the text, not the object
+    assert list(store._records)[0][2:] == ("params {'file': 'a.txt'}", ())
+    assert [message for _, _, message in store] == ["params {'file': 'a.txt'}"]
+
+
+def test_export_only_writes_the_current_scope(tmp_path):
+    path = tmp_path / "debug.txt"
+    logger.start_log_scope(max_records=2)
+    for i in range(5):
+        logger.log_action("first file %s", i)
+    logger.export_log(str(path))
+    lines = path.read_text().splitlines()
+    assert len(lines) == 5
+    assert lines[0].endswith("[ACTION] first file 0")
+
+    logger.start_log_scope()
+    logger.log_warning("second file")
+    logger.export_log(str(path), include_levels=["WARNING"])
+    lines = path.read_text().splitlines()
+    assert len(lines) == 1
+    assert f"shtest_compiler[{os.getpid()}]: [WARNING] second file" in lines[0]
+    logger.reset_logger()
+
+
+def test_trace_points_follow_the_enabled_categories(tmp_path):
+    path = tmp_path / "trace.txt"
+    logger.set_debug(True, ["lexer"])
+    try:
+        assert logger.tracing.enabled() == ["lexer"]
+        logger.trace("lexer", "tokenize", "line %d", 3)
+        logger.trace("registry", "canonize_action", "skipped")
+        logger.export_log(str(path))
+    finally:
+        logger.set_debug(False)
+    assert path.read_text().splitlines()[-1].endswith("[DEBUG] [lexer] tokenize: line 3")
+    assert "registry" not in path.read_text()
+    assert logger.tracing.enabled() == []
+
+
+def test_debug_enables_every_category_and_rejects_unknown_ones():
+    logger.set_debug(True)
+    try:
+        assert logger.tracing.enabled() == list(logger.TRACE_CATEGORIES)
+        with pytest.raises(ValueError, match="bogus"):
+            logger.set_trace_categories(["lexer", "bogus"])
+    finally:
+        logger.reset_logger()
+    assert not logger.tracing.lexer
@@ -0,0 +1,51 @@
+import pytest
+
+from shtest_compiler.compiler.compiler import ModularCompiler
+from shtest_compiler.compiler.phrase_checks import action_problems, validation_problems
+from shtest_compiler.parser.configurable_parser import ConfigurableParser
+from shtest_compiler.parser.core import ParseError
+
+BROKEN = (
+    "Étape: Préparation\n"
+    "Action: Créer le dossier /tmp/a ; Résultat: le dossier est prêt\n"
+    "Action: créer le contexte ; Résultat: retour 0\n"
+    "Vérifier: Le fichier existe\n"
+    "Action: echo ok ; Résultat: retour 0 ou truc inconnu\n"
+)
+
+
+def test_actions_that_will_run_as_raw_commands_are_flagged():
+    assert action_problems("Créer le dossier /tmp/a") == []
+    assert action_problems("mkdir /tmp/a") == []
+    assert action_problems("créer le contexte") == [
+        "Unknown action phrase: 'créer le contexte'"
+    ]
+
+
+def test_compound_validations_report_their_failing_atoms():
+    assert validation_problems("retour 0 et stdout contient ok") == []
+    # The whole phrase matches, although its atoms do not
+    assert validation_problems("les fichiers a.txt et b.txt contiennent les mêmes lignes") == []
+    [(phrase, problem)] = validation_problems("retour 0 ou truc inconnu")
+    assert phrase == "truc inconnu"
+    assert problem == "No matcher found for validation: 'truc inconnu'"
+
+
+def test_every_problem_of_a_file_is_found_in_one_parse():
+    ast = ConfigurableParser().parse(BROKEN, path="broken.shtest")
+    found = [(d.lineno, d.column, d.severity) for d in ast.diagnostics]
+    assert found == [
+        (2, 45, "error"),
+        (3, 9, "warning"),
+        (4, 1, "error"),
+        (5, 41, "error"),
+    ]
+    assert all(d.path == "broken.shtest" for d in ast.diagnostics)
+
+
+def test_compiler_reports_all_errors_instead_of_the_first(tmp_path):
+    source = tmp_path / "broken.shtest"
+    source.write_text(BROKEN, encoding="utf-8")
+    with pytest.raises(ParseError) as raised:
+        ModularCompiler().compile_file(str(source), str(tmp_path / "broken.sh"))
+    assert [d.lineno for d in raised.value.diagnostics] == [2, 4, 5]
@@ -0,0 +1,64 @@
+from shtest_compiler.compiler.compiler import ModularCompiler
+from shtest_compiler.pipeline import generate_scripts, parse_files, run_pipeline, shtest_files
+
+
+def _write_test(path, directory):
+    path.write_text(
+        "Étape: Préparation\n"
+        f"Action: Créer le dossier {directory} ; Résultat: le dossier {directory} existe\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+def _corpus(tmp_path):
+    tests = tmp_path / "tests"
+    (tests / "sub").mkdir(parents=True)
+    _write_test(tests / "a.shtest", tmp_path / "a")
+    _write_test(tests / "sub" / "b.shtest", tmp_path / "b")
+    (tests / "broken.shtest").write_text("   \n", encoding="utf-8")
+    return tests
+
+
+def test_shtest_files_walks_directories_in_order(tmp_path):
+    tests = _corpus(tmp_path)
+    (tests / "notes.txt").write_text("ignored")
+    files = shtest_files([str(tests), "single.shtest"])
+    assert [f.rsplit("/", 1)[-1] for f in files] == [
+        "a.shtest",
+        "broken.shtest",
+        "b.shtest",
+        "single.shtest",
+    ]
+
+
+def test_every_file_is_parsed_once_and_errors_are_collected(tmp_path):
+    tests = _corpus(tmp_path)
+    compiler = ModularCompiler()
+    parsed = []
+    parse_file = compiler.parser.parse_file
+
+    def counting_parse_file(path):
+        parsed.append(path)
+        return parse_file(path)
+
+    compiler.parser.parse_file = counting_parse_file
+    results = parse_files(shtest_files([str(tests)]), compiler.parser)
+    generate_scripts(results, compiler, str(tmp_path / "out"), str(tests))
+
+    assert sorted(parsed) == sorted(result.path for result in results)
+    by_name = {result.path.rsplit("/", 1)[-1]: result for result in results}
+    assert not by_name["broken.shtest"].ok
+    assert by_name["broken.shtest"].ast is None
+    assert by_name["broken.shtest"].output_path is None
+    assert by_name["a.shtest"].ok and by_name["b.shtest"].ok
+    assert (tmp_path / "out" / "a.sh").exists()
+    assert (tmp_path / "out" / "sub" / "b.sh").exists()
+
+
+def test_run_pipeline_without_output_only_parses(tmp_path):
+    tests = _corpus(tmp_path)
+    results = run_pipeline([str(tests)])
+    assert len(results) == 3
+    assert all(result.output_path is None for result in results)
+    assert [result.ast is not None for result in results] == [True, False, True]
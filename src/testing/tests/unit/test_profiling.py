@@ -0,0 +1,72 @@
+import pstats
+import tracemalloc
+
+from shtest_compiler.compile_file import compile_file
+from shtest_compiler.compiler import profiling
+from shtest_compiler.compiler.profiling import (
+    STAGES,
+    CompileProfile,
+    call_handler,
+    profile_files,
+    stage,
+)
+
+
+def _write_test(path, directory):
+    path.write_text(
+        "Étape: Préparation\n"
+        f"Action: Créer le dossier {directory} ; Résultat: le dossier {directory} existe\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+def test_nothing_is_recorded_without_an_active_profile():
+    assert profiling.active_profile() is None
+    with stage("lex"):
+        pass
+    assert call_handler("noop", lambda params: params["x"], {"x": 3}) == 3
+
+
+def test_compile_records_every_stage_handler_and_lookup(tmp_path):
+    source = _write_test(tmp_path / "a.shtest", tmp_path / "d")
+    profile = CompileProfile()
+    with profiling.profiling(profile):
+        compile_file(str(source), str(tmp_path / "a.sh"))
+    assert profiling.active_profile() is None
+    assert set(profile.stages) == set(STAGES)
+    assert all(profile.stages[name].calls == 1 for name in STAGES)
+    assert profile.handlers["create_dir"].calls >= 1
+    assert profile.handlers["dir_exists"].calls >= 1
+    assert profile.lookups["canonize_action"].calls >= 1
+    assert profile.stages["framework"].seconds >= profile.handlers["dir_exists"].seconds
+
+
+def test_profile_files_walks_directories_and_dumps_profiles(tmp_path):
+    tests = tmp_path / "tests"
+    (tests / "sub").mkdir(parents=True)
+    _write_test(tests / "a.shtest", tmp_path / "a")
+    _write_test(tests / "sub" / "b.shtest", tmp_path / "b")
+    (tests / "notes.txt").write_text("ignored")
+    out = tmp_path / "out"
+    out.mkdir()
+    profile = profile_files(
+        [str(tests), str(tmp_path / "missing.shtest")],
+        output_dir=str(out),
+        cprofile_path=str(tmp_path / "run.prof"),
+        tracemalloc_path=str(tmp_path / "run.snap"),
+    )
+    assert profile.files == 2
+    assert {"a.sh", "b.sh"} <= {p.name for p in out.iterdir()}
+    assert [path for path, _ in profile.errors] == [str(tmp_path / "missing.shtest")]
+    assert profile.allocations and profile.stages["framework"].allocated > 0
+    assert not tracemalloc.is_tracing()
+    stats = pstats.Stats(str(tmp_path / "run.prof"))
+    assert stats.total_calls > 0
+    assert tracemalloc.Snapshot.load(str(tmp_path / "run.snap")).traces
+
+    report = profile.report(top=2)
+    assert report.splitlines()[0] == "2 fichier(s) compilé(s)"
+    assert "alloc (Kio)" in report
+    assert sum(line.startswith("recherche") for line in report.splitlines()) == 1
+    assert profile.as_dict()["stages"]["emit"]["calls"] == 2
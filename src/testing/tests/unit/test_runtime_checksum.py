@@ -0,0 +1,89 @@
+import hashlib
+
+import pytest
+
+from shtest_compiler.core.handlers import file_checksum
+from shtest_compiler.runtime import checksum, files
+from shtest_compiler.runtime.checksum import HashCache, file_digest, main
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    path = tmp_path / "hashes"
+    monkeypatch.setenv(checksum.CACHE_VARIABLE, str(path))
+    return path
+
+
+def _count_reads(monkeypatch):
+    reads = []
+    original = checksum.new_hasher
+
+    def counting(algorithm="sha256"):
+        reads.append(algorithm)
+        return original(algorithm)
+
+    monkeypatch.setattr(checksum, "new_hasher", counting)
+    return reads
+
+
+def test_digest_matches_hashlib(tmp_path):
+    data = tmp_path / "data.bin"
+    data.write_bytes(b"x" * 5000)
+    assert file_digest(str(data), chunk_size=64) == hashlib.sha256(b"x" * 5000).hexdigest()
+    assert file_digest(str(data), "md5") == hashlib.md5(b"x" * 5000).hexdigest()
+
+
+def test_each_file_is_hashed_once_per_run(tmp_path, cache, monkeypatch):
+    data = tmp_path / "data.csv"
+    data.write_text("a,b\n")
+    reads = _count_reads(monkeypatch)
+    assert main([str(data)]) == 0
+    # A new process reads the digest back from the cache file
+    assert file_digest(str(data), cache=HashCache(str(cache))) == (
+        hashlib.sha256(b"a,b\n").hexdigest()
+    )
+    assert reads == ["sha256"]
+
+    data.write_text("a,b,c\n")
+    file_digest(str(data), cache=HashCache(str(cache)))
+    assert len(reads) == 2
+
+
+def test_expect_reports_mismatches(tmp_path, cache, capsys):
+    data = tmp_path / "data.csv"
+    data.write_text("a\n")
+    digest = hashlib.sha256(b"a\n").hexdigest()
+    assert main([str(data), "--expect", digest.upper()]) == 0
+    assert main([str(data), "--expect", "00"]) == 1
+    assert capsys.readouterr().out.splitlines()[-1] == (
+        f"CHECKSUM_MISMATCH: sha256 expected 00, got {digest}"
+    )
+    assert main([str(data), "--algorithm", "nope"]) == 2
+    assert main([str(tmp_path / "missing")]) == 2
+
+
+def test_file_comparison_reuses_cached_digests(tmp_path, cache, monkeypatch):
+    left, right = tmp_path / "a.csv", tmp_path / "b.csv"
+    left.write_text("same\n")
+    right.write_text("same\n")
+    assert main([str(left)]) == 0 and main([str(right)]) == 0
+
+    def fail(*args):
+        raise AssertionError("files should not be read")
+
+    monkeypatch.setattr(files, "open", fail, raising=False)
+    assert files.main([str(left), str(right)]) == 0
+    assert files.main(["--quiet", str(left), str(right)]) == 0
+
+
+def test_checksum_handler():
+    validation = file_checksum.handle(
+        {"file": "out.csv", "checksum": "ABC", "algorithm": "MD5"}
+    )
+    assert validation.actual_cmd == (
+        "python3 -m shtest_compiler.runtime.checksum 'out.csv' --algorithm 'md5' "
+        "--expect 'abc'"
+    )
+    assert file_checksum.handle({"file": "out.csv", "checksum": "abc"}).params[
+        "algorithm"
+    ] == "sha256"
@@ -0,0 +1,178 @@
+import pytest
+
+from shtest_compiler.compiler.phrase_checks import validation_problems
+from shtest_compiler.core.errors import ValidationParseError
+from shtest_compiler.core.handlers import files_same_lines
+from shtest_compiler.runtime import compare
+from shtest_compiler.runtime.compare import compare_csv, main
+
+
+@pytest.fixture
+def write_csv(tmp_path):
+    def write(name, rows):
+        path = tmp_path / name
+        path.write_text("".join(row + "\n" for row in rows))
+        return str(path)
+
+    return write
+
+
+def test_identical_files_match(write_csv):
+    left = write_csv("a.csv", ["1,foo", "2,bar"])
+    right = write_csv("b.csv", ["1.0 , foo", "2,bar"])
+    result = compare_csv(left, right)
+    assert result.identical
+    assert result.left_rows == 2
+
+
+def test_reports_first_differences_only(write_csv):
+    left = write_csv("a.csv", [f"{i},x" for i in range(20)])
+    right = write_csv("b.csv", [f"{i},y" for i in range(20)])
+    result = compare_csv(left, right, max_differences=3)
+    assert not result.identical
+    assert result.difference_count == 20
+    assert result.differences == [
+        "row 1, column 2: 'x' != 'y'",
+        "row 2, column 2: 'x' != 'y'",
+        "row 3, column 2: 'x' != 'y'",
+    ]
+
+
+def test_numeric_tolerance(write_csv):
+    left = write_csv("a.csv", ["a,1.00", "b,2.00"])
+    right = write_csv("b.csv", ["a,1.004", "b,1.995"])
+    assert not compare_csv(left, right).identical
+    assert compare_csv(left, right, tolerance=0.01).identical
+
+
+def test_row_count_mismatch(write_csv):
+    left = write_csv("a.csv", ["1", "2", "3"])
+    right = write_csv("b.csv", ["1", "2"])
+    result = compare_csv(left, right)
+    assert not result.identical
+    assert (result.left_rows, result.right_rows) == (3, 2)
+
+
+def test_ignore_order_compares_multisets(write_csv):
+    left = write_csv("a.csv", ["1,a", "2,b", "2,b", "3,c"])
+    right = write_csv("b.csv", ["3,c", "2,b", "1,a", "2,b"])
+    assert compare_csv(left, right, ignore_order=True).identical
+
+    other = write_csv("c.csv", ["3,c", "2,b", "1,a", "4,d"])
+    result = compare_csv(left, other, ignore_order=True)
+    assert result.difference_count == 2
+    assert result.differences == ["only in left: ['2', 'b']", "only in right: ['4', 'd']"]
+
+
+def test_ignore_order_with_tolerance_uses_external_sort(write_csv):
+    left = write_csv("a.csv", [f"k{i},{i}.0" for i in range(10)])
+    right = write_csv("b.csv", [f"k{i},{i}.001" for i in reversed(range(10))])
+    assert not compare_csv(left, right, ignore_order=True).identical
+    assert compare_csv(
+        left, right, tolerance=0.01, ignore_order=True, chunk_size=3
+    ).identical
+
+
+def test_main_exit_codes(write_csv, capsys):
+    left = write_csv("a.csv", ["1"])
+    right = write_csv("b.csv", ["2"])
+    assert main([left, left]) == 0
+    assert main([left, right]) == 1
+    assert "row 1, column 1: '1' != '2'" in capsys.readouterr().out
+    assert main([left, left + ".missing"]) == 2
+
+
+def test_lines_mode_compares_whole_lines(write_csv):
+    left = write_csv("a.txt", ["b, 1", "a,1", "b, 1"])
+    right = write_csv("b.txt", ["b, 1", "b, 1", "a,1"])
+    assert compare_csv(left, right, ignore_order=True, lines=True).identical
+
+    # Not parsed as CSV: padding and number formats count
+    other = write_csv("c.txt", ["b,1", "a,1.0", "b, 1"])
+    result = compare_csv(left, other, ignore_order=True, lines=True)
+    assert result.difference_count == 4
+    assert "only in left: ['a,1']" in result.differences
+
+
+def test_digests_are_partitioned_above_the_memory_budget(write_csv, monkeypatch):
+    left = write_csv("a.csv", [f"{i},x" for i in range(200)] + ["1,x"])
+    right = write_csv("b.csv", [f"{i},x" for i in reversed(range(200))] + ["7,y"])
+    expected = compare_csv(left, right, ignore_order=True)
+    monkeypatch.setattr(compare, "_PARTITION_BYTES", 256)
+    result = compare_csv(left, right, ignore_order=True)
+    assert (result.difference_count, result.differences) == (
+        expected.difference_count,
+        expected.differences,
+    )
+    assert result.differences == ["only in left: ['1', 'x']", "only in right: ['7', 'y']"]
+
+
+def test_key_columns_match_rows_in_any_order(write_csv):
+    left = write_csv("a.csv", ["1,a,10.00", "2,b,20", "3,c,30"])
+    right = write_csv("b.csv", ["3,c,30.004", "4,d,40", "1,a,10", "2,x,20"])
+    result = compare_csv(left, right, key=[0], tolerance=0.01, chunk_size=2)
+    assert result.differences == [
+        "key '2', column 2: 'b' != 'x'",
+        "only in right: ['4', 'd', '40']",
+    ]
+    assert (result.left_rows, result.right_rows) == (3, 4)
+
+
+def test_report_receives_every_difference(write_csv, tmp_path, capsys):
+    left = write_csv("a.csv", [f"{i},x" for i in range(30)])
+    right = write_csv("b.csv", [f"{i},y" for i in reversed(range(30))])
+    report = tmp_path / "report.diff"
+    assert main([left, right, "--key", "1", "--report", str(report)]) == 1
+    out = capsys.readouterr().out
+    assert "MISMATCH: 30 difference(s)" in out
+    assert out.count("  key ") == 10
+    assert f"REPORT: {report}" in out
+    assert len(report.read_text().splitlines()) == 30
+
+
+def test_lines_mode_rejects_csv_options(write_csv):
+    left = write_csv("a.txt", ["a"])
+    with pytest.raises(SystemExit):
+        main([left, left, "--lines", "--key", "1"])
+
+
+def test_same_lines_handler_options():
+    def command(**params):
+        return files_same_lines.handle({"file1": "a.csv", "file2": "b.csv", **params})
+
+    plain = command()
+    assert plain.actual_cmd.startswith(
+        "python3 -m shtest_compiler.runtime.compare 'a.csv' 'b.csv' --ignore-order --lines "
+    )
+    assert '${SHTEST_REPORT_DIR:+--report "$SHTEST_REPORT_DIR/a.csv_vs_b.csv.diff"}' in (
+        plain.actual_cmd
+    )
+    assert plain.params["opposite"] == (
+        "les fichiers a.csv et b.csv ne contiennent pas les mêmes lignes"
+    )
+    assert "--key 2 --delimiter auto --tolerance 0.5 " in (
+        command(column="2", tolerance="0,5").actual_cmd
+    )
+    assert "--ignore-order --delimiter auto --tolerance 0.01 " in (
+        command(tolerance="0.01").actual_cmd
+    )
+    with pytest.raises(ValidationParseError):
+        command(tolerance="un")
+
+
+def test_invalid_same_lines_parameters_are_parse_problems():
+    phrase = "les fichiers a.csv et b.csv contiennent les mêmes lignes"
+    assert validation_problems(f"{phrase} à 0,5 près") == []
+    [(where, problem)] = validation_problems(f"{phrase} à un près")
+    assert where == f"{phrase} à un près" and "'tolerance' value 'un'" in problem
+    [(_, problem)] = validation_problems(f"{phrase} par clé colonne id")
+    assert "'column' value 'id'" in problem
+
+
+def test_key_comparison_guesses_the_delimiter_from_the_header(write_csv, capsys):
+    left = write_csv("a.csv", ["id;name;amount", "1;a,b;10", "2;c;20"])
+    right = write_csv("b.csv", ["id;name;amount", "2;c;20", "1;a,b;10.001"])
+    assert main([left, right, "--key", "1", "--tolerance", "0.01", "--delimiter", "auto"]) == 0
+    # Without sniffing, "a,b" splits the rows on the wrong columns
+    assert main([left, right, "--key", "1", "--tolerance", "0.01"]) == 1
+    capsys.readouterr()
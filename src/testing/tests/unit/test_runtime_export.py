@@ -0,0 +1,51 @@
+import io
+
+import pytest
+
+from shtest_compiler.runtime.export import export, format_for, main, write_xlsx
+
+
+def test_format_is_inferred_from_extension():
+    assert format_for("out.CSV") == "csv"
+    assert format_for("out.xlsx") == "xlsx"
+    assert format_for("out.parquet") == "parquet"
+    assert format_for("out.txt") == "csv"
+
+
+def test_format_aliases_and_unknown_format():
+    assert format_for("out.csv", "Excel") == "xlsx"
+    assert format_for("out.csv", "pq") == "parquet"
+    with pytest.raises(ValueError, match="Unknown export format"):
+        format_for("out.csv", "json")
+
+
+def test_csv_passthrough_keeps_bytes(tmp_path):
+    data = b'1,"a,b"\n2,c\n'
+    output = tmp_path / "out.csv"
+    export(io.BytesIO(data), str(output))
+    assert output.read_bytes() == data
+
+
+def test_csv_is_redelimited(tmp_path):
+    output = tmp_path / "out.csv"
+    count = export(io.BytesIO(b"1\ta,b\n2\tc\n"), str(output), delimiter="\t")
+    assert count == 2
+    assert output.read_bytes() == b'1,"a,b"\r\n2,c\r\n'
+
+
+def test_missing_optional_dependency_is_reported(tmp_path, monkeypatch, capsys):
+    source = tmp_path / "in.csv"
+    source.write_text("1,a\n")
+    monkeypatch.setitem(__import__("sys").modules, "pyarrow", None)
+    assert main([str(source), str(tmp_path / "out.parquet")]) == 2
+    assert "EXPORT_ERROR: format parquet requires pyarrow" in capsys.readouterr().err
+
+
+def test_xlsx_starts_a_new_sheet_past_the_row_limit(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    output = tmp_path / "out.xlsx"
+    rows = ([str(i), "x"] for i in range(5))
+    assert write_xlsx(rows, str(output), max_rows=2) == 5
+    workbook = openpyxl.load_workbook(output)
+    assert workbook.sheetnames == ["Sheet1", "Sheet2", "Sheet3"]
+    assert workbook["Sheet1"]["A1"].value == 0
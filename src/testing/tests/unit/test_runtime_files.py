@@ -0,0 +1,94 @@
+from shtest_compiler.core.action_handlers import compare_files
+from shtest_compiler.core.handlers import files_identical as files_identical_handler
+from shtest_compiler.runtime.files import (
+    _mismatch,
+    compare_files as compare,
+    files_identical,
+    find_difference,
+    main,
+)
+
+
+def _write_lines(path, count, changed=None):
+    changed = changed or {}
+    with open(path, "w") as f:
+        for i in range(1, count + 1):
+            f.write(changed.get(i, f"line {i}\n"))
+
+
+def test_mismatch_finds_the_first_differing_byte():
+    assert _mismatch(b"abcdef", b"abcXef") == 3
+    assert _mismatch(b"abc", b"abcdef") == 3
+    assert _mismatch(b"", b"a") == 0
+    assert _mismatch(b"Xbc", b"abc") == 0
+
+
+def test_identical_files(tmp_path):
+    left, right = tmp_path / "a.txt", tmp_path / "b.txt"
+    _write_lines(left, 1000)
+    _write_lines(right, 1000)
+    assert files_identical(str(left), str(right), chunk_size=64)
+    assert find_difference(str(left), str(right), chunk_size=64) is None
+    assert main([str(left), str(right)]) == 0
+
+
+def test_size_mismatch_short_circuits_quiet_mode(tmp_path, capsys):
+    left, right = tmp_path / "a.txt", tmp_path / "b.txt"
+    left.write_text("abc\n")
+    right.write_text("abcd\n")
+    assert not files_identical(str(left), str(right))
+    assert main(["--quiet", str(left), str(right)]) == 1
+    assert capsys.readouterr().out == ""
+
+
+def test_first_difference_is_located_across_chunks(tmp_path):
+    left, right = tmp_path / "a.txt", tmp_path / "b.txt"
+    _write_lines(left, 1000)
+    _write_lines(right, 1000, changed={700: "line 700 changed\n"})
+    difference = find_difference(str(left), str(right), chunk_size=64)
+    assert difference.line == 700
+    assert difference.column == len("line 700") + 1
+    assert difference.offset == left.read_bytes().index(b"line 700\n") + 8
+
+
+def test_report_shows_a_bounded_diff_excerpt(tmp_path, capsys):
+    left, right = tmp_path / "a.txt", tmp_path / "b.txt"
+    _write_lines(left, 1000)
+    _write_lines(right, 1000, changed={700: "line 700 changed\n"})
+    assert main([str(left), str(right), "--chunk-size", "64"]) == 1
+    out = capsys.readouterr().out.splitlines()
+    assert out[0].startswith("FILES_DIFFER: first difference at byte ")
+    assert out[0].endswith("(line 700, column 9)")
+    assert out[1] == "SIZE_MISMATCH: 8893 vs 8901 bytes"
+    assert "@@ -697,7 +697,7 @@" in out
+    assert "-line 700" in out and "+line 700 changed" in out
+    assert " line 699" in out and " line 703" in out
+    assert out[-1] == "... (extrait limité à 20 lignes)"
+    assert len(out) < 20
+
+
+def test_binary_files_have_no_excerpt(tmp_path):
+    left, right = tmp_path / "a.bin", tmp_path / "b.bin"
+    left.write_bytes(b"\0\1\2" * 100)
+    right.write_bytes(b"\0\1\2" * 50 + b"\3" + b"\0\1\2" * 50)
+    difference = compare(str(left), str(right))
+    assert difference.offset == 150
+    assert difference.excerpt == []
+
+
+def test_missing_file_is_an_error(tmp_path, capsys):
+    left = tmp_path / "a.txt"
+    left.write_text("a\n")
+    assert main([str(left), str(tmp_path / "missing.txt")]) == 2
+    assert capsys.readouterr().out.startswith("COMPARISON_ERROR:")
+
+
+def test_handlers_use_the_chunked_comparator():
+    action = compare_files.handle({"file1": "a.txt", "file2": "b.txt"})
+    assert action.to_shell() == (
+        'python3 -m shtest_compiler.runtime.files "a.txt" "b.txt"'
+    )
+    validation = files_identical_handler.handle({"file1": "a.txt", "file2": "b.txt"})
+    assert validation.actual_cmd == (
+        "python3 -m shtest_compiler.runtime.files 'a.txt' 'b.txt'"
+    )
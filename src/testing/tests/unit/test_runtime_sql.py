@@ -0,0 +1,59 @@
+import io
+import sqlite3
+
+from shtest_compiler.compiler.sql_drivers import get_sql_command
+from shtest_compiler.core.action_handlers import sql_compare, sql_export, sql_query
+from shtest_compiler.runtime.sql import connect_sqlite, execute, main, split_statements
+
+PARAMS = {"SQL_CONN": "data/test.db", "SQL_DRIVER": "sqlite"}
+
+
+def test_split_statements_keeps_semicolons_inside_literals():
+    script = ["INSERT INTO t VALUES ('a;b'); SELECT 1;\n", "SELECT\n", "  2\n"]
+    assert [s.strip() for s in split_statements(script)] == [
+        "INSERT INTO t VALUES ('a;b');",
+        "SELECT 1;",
+        "SELECT\n  2",
+    ]
+
+
+def test_execute_prints_rows_like_the_sqlite_shell():
+    connection = sqlite3.connect(":memory:")
+    out = io.StringIO()
+    statements = [
+        "CREATE TABLE t (a, b);",
+        "INSERT INTO t VALUES (1, 'x,y'), (2, NULL);",
+        "SELECT * FROM t;",
+    ]
+    assert execute(connection, statements, out) == 2
+    assert out.getvalue() == "1|x,y\n2|\n"
+    out = io.StringIO()
+    execute(connection, ["SELECT * FROM t;"], out, as_csv=True)
+    assert out.getvalue() == '1,"x,y"\n2,\n'
+
+
+def test_main_commits_and_stops_at_first_error(tmp_path, capsys):
+    database = str(tmp_path / "test.db")
+    script = tmp_path / "init.sql"
+    script.write_text("CREATE TABLE t (a); INSERT INTO t VALUES (1);\nSELECT nope;\n")
+    assert main([f"sqlite:///{database}", str(script)]) == 1
+    assert "SQL_ERROR: no such column: nope" in capsys.readouterr().err
+    assert connect_sqlite(database).execute("SELECT a FROM t").fetchall() == [(1,)]
+
+
+def test_sqlite_driver_uses_the_embedded_executor():
+    executor = "python3 -m shtest_compiler.runtime.sql"
+    assert get_sql_command("init.sql", "data/test.db", "sqlite") == (
+        f'{executor} "data/test.db" init.sql'
+    )
+    query = sql_query.handle({"query": "SELECT 1;", **PARAMS}).to_shell()
+    assert query == f'echo "SELECT 1;" | {executor} "data/test.db"'
+    export = sql_export.handle(
+        {"query": "SELECT 1;", "output": "out.csv", **PARAMS}
+    ).to_shell()
+    assert f'{executor} "data/test.db" --csv | python3 -m' in export
+    compare = sql_compare.handle(
+        {"query1": "SELECT 1;", "query2": "SELECT 2;", "sql_session": True, **PARAMS}
+    ).to_shell()
+    assert "sql_session_run" not in compare
+    assert compare.count(f'{executor} "data/test.db" --csv') == 2
@@ -0,0 +1,82 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from shtest_compiler.utils.sandbox import Sandbox, default_sandbox_root, write_targets
+
+
+def _make_inputs(base):
+    (base / "data").mkdir(parents=True)
+    (base / "data" / "in.csv").write_text("a;b\n")
+    (base / ".shtest_fixtures").mkdir()
+    (base / ".git").mkdir()
+    return base
+
+
+def test_sandbox_mirrors_inputs_as_links(tmp_path):
+    source = _make_inputs(tmp_path / "project")
+    box = Sandbox(str(source), root=str(tmp_path))
+    data = os.path.join(box.path, "data")
+    assert os.path.isdir(data) and not os.path.islink(data)
+    assert os.path.islink(os.path.join(data, "in.csv"))
+    assert not os.path.exists(os.path.join(box.path, ".git"))
+    assert not os.path.exists(os.path.join(box.path, ".shtest_fixtures"))
+    assert box.environ()["SHTEST_FIXTURE_CACHE"] == str(source / ".shtest_fixtures")
+    box.cleanup()
+    assert not os.path.exists(box.path)
+
+
+def test_sandbox_writes_do_not_reach_inputs(tmp_path):
+    source = _make_inputs(tmp_path / "project")
+    with Sandbox(str(source), root=str(source)) as box:
+        os.remove(os.path.join(box.path, "data", "in.csv"))
+        with open(os.path.join(box.path, "data", "out.csv"), "w") as handle:
+            handle.write("x\n")
+        # The sandbox root is the source tree itself but is not mirrored
+        assert os.path.basename(box.path) not in os.listdir(box.path)
+    assert (source / "data" / "in.csv").exists()
+    assert not (source / "data" / "out.csv").exists()
+
+
+def test_write_targets_finds_in_place_writes_and_timestamps():
+    script = (
+        "run_action \"touch -t '202501010101' 'data/in.csv'\"\n"
+        "run_action \"echo x >> log.txt && chmod 644 run.sh\"\n"
+        "sed -i 's/a/b/' conf.ini; sed 's/a/b/' read.ini | cat > out.txt\n"
+        "cp data/in.csv copy.csv; touch $DIR/generated\n"
+    )
+    assert write_targets(script) == {
+        "data/in.csv", "log.txt", "run.sh", "conf.ini", "out.txt"
+    }
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash is not available")
+def test_written_inputs_are_copies(tmp_path):
+    source = _make_inputs(tmp_path / "project")
+    before = os.stat(source / "data" / "in.csv").st_mtime
+    script = "touch -t 202001010101 data/in.csv\necho c >> data/in.csv\n"
+    with Sandbox(str(source), root=str(tmp_path), copied=write_targets(script)) as box:
+        copy = os.path.join(box.path, "data", "in.csv")
+        assert not os.path.islink(copy)
+        subprocess.run(["bash", "-c", script], cwd=box.path, check=True)
+        with open(copy) as handle:
+            assert handle.read() == "a;b\nc\n"
+    assert (source / "data" / "in.csv").read_text() == "a;b\n"
+    assert os.stat(source / "data" / "in.csv").st_mtime == before
+
+
+def test_cleanup_async_removes_the_sandbox(tmp_path):
+    box = Sandbox(str(_make_inputs(tmp_path / "project")), root=str(tmp_path))
+    thread = box.cleanup_async()
+    # Exiting the interpreter must not wait for a pending removal
+    assert thread.daemon
+    thread.join()
+    assert not os.path.exists(box.path)
+
+
+def test_sandbox_root_can_be_configured(monkeypatch, tmp_path):
+    monkeypatch.delenv("SHTEST_FIXTURE_CACHE", raising=False)
+    monkeypatch.setenv("SHTEST_SANDBOX_ROOT", str(tmp_path))
+    assert default_sandbox_root() == str(tmp_path)
@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+from shtest_compiler.utils import logger as logger_module
+from shtest_compiler.utils import shell_utils
+from shtest_compiler.utils.shell_utils import (
+    clear_resource_cache,
+    resource_manifest,
+    resource_path,
+    resource_roots,
+    shell_escape,
+)
+
+
+@pytest.fixture
+def bundle(tmp_path, monkeypatch):
+    """A fake PyInstaller layout: external data next to the exe, then _MEIPASS."""
+    external, meipass = tmp_path / "dist", tmp_path / "meipass"
+    (external / "config").mkdir(parents=True)
+    (meipass / "config").mkdir(parents=True)
+    (meipass / "plugins" / "demo" / "config").mkdir(parents=True)
+    (external / "config" / "patterns_actions.yml").write_text("actions: []\n")
+    (meipass / "config" / "patterns_actions.yml").write_text("bundled\n")
+    (meipass / "config" / "patterns_validations.yml").write_text("validations: []\n")
+    (meipass / "plugins" / "demo" / "config" / "patterns_actions.yml").write_text("")
+    (meipass / "regex_config.yml").write_text("")
+    monkeypatch.setattr(shell_utils.sys, "frozen", True, raising=False)
+    monkeypatch.setattr(shell_utils.sys, "executable", str(external / "shtest"))
+    monkeypatch.setattr(shell_utils.sys, "_MEIPASS", str(meipass), raising=False)
+    clear_resource_cache()
+    yield external, meipass
+    monkeypatch.undo()
+    clear_resource_cache()
+
+
+def test_source_tree_resolves_to_the_package_directory():
+    package_dir = os.path.dirname(os.path.dirname(shell_utils.__file__))
+    assert resource_roots() == (os.path.abspath(package_dir),)
+    path = resource_path("config/patterns_actions.yml")
+    assert os.path.isfile(path)
+    assert resource_manifest()["config/patterns_actions.yml"] == path
+    assert os.path.isdir(resource_path("plugins"))
+    assert os.path.isfile(resource_path("regex_config.yml"))
+
+
+def test_external_data_takes_precedence_over_the_bundle(bundle):
+    external, meipass = bundle
+    assert resource_roots() == (str(external), str(meipass))
+    assert resource_path("config/patterns_actions.yml") == str(
+        external / "config" / "patterns_actions.yml"
+    )
+    assert resource_path("config/patterns_validations.yml") == str(
+        meipass / "config" / "patterns_validations.yml"
+    )
+    assert resource_path("./plugins/demo/config/patterns_actions.yml") == str(
+        meipass / "plugins" / "demo" / "config" / "patterns_actions.yml"
+    )
+    assert resource_path("regex_config.yml") == str(meipass / "regex_config.yml")
+
+
+def test_missing_resources_fall_back_to_the_first_root(bundle):
+    external, _ = bundle
+    assert resource_path("config/unknown.yml") == str(external / "config" / "unknown.yml")
+    absolute = str(external / "elsewhere.yml")
+    assert resource_path(absolute) == absolute
+
+
+def test_lookups_are_silent_and_hit_the_file_system_once(bundle, monkeypatch, capsys):
+    resource_path("config/patterns_actions.yml")
+    calls = []
+    monkeypatch.setattr(shell_utils.os, "listdir", lambda *a: calls.append(a) or [])
+    monkeypatch.setattr(shell_utils.os, "walk", lambda *a: calls.append(a) or iter(()))
+    for _ in range(1000):
+        resource_path("config/patterns_actions.yml")
+        resource_path("config/unknown.yml")
+    assert calls == []
+    assert capsys.readouterr().out == ""
+
+
+def test_diagnostics_are_traced_in_the_resources_category(bundle, tmp_path):
+    logger_module.reset_logger()
+    logger_module.set_debug(True, categories=["resources"])
+    try:
+        resource_path("config/patterns_actions.yml")
+        resource_path("config/unknown.yml")
+        path = tmp_path / "trace.log"
+        logger_module.export_log(str(path))
+        text = path.read_text()
+    finally:
+        logger_module.reset_logger()
+    assert "[resources] resource_path: config/patterns_actions.yml -> " in text
+    assert "config/unknown.yml not found (searched " in text
+
+
+def test_shell_escape_quotes_single_quotes():
+    assert shell_escape("it's") == "'it'\\''s'"
+    assert shell_escape(None) == ""
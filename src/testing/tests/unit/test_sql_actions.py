@@ -0,0 +1,184 @@
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+
+import pytest
+
+import shtest_compiler
+from shtest_compiler.ast.shtest_to_shellframework_visitor import (
+    ShtestToShellFrameworkVisitor,
+)
+from shtest_compiler.compiler.compiler import ModularCompiler
+from shtest_compiler.compiler.sql_drivers import scratch_file
+from shtest_compiler.core.action_handlers import (
+    run_sql_script,
+    sql_compare,
+    sql_export,
+    sql_query,
+)
+from shtest_compiler.parser.shtest_ast import ShtestFile
+
+PARAMS = {"SQL_CONN": "user/password@db", "SQL_DRIVER": "oracle"}
+
+needs_bash = pytest.mark.skipif(shutil.which("bash") is None, reason="bash is not available")
+
+
+def _sqlite_db(path):
+    with sqlite3.connect(path) as db:
+        db.execute("CREATE TABLE t (a INTEGER)")
+        db.execute("INSERT INTO t VALUES (1), (2)")
+    return str(path)
+
+
+def _run_shell(script, cwd):
+    """Run generated shell code with the package importable, as a test run does."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.path.dirname(os.path.dirname(shtest_compiler.__file__))
+    return subprocess.run(
+        ["bash", "-c", script], cwd=cwd, env=env, text=True, capture_output=True
+    )
+
+
+def test_scratch_file_is_stable_and_content_addressed():
+    first = scratch_file("query", "SELECT 1 FROM dual", ".sql")
+    assert first == scratch_file("query", "SELECT 1 FROM dual", ".sql")
+    assert first != scratch_file("query", "SELECT 2 FROM dual", ".sql")
+    assert first.startswith("$SHTEST_TMPDIR/query_")
+
+
+def test_sql_actions_keep_temp_files_in_scratch_area():
+    actions = [
+        sql_query.handle({"query": "SELECT 1 FROM dual", **PARAMS}),
+        sql_export.handle(
+            {"query": "SELECT 1 FROM dual", "output_file": "out.csv", **PARAMS}
+        ),
+        sql_compare.handle(
+            {"query1": "SELECT 1 FROM dual", "query2": "SELECT 2 FROM dual", **PARAMS}
+        ),
+    ]
+    for action in actions:
+        shell = action.to_shell()
+        assert "$SHTEST_TMPDIR/" in shell
+        assert "temp_" not in shell
+
+
+def test_generated_script_allocates_and_cleans_scratch_area():
+    global_code = ShtestToShellFrameworkVisitor().visit(ShtestFile(steps=[])).global_code
+    assert any(line.startswith("SHTEST_TMPDIR=$(mktemp -d") for line in global_code)
+    assert "trap 'rm -rf \"$SHTEST_TMPDIR\"' EXIT" in global_code
+
+
+def test_sql_compare_streams_csv_through_runtime_comparator():
+    shell = sql_compare.handle(
+        {
+            "query1": "SELECT 1 FROM dual",
+            "query2": "SELECT 2 FROM dual",
+            "tolerance": "0.5",
+            "ignore_order": True,
+            **PARAMS,
+        }
+    ).to_shell()
+    assert "python3 -m shtest_compiler.runtime.compare" in shell
+    assert "--tolerance 0.5 --ignore-order" in shell
+    assert "pandas" not in shell and ".xlsx" not in shell
+
+
+def test_sql_export_streams_into_runtime_exporter():
+    shell = sql_export.handle(
+        {"query": "SELECT 1", "output": "out.xlsx", **PARAMS, "SQL_DRIVER": "mysql"}
+    ).to_shell()
+    assert shell.startswith("set -o pipefail\n")
+    assert '| python3 -m shtest_compiler.runtime.export - "out.xlsx" --format xlsx' in shell
+    assert "--delimiter $'\\t'" in shell
+    assert "pandas" not in shell
+
+
+def test_sql_export_format_phrase_overrides_extension():
+    action = sql_export.handle(
+        {"query": "SELECT 1", "output": "out.dat", "format": "Parquet", **PARAMS}
+    )
+    assert action.format == "parquet"
+
+
+@needs_bash
+def test_sql_output_paths_with_spaces_and_metacharacters(tmp_path):
+    params = {"SQL_CONN": _sqlite_db(tmp_path / "t.db"), "SQL_DRIVER": "sqlite"}
+    export = sql_export.handle(
+        {"query": "SELECT a FROM t", "output": "out dir; x.csv", **params}
+    )
+    query = sql_query.handle(
+        {"query": "SELECT a FROM t", "output_file": "rows & more.txt", **params}
+    )
+    for action in (export, query):
+        result = _run_shell(action.to_shell(), tmp_path)
+        assert result.returncode == 0, result.stderr
+    assert (tmp_path / "out dir; x.csv").read_text().split() == ["1", "2"]
+    assert (tmp_path / "rows & more.txt").read_text().split() == ["1", "2"]
+
+
+@needs_bash
+def test_sqlite_script_execution_runs_in_the_generated_script(tmp_path):
+    (tmp_path / "init.sql").write_text(
+        "CREATE TABLE t (a INTEGER);\nINSERT INTO t VALUES (7);\n", encoding="utf-8"
+    )
+    source = tmp_path / "sql.shtest"
+    source.write_text(
+        "Étape: Base\n"
+        "Action: Définir la variable SQL_DRIVER = sqlite ; Résultat: retour 0\n"
+        "Action: Définir la variable SQL_CONN = test.db ; Résultat: retour 0\n"
+        "Action: Exécuter le script SQL init.sql ; Résultat: retour 0\n"
+        "Action: Exécuter la requête SQL SELECT a FROM t ; Résultat: stdout contient 7\n",
+        encoding="utf-8",
+    )
+    script = ModularCompiler().compile_file(str(source), str(tmp_path / "sql.sh"))
+    result = _run_shell(f"bash {script}", tmp_path)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "OK: stdout contient 7" in result.stdout
+
+
+def test_sql_script_execution_is_a_bare_command():
+    params = {"script": "init.sql", "SQL_CONN": "user/password@db"}
+    assert run_sql_script.handle({**params, "SQL_DRIVER": "sqlite"}).to_shell() == (
+        'python3 -m shtest_compiler.runtime.sql "user/password@db" init.sql'
+    )
+    session = run_sql_script.handle(
+        {**params, "SQL_DRIVER": "postgres", "sql_session": True}
+    ).to_shell()
+    assert session == 'sql_session_run postgres "user/password@db" init.sql default'
+
+
+@needs_bash
+@pytest.mark.parametrize("sql_jobs", [1, 2])
+def test_each_sql_action_uses_the_connection_defined_before_it(tmp_path, sql_jobs):
+    for name in ("first", "second"):
+        with sqlite3.connect(tmp_path / f"{name}.db") as db:
+            db.execute("CREATE TABLE t (a TEXT)")
+            db.execute("INSERT INTO t VALUES (?)", (name,))
+    export = "Action: Exporter les résultats de la requête SELECT a FROM t vers {} ; Résultat: retour 0\n"
+    query = "Action: Exécuter la requête SQL SELECT a FROM t ; Résultat: retour 0\n"
+    source = tmp_path / "two.shtest"
+    source.write_text(
+        "Étape: A\n"
+        "Action: Définir la variable SQL_DRIVER = sqlite ; Résultat: retour 0\n"
+        "Action: Définir la variable SQL_CONN = first.db ; Résultat: retour 0\n"
+        + export.format("out1.csv")
+        + query
+        + "Étape: B\n"
+        "Action: Définir la variable SQL_CONN = second.db ; Résultat: retour 0\n"
+        + export.format("out2.csv")
+        + query,
+        encoding="utf-8",
+    )
+    compiler = ModularCompiler(sql_jobs=sql_jobs)
+    script = compiler.compile_file(str(source), str(tmp_path / "two.sh"))
+    shell = (tmp_path / "two.sh").read_text(encoding="utf-8")
+    # The same query line is not shared between the two connections
+    assert shell.count("echo 'Action: Exécuter la requête SQL SELECT a FROM t'") == 2
+    for name in ("first", "second"):
+        assert len(re.findall(rf'runtime\.sql \\?"{name}\.db', shell)) == 2
+    result = _run_shell(f"bash {script}", tmp_path)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert (tmp_path / "out1.csv").read_text().split() == ["first"]
+    assert (tmp_path / "out2.csv").read_text().split() == ["second"]
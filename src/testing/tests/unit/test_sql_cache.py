@@ -0,0 +1,65 @@
+from shtest_compiler.ast.shtest_to_shellframework_visitor import (
+    ShtestToShellFrameworkVisitor,
+)
+from shtest_compiler.compiler.sql_cache import (
+    cache_key,
+    cached_command,
+    is_cacheable,
+    normalize_query,
+)
+from shtest_compiler.core.action_handlers import run_sql_script, sql_export, sql_query
+from shtest_compiler.parser.shtest_ast import ShtestFile
+
+PARAMS = {"SQL_CONN": "data/test.db", "SQL_DRIVER": "sqlite", "sql_cache": True}
+
+
+def test_normalize_query_ignores_layout_but_not_literals():
+    assert normalize_query("SELECT  a\n FROM t -- note\n;") == "SELECT a FROM t"
+    assert normalize_query("SELECT 'a  b' FROM t") == "SELECT 'a  b' FROM t"
+    assert cache_key("sqlite", "db", "SELECT 1;", "plain") == cache_key(
+        "sqlite", "db", " SELECT   1 ", "plain"
+    )
+    assert cache_key("sqlite", "db", "SELECT 1", "plain") != cache_key(
+        "sqlite", "other.db", "SELECT 1", "plain"
+    )
+
+
+def test_only_single_read_only_statements_are_cacheable():
+    assert is_cacheable("SELECT COUNT(*) FROM orders;")
+    assert is_cacheable("WITH x AS (SELECT 1) SELECT * FROM x")
+    assert is_cacheable("SELECT 'insert; now' FROM t")
+    assert not is_cacheable("UPDATE t SET a = 1")
+    assert not is_cacheable("SELECT 1; DELETE FROM t")
+    assert not is_cacheable("SELECT * FROM t FOR UPDATE")
+    assert not is_cacheable("SELECT SYSDATE FROM dual")
+    assert not is_cacheable("SELECT seq.nextval FROM dual")
+
+
+def test_cached_command_passes_the_query_command_single_quoted():
+    assert cached_command("abc", "echo 'x' | q") == (
+        "sql_cache_run abc 'echo '\\''x'\\'' | q'"
+    )
+
+
+def test_read_only_queries_are_wrapped_and_writes_invalidate():
+    select = sql_query.handle({"query": "SELECT 1;", "output_file": "o.txt", **PARAMS})
+    assert select.to_shell().startswith("sql_cache_run ")
+    assert select.to_shell().endswith(' > "o.txt"')
+    assert not select.invalidates_sql_cache
+    export = sql_export.handle({"query": "SELECT 1;", "output": "o.csv", **PARAMS})
+    assert "sql_cache_run " in export.to_shell()
+    insert = sql_query.handle({"query": "INSERT INTO t VALUES (1);", **PARAMS})
+    assert "sql_cache_run" not in insert.to_shell()
+    assert insert.invalidates_sql_cache
+    assert run_sql_script.handle({"script": "init.sql", **PARAMS}).invalidates_sql_cache
+
+
+def test_visitor_clears_the_cache_before_other_actions():
+    visitor = ShtestToShellFrameworkVisitor(sql_cache=True)
+    global_code = visitor.visit(ShtestFile(steps=[])).global_code
+    assert "sql_cache_run() {" in global_code
+    assert visitor.get_action_shell_command("./batch.sh --all").startswith(
+        "sql_cache_clear\n"
+    )
+    plain = ShtestToShellFrameworkVisitor()
+    assert plain.get_action_shell_command("./batch.sh --all") == "./batch.sh --all"
@@ -0,0 +1,120 @@
+from shtest_compiler.ast.shell_framework_ast import InlineShellCode
+from shtest_compiler.ast.shtest_to_shellframework_visitor import (
+    ShtestToShellFrameworkVisitor,
+)
+from shtest_compiler.compiler.sql_jobs import connection_variable, is_concurrent
+from shtest_compiler.core.action_handlers import run_sql_script, sql_query
+from shtest_compiler.parser.shtest_ast import Action, ShtestFile, TestStep
+
+PARAMS = {"SQL_CONN": "data/test.db", "SQL_DRIVER": "sqlite"}
+
+
+def _action(command, lineno):
+    return Action(command=command, result_expr=None, result_ast=None, lineno=lineno)
+
+
+def _validation_step(*commands):
+    return ShtestFile(
+        steps=[
+            TestStep(
+                name="Préparation",
+                lineno=1,
+                actions=[
+                    _action("Définir la variable SQL_CONN = data/test.db", 2),
+                    _action("Définir la variable SQL_DRIVER = sqlite", 3),
+                ],
+            ),
+            TestStep(
+                name="Validation",
+                lineno=4,
+                actions=[
+                    _action(command, lineno)
+                    for lineno, command in enumerate(commands, start=5)
+                ],
+            ),
+        ]
+    )
+
+
+def _lines(step):
+    return [
+        line
+        for action in step.actions
+        if isinstance(action, InlineShellCode)
+        for line in action.code_lines
+    ]
+
+
+def test_connection_variables_are_read_from_definitions():
+    assert connection_variable("Définir la variable SQL_CONN = data/test.db") == (
+        "SQL_CONN",
+        "data/test.db",
+    )
+    assert connection_variable("export SQL_DRIVER='sqlite'") == ("SQL_DRIVER", "sqlite")
+    assert connection_variable("Définir la variable LANG = C") is None
+
+
+def test_only_read_only_sql_actions_run_concurrently():
+    assert is_concurrent(sql_query.handle({"query": "SELECT 1", **PARAMS}))
+    assert not is_concurrent(sql_query.handle({"query": "DELETE FROM t", **PARAMS}))
+    assert not is_concurrent(run_sql_script.handle({"script": "init.sql", **PARAMS}))
+    assert not is_concurrent(None)
+
+
+def test_consecutive_read_only_actions_are_started_then_collected_in_order():
+    visitor = ShtestToShellFrameworkVisitor(sql_jobs=4)
+    ast = visitor.visit(
+        _validation_step(
+            "Exporter les résultats de la requête SELECT a FROM t vers a.csv",
+            "Comparer les résultats de la requête SELECT a FROM t avec SELECT b FROM u",
+            "Exporter les résultats de la requête SELECT b FROM u vers b.csv",
+        )
+    )
+    lines = _lines(ast.steps[1])
+    assert [line.split(" ", 2)[:2] for line in lines[:3]] == [
+        ["sql_job_start", "1"],
+        ["sql_job_start", "2"],
+        ["sql_job_start", "3"],
+    ]
+    assert 'runtime.sql "data/test.db" --csv' in lines[0]
+    assert lines[3:] == [
+        "echo 'Action: Exporter les résultats de la requête SELECT a FROM t vers a.csv'",
+        "sql_job_collect 1",
+        "echo 'Action: Comparer les résultats de la requête SELECT a FROM t avec SELECT b FROM u'",
+        "sql_job_collect 2",
+        "echo 'Action: Exporter les résultats de la requête SELECT b FROM u vers b.csv'",
+        "sql_job_collect 3",
+    ]
+    assert 'SHTEST_SQL_JOBS="${SHTEST_SQL_JOBS:-4}"' in ast.global_code
+    assert "trap 'sql_job_cancel_all; rm -rf \"$SHTEST_TMPDIR\"' EXIT" in ast.global_code
+
+
+def test_other_actions_split_the_groups():
+    visitor = ShtestToShellFrameworkVisitor(sql_jobs=4)
+    ast = visitor.visit(
+        _validation_step(
+            "Exporter les résultats de la requête SELECT a FROM t vers a.csv",
+            "Exécuter le script SQL purge.sql",
+            "Exporter les résultats de la requête SELECT b FROM u vers b.csv",
+            "Exporter les résultats de la requête SELECT c FROM v vers c.csv",
+        )
+    )
+    lines = _lines(ast.steps[1])
+    starts = [line for line in lines if line.startswith("sql_job_start")]
+    assert [line.split(" ", 2)[1] for line in starts] == ["1", "2"]
+    assert "SELECT a FROM t" not in " ".join(starts)
+    assert sum(line.startswith("run_action") for line in lines) == 2
+
+
+def test_jobs_are_disabled_by_default_and_with_sessions():
+    commands = (
+        "Exporter les résultats de la requête SELECT a FROM t vers a.csv",
+        "Exporter les résultats de la requête SELECT b FROM u vers b.csv",
+    )
+    for visitor in (
+        ShtestToShellFrameworkVisitor(),
+        ShtestToShellFrameworkVisitor(sql_jobs=4, sql_session=True),
+    ):
+        ast = visitor.visit(_validation_step(*commands))
+        assert not any("sql_job" in line for line in _lines(ast.steps[1]))
+        assert not any("sql_job_start() {" == line for line in ast.global_code)
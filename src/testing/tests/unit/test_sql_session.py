@@ -0,0 +1,162 @@
+import os
+import shutil
+import subprocess
+import textwrap
+
+import pytest
+
+from shtest_compiler.ast.shtest_to_shellframework_visitor import (
+    ShtestToShellFrameworkVisitor,
+)
+from shtest_compiler.compiler.sql_drivers import get_sql_command
+from shtest_compiler.compiler.sql_session import (
+    session_command,
+    session_prologue,
+    session_trap,
+)
+from shtest_compiler.core.action_handlers import (
+    run_sql_script,
+    sql_compare,
+    sql_export,
+    sql_query,
+)
+from shtest_compiler.parser.shtest_ast import ShtestFile
+
+PARAMS = {"SQL_CONN": "user/password@db", "SQL_DRIVER": "postgres", "sql_session": True}
+
+
+def test_session_command_targets_the_connection_session():
+    assert (
+        session_command("init.sql", "user/password@db", "Oracle")
+        == 'sql_session_run oracle "user/password@db" init.sql default'
+    )
+    with pytest.raises(ValueError):
+        session_command("init.sql", "db", "oracle", mode="xml")
+
+
+def test_get_sql_command_keeps_one_shot_clients_without_session_support():
+    assert get_sql_command("s.sql", "conn", "postgres", session=True).startswith(
+        "sql_session_run postgres"
+    )
+    assert get_sql_command("s.redis", "-h host", "redis", session=True) == (
+        "redis-cli -h host < s.redis"
+    )
+    assert get_sql_command("s.sql", "conn", "postgres") == 'psql "conn" -f s.sql'
+
+
+def test_sql_actions_use_the_session_when_enabled():
+    actions = [
+        run_sql_script.handle({"script": "init.sql", **PARAMS}),
+        sql_query.handle({"query": "SELECT 1", **PARAMS}),
+        sql_export.handle({"query": "SELECT 1", "output": "out.csv", **PARAMS}),
+        sql_compare.handle({"query1": "SELECT 1", "query2": "SELECT 2", **PARAMS}),
+    ]
+    for action in actions:
+        shell = action.to_shell()
+        assert 'sql_session_run postgres "user/password@db"' in shell
+        assert "| psql" not in shell
+    assert " csv" in actions[2].to_shell()
+    assert " plain" in actions[1].to_shell()
+
+
+def test_sql_actions_open_a_client_per_action_by_default():
+    params = {k: v for k, v in PARAMS.items() if k != "sql_session"}
+    shell = sql_query.handle({"query": "SELECT 1", **params}).to_shell()
+    assert "sql_session_run" not in shell
+    assert '| psql "user/password@db"' in shell
+
+
+def test_generated_script_closes_sessions_on_exit():
+    global_code = (
+        ShtestToShellFrameworkVisitor(sql_session=True)
+        .visit(ShtestFile(steps=[]))
+        .global_code
+    )
+    assert "trap 'sql_session_close_all; rm -rf \"$SHTEST_TMPDIR\"' EXIT" in global_code
+    assert "sql_session_run() {" in global_code
+    default_code = ShtestToShellFrameworkVisitor().visit(ShtestFile(steps=[])).global_code
+    assert "sql_session_run() {" not in default_code
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash is not available")
+def test_session_prologue_is_valid_bash():
+    script = "\n".join(session_prologue())
+    result = subprocess.run(["bash", "-n"], input=script, text=True, capture_output=True)
+    assert result.returncode == 0, result.stderr
+
+
+
+# Stand-in for psql: runs "\i" scripts made of "ROW <value>" and "FAIL" lines,
+# answers "\echo" and records each start in $FAKE_SQL_LOG.
+FAKE_PSQL = r"""#!/bin/bash
+echo "open $1" >> "$FAKE_SQL_LOG"
+while IFS= read -r line; do
+    case "$line" in
+        '\q') exit 0 ;;
+        '\echo '*) echo "${line#\\echo }" ;;
+        '\i '*)
+            file=${line#\\i \'}
+            while IFS= read -r sql; do
+                case "$sql" in
+                    "ROW "*) echo "${sql#ROW }" ;;
+                    FAIL) echo 'ERROR:  relation "missing" does not exist' ;;
+                esac
+            done < "${file%\'}"
+            ;;
+    esac
+done
+"""
+
+SESSION_SCRIPT = """
+first=$(sql_session_run postgres "db" q1.sql plain); echo "first=$first rc=$?"
+both=$(sql_session_run postgres "db" q2.sql plain); echo "both=$both" | paste -sd,
+bad=$(sql_session_run postgres "db" bad.sql plain 2>err.txt); echo "bad rc=$? out=$bad"
+after=$(sql_session_run postgres "db" q1.sql plain); echo "after=$after rc=$?"
+dir=$(sql_session_dir postgres db)
+echo "$dir $(cat "$dir/holder.pid") $(cat "$dir/client.pid")"
+"""
+
+
+def _running(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as handle:
+            # A zombie is gone even though its entry is still listed
+            return handle.read().rsplit(") ", 1)[1][0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash is not available")
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def test_session_runs_queries_through_one_client_and_closes_it_on_exit(tmp_path):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "psql").write_text(FAKE_PSQL)
+    (bin_dir / "psql").chmod(0o755)
+    (tmp_path / "q1.sql").write_text("ROW 1\n")
+    (tmp_path / "q2.sql").write_text("ROW 2\nROW 3\n")
+    (tmp_path / "bad.sql").write_text("FAIL\n")
+    script = "\n".join(
+        ['SHTEST_TMPDIR="$(mktemp -d)"', *session_prologue(), session_trap(), SESSION_SCRIPT]
+    )
+    env = dict(os.environ)
+    env["PATH"] = f"{bin_dir}{os.pathsep}{env['PATH']}"
+    env["FAKE_SQL_LOG"] = str(tmp_path / "clients.log")
+    result = subprocess.run(
+        ["bash", "-c", script],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+    assert result.returncode == 0, result.stderr
+    *outputs, pids = result.stdout.splitlines()
+    assert outputs == ["first=1 rc=0", "both=2,3", "bad rc=1 out=", "after=1 rc=0"]
+    assert "ERROR:" in (tmp_path / "err.txt").read_text()
+    # One client served the whole session
+    assert (tmp_path / "clients.log").read_text() == "open db\n"
+    # The EXIT trap stopped the holder (sleep) and the client
+    directory, holder, client = pids.split()
+    assert not os.path.exists(directory)
+    assert not _running(int(holder)) and not _running(int(client))
@@ -1,9 +1,14 @@
+import json
 import os
 import tempfile
 import unittest
 
 from shtest_compiler.parser.configurable_parser import ConfigurableParser
-from shtest_compiler.verify_syntax import check_file
+from shtest_compiler.parser.core import Diagnostic
+from shtest_compiler.verify_syntax import check_file, report, verify_file, verify_paths
+
+VALID = "Étape: Test\nAction: echo hello ; Résultat: retour 0\n"
+EMPTY_STEP = "# comment\n\nÉtape: Vide\n\nÉtape: Pleine\n  Action: echo 1\n"
 
 
 class TestVerifySyntax(unittest.TestCase):
@@ -18,6 +23,11 @@ class TestVerifySyntax(unittest.TestCase):
         tmp.close()
         return tmp.name
 
+    def _valid(self):
+        path = self._write_temp(VALID)
+        self.addCleanup(os.unlink, path)
+        return path
+
     def test_invalid_line_number(self):
         path = self._write_temp("Step: S\nAction: Definir la variable X = 1\nblabla\n")
         try:
@@ -75,6 +85,71 @@ class TestVerifySyntax(unittest.TestCase):
         finally:
             os.unlink(path)
 
+    def test_diagnostics_carry_line_and_column(self):
+        path = self._write_temp(EMPTY_STEP)
+        try:
+            diagnostics = verify_file(path)
+        finally:
+            os.unlink(path)
+        self.assertEqual(len(diagnostics), 1)
+        self.assertEqual((diagnostics[0].lineno, diagnostics[0].column), (3, 1))
+        self.assertEqual(
+            str(diagnostics[0]), f"{path}:3:1: Step 'Vide' has no actions"
+        )
+        self.assertEqual(verify_file(self._valid()), [])
+
+    def test_verify_paths_reports_every_file_across_processes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "sub"))
+            for name, content in (
+                ("a.shtest", VALID),
+                ("b.shtest", EMPTY_STEP),
+                ("sub/c.shtest", EMPTY_STEP),
+                ("notes.txt", "ignored"),
+            ):
+                with open(os.path.join(tmp, name), "w", encoding="utf-8") as f:
+                    f.write(content)
+            serial = verify_paths([tmp], jobs=1)
+            parallel = verify_paths([os.path.join(tmp, "**", "*.shtest")], jobs=2)
+        self.assertEqual(serial, parallel)
+        self.assertEqual(
+            [os.path.relpath(path, tmp) for path, _ in serial],
+            ["a.shtest", "b.shtest", os.path.join("sub", "c.shtest")],
+        )
+        self.assertEqual([len(diagnostics) for _, diagnostics in serial], [0, 1, 1])
+
+        data = json.loads(report(serial, "json"))
+        self.assertEqual((data["files"], data["failed"]), (3, 2))
+        self.assertEqual(data["errors"][0]["line"], 3)
+        self.assertIn("2 erreur(s) dans 2 fichier(s) sur 3", report(serial))
+
+    def test_warnings_are_reported_without_failing(self):
+        path = self._write_temp(
+            "Étape: S\nAction: créer le contexte ; Résultat: retour 0\n"
+        )
+        try:
+            results = verify_paths([path], jobs=1)
+        finally:
+            os.unlink(path)
+        [(_, [warning])] = results
+        self.assertEqual(
+            str(warning), f"{path}:2:9: warning: Unknown action phrase: 'créer le contexte'"
+        )
+        data = json.loads(report(results, "json"))
+        self.assertEqual((data["failed"], data["errors"]), (0, []))
+        self.assertEqual(data["warnings"][0]["severity"], "warning")
+        self.assertIn("1 avertissement(s).", report(results))
+
+    def test_missing_file_is_reported(self):
+        [(path, diagnostics)] = verify_paths(["missing.shtest"], jobs=1)
+        self.assertEqual(path, "missing.shtest")
+        self.assertEqual(diagnostics[0].path, "missing.shtest")
+        self.assertIsNone(diagnostics[0].lineno)
+
+    def test_diagnostic_without_position(self):
+        self.assertEqual(str(Diagnostic("boom", path="a.shtest")), "a.shtest: boom")
+        self.assertEqual(str(Diagnostic("boom")), "boom")
+
 
 if __name__ == "__main__":
     unittest.main()